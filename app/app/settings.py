@@ -12,6 +12,9 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -23,9 +26,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-(m#au^ugk54%!*6#3h87y8%po5ennkv1$(=aowm$=u#8+=tlyu'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('DEBUG', '1') == '1'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -46,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # En premier : la durée mesurée couvre tous les autres middlewares
+    'core.instrumentation.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -81,17 +86,79 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# DB_POOL=1 : pool de connexions dans le processus (serveurs multi-threads
+# ou ASGI), sinon connexions persistantes pendant DB_CONN_MAX_AGE secondes.
+DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.postgresql_pool' if DB_POOL else 'django.db.backends.postgresql',
         'HOST':os.environ.get('DB_HOST','db'),
         'NAME': os.environ.get('DB_NAME','devdb'),
         'USER':os.environ.get('DB_USER','devuser'),
-        'PASSWORD':os.environ.get('DB_PASSWORD','changeme')
+        'PASSWORD':os.environ.get('DB_PASSWORD','changeme'),
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        # Test des connexions persistantes inactives (core.db.health)
+        'HEALTH_CHECK_INTERVAL': int(os.environ.get('DB_HEALTH_CHECK_INTERVAL', 30)),
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'MAX_OVERFLOW': int(os.environ.get('DB_POOL_MAX_OVERFLOW', 5)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'RECYCLE': int(os.environ.get('DB_POOL_RECYCLE', 3600)),
+        },
     }
 }
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
+
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+# Le premier hasher de chaque profil est utilisé pour les nouveaux hashs,
+# les suivants permettent de vérifier (puis migrer) les anciens.
+_ALL_HASHERS = [
+    'core.hashers.TunedPBKDF2PasswordHasher',
+    'core.hashers.ScryptPasswordHasher',
+    'core.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_HASHER_PROFILES = {
+    'default': _ALL_HASHERS,
+    'scrypt': ['core.hashers.ScryptPasswordHasher'] + _ALL_HASHERS,
+    'argon2': ['core.hashers.TunedArgon2PasswordHasher'] + _ALL_HASHERS,
+    # Tests uniquement : MD5 salé mais sans facteur de coût, cassable par
+    # force brute ; absent des autres profils
+    'fast': ['django.contrib.auth.hashers.MD5PasswordHasher'] + _ALL_HASHERS,
+}
+PASSWORD_HASH_PROFILE = os.environ.get(
+    'PASSWORD_HASH_PROFILE', 'fast' if TESTING else 'default'
+)
+if PASSWORD_HASH_PROFILE == 'fast' and not TESTING:
+    raise ImproperlyConfigured("Le profil de hash 'fast' est réservé aux tests.")
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASH_PROFILE]
+
+# Coûts des hashers, à ajuster par environnement
+PASSWORD_HASH_PARAMS = {
+    'PBKDF2_ITERATIONS': int(os.environ.get('PBKDF2_ITERATIONS', 260000)),
+    'SCRYPT_N': int(os.environ.get('SCRYPT_N', 2 ** 14)),
+    'SCRYPT_R': int(os.environ.get('SCRYPT_R', 8)),
+    'SCRYPT_P': int(os.environ.get('SCRYPT_P', 1)),
+    'ARGON2_TIME_COST': int(os.environ.get('ARGON2_TIME_COST', 2)),
+    'ARGON2_MEMORY_COST': int(os.environ.get('ARGON2_MEMORY_COST', 102400)),
+    'ARGON2_PARALLELISM': int(os.environ.get('ARGON2_PARALLELISM', 8)),
+}
+
+# Mise à niveau des anciens hashs après la réponse (core.backends)
+PASSWORD_REHASH_DEFERRED = os.environ.get('PASSWORD_REHASH_DEFERRED', '1') == '1'
+
+AUTHENTICATION_BACKENDS = ['core.backends.DeferredRehashBackend']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -139,12 +206,130 @@ AUTH_USER_MODEL='core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+        'users.authentication.CachedTokenAuthentication',
+    ],
+    # JSON (orjson) uniquement ; l'interface navigable s'ajoute en DEBUG
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ]
+        'core.renderers.FastJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Proxys de confiance devant l'application (nginx en prod) : l'IP des
+    # throttles est lue dans X-Forwarded-For à cette profondeur, sinon
+    # REMOTE_ADDR (un en-tête fourni par le client est ignoré)
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+}
+
+# Schéma OpenAPI précalculé (commande build_schema, core.views.schema)
+SCHEMA_DIR = os.environ.get('SCHEMA_DIR', str(BASE_DIR / 'schema'))
+SCHEMA_MAX_AGE = int(os.environ.get('SCHEMA_MAX_AGE', 300))
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Cache de l'authentification par token (users.authentication)
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 10000)),
+    'TTL': int(os.environ.get('TOKEN_AUTH_CACHE_TTL', 300)),
+    # Alias de CACHES partagé entre les workers (ex. 'default'), ou None.
+    # Sans cache partagé, chaque processus garde ses instantanés jusqu'au
+    # TTL : réservé à un déploiement en un seul processus.
+    'SHARED_CACHE': os.environ.get('TOKEN_AUTH_SHARED_CACHE') or None,
+}
+
+# Jetons signés émis par /api/user/token/ (users.tokens), en secondes
+AUTH_TOKENS = {
+    'ACCESS_TTL': int(os.environ.get('AUTH_ACCESS_TOKEN_TTL', 15 * 60)),
+    'REFRESH_TTL': int(os.environ.get('AUTH_REFRESH_TOKEN_TTL', 14 * 24 * 3600)),
 }
 
+# Cache des réponses GET /api/user/moi/ (users.cache)
+PROFILE_CACHE = {
+    # Alias de CACHES : utiliser un backend partagé (redis, memcached) en prod
+    'CACHE': os.environ.get('PROFILE_CACHE_ALIAS', 'default'),
+    'TIMEOUT': int(os.environ.get('PROFILE_CACHE_TIMEOUT', 3600)),
+}
+
+# Limitation de débit (users.throttling) : token, reset, création de compte
+THROTTLE = {
+    # Désactivée pendant les tests (sauf override_settings)
+    'ENABLED': os.environ.get('THROTTLE_ENABLED', '0' if TESTING else '1') == '1',
+    # 'local' (mémoire du processus, un nœud) ou 'cache' (CACHES partagé)
+    'BACKEND': os.environ.get('THROTTLE_BACKEND', 'local'),
+    'CACHE': os.environ.get('THROTTLE_CACHE_ALIAS', 'default'),
+    'MAX_KEYS': int(os.environ.get('THROTTLE_MAX_KEYS', 100000)),
+    # Limites par IP, par email et globales, au format DRF (N/s|min|hour|day)
+    'RATES': {
+        'auth': {'ip': '30/min', 'email': '10/min', 'global': '100/s'},
+        'password_reset': {'ip': '10/min', 'email': '3/hour', 'global': '20/s'},
+        'signup': {'ip': '20/hour', 'global': '10/s'},
+    },
+}
+
+# Mesures par requête (core.instrumentation) : Server-Timing et /metrics
+INSTRUMENTATION = {
+    'ENABLED': os.environ.get('INSTRUMENTATION_ENABLED', '1') == '1',
+    # Expose des durées internes (hachage...) : activé par défaut en DEBUG
+    'SERVER_TIMING': os.environ.get('SERVER_TIMING', '1' if DEBUG else '0') == '1',
+    # Jeton Bearer exigé par /metrics/
+    'METRICS_TOKEN': os.environ.get('METRICS_TOKEN') or None,
+    # Sans jeton, /metrics/ n'est ouvert qu'en DEBUG (sinon 403)
+    'METRICS_PUBLIC': os.environ.get(
+        'METRICS_PUBLIC', '1' if DEBUG else '0') == '1',
+    # Répertoire partagé par les workers gunicorn (core.metrics) : /metrics/
+    # additionne tous les workers. Sans lui, valeurs du seul processus.
+    'METRICS_DIR': os.environ.get('METRICS_MULTIPROC_DIR') or None,
+    # Écriture des valeurs d'un worker au plus toutes les N secondes
+    'METRICS_FLUSH_INTERVAL': float(os.environ.get('METRICS_FLUSH_INTERVAL', 1)),
+}
+
+# Liste des utilisateurs de l'admin (core.admin) sur les grandes tables
+ADMIN_CHANGELIST = {
+    'PER_PAGE': int(os.environ.get('ADMIN_LIST_PER_PAGE', 100)),
+    # Au-delà : estimation PostgreSQL (table entière) ou « N+ » (filtres)
+    'MAX_COUNT': int(os.environ.get('ADMIN_MAX_COUNT', 10000)),
+}
+
+# Statistiques des utilisateurs (users.stats, /api/user/stats/)
+USER_STATS = {
+    'AGE_BUCKET': int(os.environ.get('USER_STATS_AGE_BUCKET', 10)),  # années par tranche
+    # Compteurs mis à jour à chaque sauvegarde (sinon refresh_user_stats seul)
+    'INCREMENTAL': os.environ.get('USER_STATS_INCREMENTAL', '1') == '1',
+}
+
+# Actions de masse de l'admin, exécutées par `manage.py run_admin_jobs`
+ADMIN_JOBS = {
+    'BATCH_SIZE': int(os.environ.get('ADMIN_JOBS_BATCH_SIZE', 1000)),  # ids par tranche
+    'POLL_INTERVAL': 5,   # secondes, avec --loop
+    # Bail (secondes) d'une tâche en cours, prolongé à chaque tranche : au-delà,
+    # la tâche d'un worker arrêté est reprise par un autre
+    'CLAIM_TIMEOUT': int(os.environ.get('ADMIN_JOBS_CLAIM_TIMEOUT', 300)),
+}
+
+# ==========================
+# Liste des utilisateurs (get_users)
+# ==========================
+
+USERS_PAGE_SIZE = int(os.environ.get('USERS_PAGE_SIZE', 100))
+USERS_MAX_PAGE_SIZE = int(os.environ.get('USERS_MAX_PAGE_SIZE', 1000))
+USERS_STREAM_CHUNK_SIZE = int(os.environ.get('USERS_STREAM_CHUNK_SIZE', 2000))
+# 'exact', 'cached' ou 'estimate' (pg_class.reltuples)
+USERS_COUNT_MODE = os.environ.get('USERS_COUNT_MODE', 'cached')
+USERS_COUNT_CACHE_TIMEOUT = int(os.environ.get('USERS_COUNT_CACHE_TIMEOUT', 60))
+
 # ==========================
 # Paramètres EMAIL
 # ==========================
@@ -162,9 +347,44 @@ DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 # Pour tests console (optionnel)
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# E-mails de reset envoyés par le worker `manage.py send_reset_emails`
+# (mettre à 0 pour un envoi direct dans la requête)
+PASSWORD_RESET_EMAIL_ASYNC = os.environ.get('PASSWORD_RESET_EMAIL_ASYNC', '1') == '1'
+PASSWORD_RESET_OUTBOX = {
+    'BATCH_SIZE': int(os.environ.get('PASSWORD_RESET_OUTBOX_BATCH_SIZE', 50)),
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF': 30,        # secondes, doublé à chaque échec
+    'POLL_INTERVAL': 5,   # secondes, avec --loop
+    # Bail (secondes) d'un lot réservé par un worker, envoyé hors transaction
+    'CLAIM_TIMEOUT': int(os.environ.get('PASSWORD_RESET_OUTBOX_CLAIM_TIMEOUT', 300)),
+}
+
+# Jetons de réinitialisation (users.reset_tokens)
+PASSWORD_RESET_TOKENS = {
+    'TTL': int(os.environ.get('PASSWORD_RESET_TOKEN_TTL', 3600)),
+    # Alias de CACHES des jetons déjà utilisés (partagé entre workers en prod)
+    'CACHE': os.environ.get('PASSWORD_RESET_TOKEN_CACHE', 'default'),
+    # Jetons default_token_generator envoyés avant la migration
+    'ACCEPT_LEGACY': os.environ.get('PASSWORD_RESET_ACCEPT_LEGACY', '1') == '1',
+}
+
 # Frontend (pour générer le lien)
 FRONTEND_URL = 'http://localhost:3000'
 
+# URL publique de l'API (liens signés vers les QR codes en mode 'lazy')
+BACKEND_URL = os.environ.get('BACKEND_URL', 'http://localhost:8080')
+
+# QR code des e-mails de reset (users.qr)
+PASSWORD_RESET_QR = {
+    'MODE': os.environ.get('PASSWORD_RESET_QR_MODE', 'attach'),  # 'attach', 'lazy' ou 'off'
+    'FORMAT': os.environ.get('PASSWORD_RESET_QR_FORMAT', 'png'),  # 'png' ou 'svg'
+    'VERSION': 6,         # version fixe, None pour l'ajustement automatique
+    'ERROR_LEVEL': 'L',
+    'BOX_SIZE': 4,
+    'BORDER': 4,
+    'MAX_AGE': 3600,      # durée de validité de l'URL signée (secondes)
+}
+
 # Djoser settings (optionnel si tu l'utilises)
 DJOSER = {
     'PASSWORD_RESET_CONFIRM_URL': 'password-reset/confirm/{uid}/{token}',
@@ -14,15 +14,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from drf_spectacular.views import(
-    SpectacularAPIView,
     SpectacularSwaggerView,
 )
 from django.contrib import admin
 from django.urls import path,include
 
+from core import views as core_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/schema/',SpectacularAPIView.as_view(),name='api-schema'),
+    path('api/schema/', core_views.schema, name='api-schema'),
+    path('metrics/', core_views.metrics, name='metrics'),
     path('api/docs/',
          SpectacularSwaggerView.as_view(url_name='api-schema'),
          name='api-docs'),
@@ -1,18 +1,40 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
-from .models import User
+
+from .admin_jobs import (
+    ACTIONS, ACTIVATE, DEACTIVATE, PASSWORD_RESET, create_job, stale_jobs,
+)
+from .admin_pagination import EstimatedCountPaginator, KeysetChangeList
+from .models import AdminJob, User
 
 class UserAdmin(BaseUserAdmin):
     ordering = ['id']
     list_display = ['email', 'name']
+
+    # Grandes tables : pas de COUNT(*) complet, pages par id (?after=)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = settings.ADMIN_CHANGELIST['PER_PAGE']
+    # Recherche par préfixe (index UPPER(...) text_pattern_ops sur PostgreSQL)
+    search_fields = ['^email', '^name']
+    # Ni groupes ni permissions chargés en entier dans le formulaire
+    filter_horizontal = ()
+    autocomplete_fields = ['groups']
+    raw_id_fields = ['user_permissions']
+    # Actions de masse : tâche exécutée par le worker run_admin_jobs
+    actions = ['deactivate_users', 'activate_users', 'send_password_resets']
     
     
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         (_('Personal Info'), {'fields': ('name','genre','date_naissance')}),
         (_('Permissions'), {'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
-        (_('Important dates'), {'fields': ('last_login',)}),
+        (_('Important dates'), {'fields': ('last_login', 'date_joined')}),
     )
     
     
@@ -26,5 +48,69 @@ class UserAdmin(BaseUserAdmin):
     
     model = User
 
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def start_job(self, request, queryset, action):
+        job = create_job(action, queryset, request.user)
+        url = reverse('admin:core_adminjob_change', args=[job.pk])
+        self.message_user(request, format_html(
+            '<a href="{}">Tâche n°{}</a> créée : {} pour {} utilisateur(s).',
+            url, job.pk, ACTIONS[action][1], job.total,
+        ))
+
+    @admin.action(description='Désactiver les utilisateurs sélectionnés')
+    def deactivate_users(self, request, queryset):
+        self.start_job(request, queryset, DEACTIVATE)
+
+    @admin.action(description='Réactiver les utilisateurs sélectionnés')
+    def activate_users(self, request, queryset):
+        self.start_job(request, queryset, ACTIVATE)
+
+    @admin.action(
+        description='Envoyer un e-mail de réinitialisation du mot de passe'
+    )
+    def send_password_resets(self, request, queryset):
+        self.start_job(request, queryset, PASSWORD_RESET)
+
+
+class AdminJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'action_label', 'status', 'progress_display',
+                    'affected', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'action']
+    list_select_related = ['created_by']
+    ordering = ['-id']
+    fields = ['action', 'status', 'progress_display', 'total', 'processed',
+              'affected', 'error', 'created_by', 'created_at', 'started_at',
+              'heartbeat_at', 'finished_at']
+    readonly_fields = fields
+    actions = ['resume_jobs']
+
+    @admin.display(description='Action')
+    def action_label(self, job):
+        return ACTIONS[job.action][1] if job.action in ACTIONS else job.action
+
+    @admin.display(description='Avancement')
+    def progress_display(self, job):
+        return f'{job.progress} % ({job.processed}/{job.total})'
+
+    @admin.action(description='Relancer (reprend après le dernier id traité)')
+    def resume_jobs(self, request, queryset):
+        # Tâches en échec ou abandonnées par leur worker seulement : une tâche
+        # en attente ou en cours n'est pas remise en file une seconde fois
+        resumable = Q(status=AdminJob.STATUS_FAILED) | stale_jobs()
+        count = queryset.filter(resumable).update(
+            status=AdminJob.STATUS_PENDING, error='', finished_at=None,
+            heartbeat_at=None,
+        )
+        self.message_user(request, f'{count} tâche(s) remise(s) en file.')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 admin.site.register(User, UserAdmin)
+admin.site.register(AdminJob, AdminJobAdmin)
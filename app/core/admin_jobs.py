@@ -0,0 +1,211 @@
+"""Actions de masse de l'admin exécutées hors requête.
+
+L'action de l'admin enregistre une ``AdminJob`` (ids ciblés compressés en
+intervalles) et rend la main aussitôt. Le worker ``run_admin_jobs`` la
+traite par tranches d'id : un ``UPDATE`` ou un ``INSERT`` groupé par
+tranche, sans ``save()`` ni signal par utilisateur, dans une transaction
+courte qui enregistre aussi l'avancement. Les caches d'authentification
+des utilisateurs touchés et les compteurs de ``users.stats`` sont mis à
+jour à chaque tranche.
+
+Chaque tranche prolonge le bail du worker (``heartbeat_at``) : une tâche
+« en cours » dont le worker s'est arrêté est reprise par ``claim_job``
+après ``ADMIN_JOBS['CLAIM_TIMEOUT']`` secondes, à partir de ``cursor``.
+Le bail sert aussi de jeton : un worker dont la tâche a été reprise
+abandonne à la tranche suivante sans rien écrire.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q
+from django.utils import timezone
+
+from core.models import AdminJob
+from users.authentication import invalidate_users
+from users.outbox import enqueue_password_resets
+from users.stats import ACTIVE, adjust
+
+logger = logging.getLogger(__name__)
+
+DEACTIVATE = 'deactivate'
+ACTIVATE = 'activate'
+PASSWORD_RESET = 'password_reset'
+
+
+class JobLeaseLost(Exception):
+    """La tâche a été reprise par un autre worker (bail expiré)"""
+
+
+def deactivate(queryset, job):
+    # L'auteur de l'action ne se désactive pas lui-même
+    queryset = queryset.filter(is_active=True).exclude(pk=job.created_by_id)
+    user_ids = list(queryset.values_list('pk', flat=True))
+    if user_ids:
+        # token_version incrémenté : les jetons signés et de rafraîchissement
+        # sont révoqués même si un autre processus garde un instantané
+        # (cache d'authentification non partagé)
+        get_user_model().objects.filter(pk__in=user_ids).update(
+            is_active=False, token_version=F('token_version') + 1,
+        )
+        adjust({(ACTIVE, '1'): -len(user_ids), (ACTIVE, '0'): len(user_ids)})
+        invalidate_users(user_ids)
+    return len(user_ids)
+
+
+def activate(queryset, job):
+    inactive = queryset.filter(is_active=False)
+    user_ids = list(inactive.values_list('pk', flat=True))
+    if user_ids:
+        get_user_model().objects.filter(pk__in=user_ids).update(is_active=True)
+        adjust({(ACTIVE, '1'): len(user_ids), (ACTIVE, '0'): -len(user_ids)})
+        invalidate_users(user_ids)
+    return len(user_ids)
+
+
+def password_reset(queryset, job):
+    # Envoi groupé par le worker send_reset_emails (une connexion SMTP par lot)
+    active = queryset.filter(is_active=True)
+    user_ids = list(active.values_list('pk', flat=True))
+    enqueue_password_resets(user_ids)
+    return len(user_ids)
+
+
+# action -> (traitement d'une tranche, libellé)
+ACTIONS = {
+    DEACTIVATE: (deactivate, 'Désactivation'),
+    ACTIVATE: (activate, 'Réactivation'),
+    PASSWORD_RESET: (password_reset, 'E-mails de réinitialisation'),
+}
+
+
+def compress_ids(ids):
+    """Ids croissants -> intervalles contigus ``[[début, fin], ...]``"""
+    ranges = []
+    for pk in ids:
+        if ranges and pk == ranges[-1][1] + 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ranges
+
+
+def target_ranges(queryset):
+    """``(intervalles, total)`` des ids de ``queryset``.
+
+    Table entière (« tout sélectionner » sans filtre) : un seul intervalle
+    min..max. Sinon les ids sont lus en flux.
+    """
+    queryset = queryset.order_by()
+    if not queryset.query.where:
+        bounds = queryset.aggregate(
+            low=Min('pk'), high=Max('pk'), total=Count('pk')
+        )
+        if not bounds['total']:
+            return [], 0
+        return [[bounds['low'], bounds['high']]], bounds['total']
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    ranges = compress_ids(ids.iterator(chunk_size=10000))
+    return ranges, sum(high - low + 1 for low, high in ranges)
+
+
+def create_job(action, queryset, user=None):
+    if action not in ACTIONS:
+        raise ValueError(f'Action inconnue : {action}')
+    ranges, total = target_ranges(queryset)
+    return AdminJob.objects.create(
+        action=action, id_ranges=ranges, total=total, created_by=user,
+    )
+
+
+def slices(ranges, cursor, batch_size):
+    """Tranches ``(début, fin)`` de ``batch_size`` ids max après ``cursor``"""
+    for low, high in ranges:
+        start = max(low, cursor + 1)
+        while start <= high:
+            end = min(start + batch_size - 1, high)
+            yield start, end
+            start = end + 1
+
+
+def run_job(job, batch_size=None):
+    """Traite ``job`` jusqu'au bout (ou reprend après ``job.cursor``)"""
+    batch_size = batch_size or settings.ADMIN_JOBS['BATCH_SIZE']
+    handler = ACTIONS[job.action][0]
+    users = get_user_model().objects
+    jobs = AdminJob.objects.filter(pk=job.pk)
+    try:
+        for start, end in slices(job.id_ranges, job.cursor, batch_size):
+            with transaction.atomic():
+                # Prolonge le bail en verrouillant la ligne : 0 ligne si un
+                # autre worker a repris la tâche entre-temps
+                heartbeat = timezone.now()
+                owned = jobs.filter(heartbeat_at=job.heartbeat_at)
+                if not owned.update(heartbeat_at=heartbeat):
+                    raise JobLeaseLost(job.pk)
+                chunk = users.filter(pk__range=(start, end))
+                processed = job.processed + chunk.count()
+                affected = job.affected + handler(chunk, job)
+                jobs.update(cursor=end, processed=processed, affected=affected)
+            job.cursor, job.processed, job.affected = end, processed, affected
+            job.heartbeat_at = heartbeat
+    except JobLeaseLost:
+        logger.warning(f'Tâche admin {job.pk} reprise par un autre worker')
+        return job
+    except Exception as e:
+        logger.exception(f'Échec de la tâche admin {job.pk}')
+        job.status, job.error = AdminJob.STATUS_FAILED, str(e)
+    else:
+        job.status = AdminJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    jobs.filter(heartbeat_at=job.heartbeat_at).update(
+        status=job.status, error=job.error, finished_at=job.finished_at,
+    )
+    return job
+
+
+def stale_jobs(lease=None):
+    """Filtre des tâches en cours dont le bail a expiré (worker arrêté)"""
+    lease = lease or settings.ADMIN_JOBS['CLAIM_TIMEOUT']
+    expired = timezone.now() - timedelta(seconds=lease)
+    return Q(status=AdminJob.STATUS_RUNNING) & (
+        Q(heartbeat_at__lt=expired) | Q(heartbeat_at__isnull=True)
+    )
+
+
+def claim_job(lease=None):
+    """Prend la plus ancienne tâche en attente ou dont le bail a expiré.
+
+    ``SKIP LOCKED`` : une tâche verrouillée par un autre worker est ignorée.
+    Une tâche reprise continue après son ``cursor``.
+    """
+    with transaction.atomic():
+        job = (
+            AdminJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(Q(status=AdminJob.STATUS_PENDING) | stale_jobs(lease))
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        if job.status == AdminJob.STATUS_RUNNING:
+            logger.warning(f'Reprise de la tâche admin {job.pk} (bail expiré)')
+        job.status = AdminJob.STATUS_RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def run_pending_jobs(batch_size=None, max_jobs=None):
+    """Exécute les tâches en attente ; retourne le nombre de tâches traitées"""
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job, batch_size)
+        done += 1
+    return done
@@ -0,0 +1,100 @@
+"""Pagination de l'admin adaptée aux grandes tables.
+
+- ``EstimatedCountPaginator`` : pas de COUNT(*) complet, estimation
+  PostgreSQL ou compte plafonné.
+- ``KeysetChangeList`` : pages suivantes par ``?after=<id>``
+  (``WHERE id > n LIMIT``) quand la liste est triée par id, au lieu d'un
+  OFFSET qui relit toutes les lignes précédentes.
+"""
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from core.utils import estimated_row_count
+
+AFTER_VAR = 'after'
+
+
+class EstimatedCountPaginator(Paginator):
+    """Table non filtrée : ``pg_class.reltuples`` au-delà de ``MAX_COUNT``.
+
+    Sinon (filtres, recherche, autre base) : COUNT(*) limité à
+    ``MAX_COUNT`` lignes, ``capped`` indique que la limite est atteinte.
+    """
+    estimated = False
+    capped = False
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_CHANGELIST['MAX_COUNT']
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate > limit:
+                self.estimated = True
+                return estimate
+        count = queryset.order_by()[:limit + 1].count()
+        if count > limit:
+            self.capped = True
+            return limit
+        return count
+
+
+class KeysetChangeList(ChangeList):
+    keyset_ordering = (['id'], ['pk'])
+
+    def __init__(self, request, *args, **kwargs):
+        after = request.GET.get(AFTER_VAR)
+        try:
+            self.after = int(after) if after is not None else None
+        except ValueError:
+            raise IncorrectLookupParameters
+        self.next_url = None
+        self.request = request
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Filtres, tri et recherche repartent du début de la liste
+        if not new_params or AFTER_VAR not in new_params:
+            remove = list(remove or []) + [AFTER_VAR]
+        return super().get_query_string(new_params, remove)
+
+    @property
+    def keyset(self):
+        """Tri par id croissant : pagination par ``after``"""
+        ordering = list(self.model_admin.get_ordering(self.request) or [])
+        return (ORDER_VAR not in self.params
+                and ordering in self.keyset_ordering)
+
+    def get_results(self, request):
+        if self.after is None or not self.keyset:
+            super().get_results(request)
+        else:
+            paginator = self.model_admin.get_paginator(
+                request, self.queryset, self.list_per_page
+            )
+            self.result_count = paginator.count
+            self.full_result_count = None
+            self.show_full_result_count = False
+            self.show_admin_actions = True
+            page = self.queryset.filter(pk__gt=self.after)
+            self.result_list = page[:self.list_per_page]
+            self.can_show_all = False
+            self.multi_page = True
+            self.paginator = paginator
+
+        if self.keyset and self.page_num == 1 and not self.show_all:
+            # Évalue la page (mise en cache par le queryset) pour le lien
+            # suivant
+            rows = list(self.result_list)
+            if len(rows) == self.list_per_page:
+                self.next_url = self.get_query_string(
+                    {AFTER_VAR: rows[-1].pk}, [PAGE_VAR]
+                )
@@ -0,0 +1,95 @@
+"""Âge des utilisateurs calculé à partir de ``date_naissance``.
+
+- En base : un âge compris entre ``a`` et ``b`` ans correspond à un
+  intervalle de dates de naissance (``birth_range``), servi par l'index
+  ``core_user_birth_idx`` ; ``age_expression`` calcule l'âge dans le SQL
+  (annotation, regroupement).
+- En Python : ``compute_ages`` calcule l'âge d'une liste de dates d'un
+  coup, avec NumPy s'il est installé (exports, imports).
+"""
+from datetime import date
+
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, ExtractYear
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle
+    np = None
+
+MIN_AGE = 12
+# En dessous, la conversion vers NumPy coûte plus qu'elle ne rapporte
+NUMPY_MIN_SIZE = 256
+
+
+def age_cutoff(today, min_age=MIN_AGE):
+    """Date de naissance la plus récente autorisée pour ``min_age`` ans"""
+    try:
+        return today.replace(year=today.year - min_age)
+    except ValueError:  # 29 février
+        return today.replace(year=today.year - min_age, day=28)
+
+
+def age_on(birth, today, cutoffs=None):
+    """Âge à ``today`` ; ``cutoffs`` mémorise les dates limites par âge"""
+    if birth is None:
+        return None
+    age = today.year - birth.year
+    if cutoffs is None:
+        return age if birth <= age_cutoff(today, age) else age - 1
+    if age not in cutoffs:
+        cutoffs[age] = age_cutoff(today, age)
+    return age if birth <= cutoffs[age] else age - 1
+
+
+def birth_range(min_age=None, max_age=None, today=None):
+    """Lookups ``date_naissance`` d'un âge entre ``min_age`` et ``max_age``"""
+    today = today or date.today()
+    lookups = {}
+    if min_age is not None:
+        lookups['date_naissance__lte'] = age_cutoff(today, min_age)
+    if max_age is not None:
+        lookups['date_naissance__gt'] = age_cutoff(today, max_age + 1)
+    return lookups
+
+
+def age_expression(field='date_naissance', today=None):
+    """Âge en années révolues, calculé par la base (SQLite, PostgreSQL).
+
+    ``EXTRACT`` rend un ``double precision`` sous PostgreSQL : l'année est
+    convertie en entier pour que l'âge (et ``age / n * n``) reste entier.
+    """
+    today = today or date.today()
+    birthday_ahead = (
+        Q(**{f'{field}__month__gt': today.month})
+        | Q(**{f'{field}__month': today.month, f'{field}__day__gt': today.day})
+    )
+    year = Cast(ExtractYear(field), IntegerField())
+    return Value(today.year) - year - Case(
+        When(birthday_ahead, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _numpy_ages(births, today):
+    days = np.array(births, dtype='datetime64[D]')
+    missing = np.isnat(days)
+    # Dates absentes remplacées le temps du calcul (résultat None)
+    days[missing] = np.datetime64(today, 'D')
+    years = days.astype('datetime64[Y]')
+    months = days.astype('datetime64[M]')
+    month = (months - years).astype(int) + 1
+    day = (days - months).astype(int) + 1
+    ages = today.year - (years.astype(int) + 1970)
+    ages -= (month * 100 + day) > (today.month * 100 + today.day)
+    return [None if gap else int(age) for age, gap in zip(ages, missing)]
+
+
+def compute_ages(births, today=None):
+    """Âges (ou None) pour une liste de dates de naissance"""
+    today = today or date.today()
+    if np is not None and len(births) >= NUMPY_MIN_SIZE:
+        return _numpy_ages(births, today)
+    cutoffs = {}
+    return [age_on(birth, today, cutoffs) for birth in births]
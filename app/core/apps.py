@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core.db.health import check_connections
+        from core.instrumentation import instrument_connection
+
+        request_started.connect(
+            check_connections, dispatch_uid='core.db.health',
+        )
+        connection_created.connect(
+            instrument_connection, dispatch_uid='core.instrumentation',
+        )
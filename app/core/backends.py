@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password
+
+from core.hashers import needs_rehash, schedule_rehash
+from core.instrumentation import timed
+
+UserModel = get_user_model()
+
+
+class DeferredRehashBackend(ModelBackend):
+    """``ModelBackend`` qui ne recalcule pas le hash dans la requête.
+
+    Django met à jour le hash pendant ``check_password`` quand le hasher
+    préféré ou son coût a changé. Ici la vérification se fait sans
+    ``setter`` et la mise à niveau est planifiée en arrière-plan.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Même coût que pour un utilisateur existant (timing)
+            UserModel().set_password(password)
+            return None
+
+        encoded = user.password
+        with timed('hash'):
+            valid = check_password(password, encoded)
+        if valid and self.user_can_authenticate(user):
+            if needs_rehash(encoded):
+                schedule_rehash(user.pk, encoded, password)
+            return user
+        return None
@@ -0,0 +1,194 @@
+"""Banc de charge de l'API users (commande ``benchmark_api``).
+
+Chaque scénario envoie des requêtes au handler WSGI de Django (mêmes
+middlewares et vues qu'en production, sans réseau), une à une depuis un
+seul thread, et mesure les latences ; les résultats JSON peuvent être
+comparés à une référence.
+"""
+import json
+import time
+from itertools import cycle
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.authtoken.models import Token
+
+from core.query_audit import seed_users
+from users.reset_tokens import make_reset_token
+
+BENCH_EMAIL = 'bench{}@example.com'
+BENCH_PASSWORD = 'BenchPass123!'
+SCENARIOS = [
+    'create', 'token', 'moi', 'get_users',
+    'password_reset', 'password_reset_confirm',
+]
+METRICS = ['p50', 'p90', 'p95', 'p99', 'mean', 'max']
+
+
+def seed_bench_users(count):
+    """Crée ``count`` utilisateurs actifs (le premier admin) et les retourne"""
+    seed_users(
+        count, email=BENCH_EMAIL, name='Bench {}', password=BENCH_PASSWORD,
+        is_staff=lambda i: i == 0,
+        is_active=lambda i: True,
+        is_superuser=lambda i: False,
+    )
+    User = get_user_model()
+    return list(User.objects.filter(email__startswith='bench').order_by('id'))
+
+
+def percentile(sorted_values, pct):
+    """Percentile (interpolation linéaire) d'une liste triée"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    low_value, high_value = sorted_values[low], sorted_values[high]
+    return low_value + (high_value - low_value) * (k - low)
+
+
+def summarize(latencies, errors, elapsed):
+    """Statistiques d'un scénario (latences en ms).
+
+    Les requêtes sont envoyées une à une par un seul client :
+    ``sequential_rps`` vaut environ 1 / latence moyenne, ce n'est pas la
+    capacité d'un serveur à plusieurs workers.
+    """
+    values = sorted(latency * 1000 for latency in latencies)
+    rps = round(len(values) / elapsed, 2) if elapsed else 0.0
+    result = {
+        'requests': len(values),
+        'errors': errors,
+        'sequential_rps': rps,
+    }
+    for pct in (50, 90, 95, 99):
+        result[f'p{pct}'] = round(percentile(values, pct), 3)
+    result['mean'] = round(sum(values) / len(values), 3) if values else 0.0
+    result['max'] = round(values[-1], 3) if values else 0.0
+    return result
+
+
+class ApiBenchmark:
+    """Prépare les données puis exécute les scénarios"""
+
+    def __init__(self, users=1000, requests=200, warmup=5):
+        self.requests = requests
+        self.warmup = warmup
+        self.handler = WSGIHandler()
+        self.factory = RequestFactory()
+        self.users = seed_bench_users(users)
+        self.staff = self.users[0]
+        self.tokens = [
+            Token.objects.create(user=user).key for user in self.users[:50]
+        ]
+        self.staff_token = Token.objects.get(user=self.staff).key
+        self._created = 0
+
+    def call(self, method, url, data=None, token=None):
+        extra = {'HTTP_AUTHORIZATION': f'Token {token}'} if token else {}
+        if method == 'get':
+            request = self.factory.get(url, **extra)
+        else:
+            request = self.factory.post(
+                url, json.dumps(data), content_type='application/json', **extra
+            )
+        return self.handler.get_response(request)
+
+    # Chaque scénario retourne une fonction qui fait une requête et
+    # renvoie le code HTTP attendu et obtenu
+
+    def scenario_create(self):
+        url = reverse('user:create')
+
+        def run():
+            self._created += 1
+            res = self.call('post', url, {
+                'email': f'bench-new{self._created}@example.com',
+                'password': BENCH_PASSWORD,
+                'name': 'Bench',
+                'genre': 'F',
+                'date_naissance': '1990-01-01',
+            })
+            return 201, res.status_code
+        return run
+
+    def scenario_token(self):
+        url = reverse('user:token')
+        users = cycle(self.users)
+
+        def run():
+            res = self.call('post', url, {
+                'email': next(users).email,
+                'password': BENCH_PASSWORD,
+            })
+            return 200, res.status_code
+        return run
+
+    def scenario_moi(self):
+        url = reverse('user:moi')
+        tokens = cycle(self.tokens)
+        return lambda: (
+            200, self.call('get', url, token=next(tokens)).status_code
+        )
+
+    def scenario_get_users(self):
+        url = '/api/user/get_users/'
+        return lambda: (
+            200, self.call('get', url, token=self.staff_token).status_code
+        )
+
+    def scenario_password_reset(self):
+        url = reverse('user:password_reset')
+        users = cycle(self.users)
+        return lambda: (
+            200,
+            self.call('post', url, {'email': next(users).email}).status_code,
+        )
+
+    def scenario_password_reset_confirm(self):
+        url = reverse('user:password_reset_confirm')
+        users = cycle(self.users[1:] or self.users)
+
+        def run():
+            user = next(users)
+            user.refresh_from_db(fields=['token_version'])
+            res = self.call('post', url, {
+                'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+                'token': make_reset_token(user),
+                'new_password': BENCH_PASSWORD,
+                're_new_password': BENCH_PASSWORD,
+            })
+            return 200, res.status_code
+        return run
+
+    def run_scenario(self, name):
+        func = getattr(self, f'scenario_{name}')()
+        for i in range(self.warmup):
+            func()
+        latencies = []
+        errors = 0
+        start = time.perf_counter()
+        for i in range(self.requests):
+            t0 = time.perf_counter()
+            expected, status = func()
+            latencies.append(time.perf_counter() - t0)
+            if status != expected:
+                errors += 1
+        return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def compare(results, baseline, metric='p95', tolerance=0.2):
+    """Scénarios où ``metric`` dépasse la référence de plus de ``tolerance``"""
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name, {}).get(metric)
+        if not reference:
+            continue
+        if stats[metric] > reference * (1 + tolerance):
+            regressions.append((name, reference, stats[metric]))
+    return regressions
@@ -0,0 +1,27 @@
+"""Vérification périodique des connexions persistantes (CONN_MAX_AGE > 0).
+
+Django 3.2 ne teste une connexion réutilisée qu'après une erreur ; ici
+une connexion inactive depuis plus de ``HEALTH_CHECK_INTERVAL`` secondes
+est testée au début de la requête et fermée si elle ne répond plus.
+"""
+import time
+
+from django.db import connections
+
+HEALTH_STATS = {'checks': 0, 'closed': 0}
+
+
+def check_connections(**kwargs):
+    now = time.monotonic()
+    for conn in connections.all():
+        interval = conn.settings_dict.get('HEALTH_CHECK_INTERVAL')
+        if interval is None or conn.connection is None or conn.in_atomic_block:
+            continue
+        last_check = getattr(conn, '_health_checked_at', None)
+        if last_check is not None and now - last_check < interval:
+            continue
+        HEALTH_STATS['checks'] += 1
+        if not conn.is_usable():
+            HEALTH_STATS['closed'] += 1
+            conn.close()
+        conn._health_checked_at = now
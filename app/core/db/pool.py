@@ -0,0 +1,146 @@
+"""Pool de connexions en mémoire du processus, avec métriques.
+
+Indépendant du pilote : ``connect`` crée une connexion, ``check`` vérifie
+qu'une connexion restée inactive est encore utilisable.
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Aucune connexion disponible avant l'expiration du délai"""
+
+
+class ConnectionPool:
+    def __init__(self, connect, max_size=10, max_overflow=5, timeout=10.0,
+                 recycle=None, check=None, check_interval=30.0):
+        self._connect = connect
+        self._check = check
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.check_interval = check_interval
+        # (connexion, créée à, rendue à), la plus récente à droite (LIFO)
+        self._idle = deque()
+        self._created = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self.metrics = {
+            'checkouts': 0,
+            'connects': 0,
+            'reconnects': 0,
+            'timeouts': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+        }
+
+    def _new_connection(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.metrics['connects'] += 1
+            self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def _is_stale(self, conn, returned_at):
+        now = time.monotonic()
+        age = now - self._created.get(id(conn), now)
+        if self.recycle is not None and age > self.recycle:
+            return True
+        if self._check is not None and now - returned_at > self.check_interval:
+            return not self._check(conn)
+        return False
+
+    def _discard(self, conn):
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def checkout(self):
+        """Emprunte une connexion ; ``PoolTimeout`` si le pool est plein"""
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._size < self.max_size + self.max_overflow:
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self.metrics['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'Pool plein ({self._size} connexions) '
+                        f'après {self.timeout}s'
+                    )
+                self._cond.wait(remaining)
+            waited = time.monotonic() - start
+            self.metrics['checkouts'] += 1
+            self.metrics['wait_time_total'] += waited
+            self.metrics['wait_time_max'] = max(
+                self.metrics['wait_time_max'], waited)
+
+        if conn is None:
+            return self._new_connection()
+        if self._is_stale(conn, returned_at):
+            self._discard(conn)
+            with self._cond:
+                self.metrics['reconnects'] += 1
+            return self._new_connection()
+        return conn
+
+    def checkin(self, conn, discard=False):
+        """Rend une connexion ; celles en débordement sont fermées"""
+        with self._cond:
+            if discard or self._size > self.max_size:
+                self._size -= 1
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                **self.metrics,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, factory):
+    """Pool du processus pour l'alias de base ``alias``"""
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = factory()
+        return _pools[alias]
+
+
+def pool_stats():
+    """Métriques de tous les pools, par alias"""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
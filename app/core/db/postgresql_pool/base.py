@@ -0,0 +1,66 @@
+"""Backend PostgreSQL qui emprunte ses connexions à un ``ConnectionPool``.
+
+ENGINE = 'core.db.postgresql_pool' ; options dans ``DATABASES[alias]['POOL']``.
+À utiliser avec ``CONN_MAX_AGE = 0`` : la connexion est rendue au pool à la
+fin de chaque requête au lieu d'être fermée.
+"""
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from core.db.pool import ConnectionPool, get_pool
+
+
+def _check(conn):
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_pool(self):
+        conf = self.settings_dict.get('POOL', {})
+        conn_params = self.get_connection_params()
+
+        def connect():
+            return base.DatabaseWrapper.get_new_connection(self, conn_params)
+
+        def factory():
+            return ConnectionPool(
+                connect=connect,
+                max_size=conf.get('MAX_SIZE', 10),
+                max_overflow=conf.get('MAX_OVERFLOW', 5),
+                timeout=conf.get('TIMEOUT', 10),
+                recycle=conf.get('RECYCLE'),
+                check=_check,
+                check_interval=conf.get('CHECK_INTERVAL', 30),
+            )
+        return get_pool(self.alias, factory)
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool().checkout()
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        # Connexion fermée en pleine transaction ou en erreur : on la jette
+        discard = (
+            self.in_atomic_block or self.errors_occurred or connection.closed
+        )
+        if not discard:
+            try:
+                status = connection.get_transaction_status()
+                if status != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except base.Database.Error:
+                discard = True
+        self.get_pool().checkin(connection, discard=discard)
@@ -0,0 +1,196 @@
+import base64
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BasePasswordHasher,
+    PBKDF2PasswordHasher,
+    get_hasher,
+    identify_hasher,
+    make_password,
+    mask_hash,
+)
+from django.db import connections, transaction
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+logger = logging.getLogger(__name__)
+
+
+def hash_param(name):
+    """Paramètre de coût du profil courant (``PASSWORD_HASH_PARAMS``)"""
+    return settings.PASSWORD_HASH_PARAMS[name]
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 avec un nombre d'itérations configurable"""
+
+    @property
+    def iterations(self):
+        return hash_param('PBKDF2_ITERATIONS')
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2 (argon2-cffi requis) avec des coûts configurables"""
+
+    @property
+    def time_cost(self):
+        return hash_param('ARGON2_TIME_COST')
+
+    @property
+    def memory_cost(self):
+        return hash_param('ARGON2_MEMORY_COST')
+
+    @property
+    def parallelism(self):
+        return hash_param('ARGON2_PARALLELISM')
+
+
+class ScryptPasswordHasher(BasePasswordHasher):
+    """scrypt (hashlib), même format que le hasher de Django 4.0"""
+    algorithm = 'scrypt'
+
+    @property
+    def work_factor(self):
+        return hash_param('SCRYPT_N')
+
+    @property
+    def block_size(self):
+        return hash_param('SCRYPT_R')
+
+    @property
+    def parallelism(self):
+        return hash_param('SCRYPT_P')
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(),
+            salt=salt.encode(),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r * p,
+            dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+    def decode(self, encoded):
+        (algorithm, work_factor, salt,
+         block_size, parallelism, hash_) = encoded.split('$', 6)
+        assert algorithm == self.algorithm
+        return {
+            'algorithm': algorithm,
+            'block_size': int(block_size),
+            'hash': hash_,
+            'parallelism': int(parallelism),
+            'salt': salt,
+            'work_factor': int(work_factor),
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(
+            password,
+            decoded['salt'],
+            decoded['work_factor'],
+            decoded['block_size'],
+            decoded['parallelism'],
+        )
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            _('algorithm'): decoded['algorithm'],
+            _('work factor'): decoded['work_factor'],
+            _('block size'): decoded['block_size'],
+            _('parallelism'): decoded['parallelism'],
+            _('salt'): mask_hash(decoded['salt']),
+            _('hash'): mask_hash(decoded['hash']),
+        }
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (
+            decoded['work_factor'] != self.work_factor
+            or decoded['block_size'] != self.block_size
+            or decoded['parallelism'] != self.parallelism
+        )
+
+    def harden_runtime(self, password, encoded):
+        pass
+
+
+def needs_rehash(encoded):
+    """Le hash doit-il être recalculé avec le hasher préféré ?"""
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher('default')
+    if hasher.algorithm != preferred.algorithm:
+        return True
+    return preferred.must_update(encoded)
+
+
+def rehash_password(user_id, old_encoded, raw_password):
+    """Remplace le hash si le mot de passe n'a pas changé entre-temps"""
+    User = get_user_model()
+    with transaction.atomic():
+        user = (
+            User.objects.select_for_update()
+            .filter(pk=user_id, password=old_encoded)
+            .first()
+        )
+        if user is None:
+            return False
+        user.set_password(raw_password)
+        user.save(update_fields=['password'])
+    return True
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rehash')
+
+
+def _rehash_in_background(user_id, old_encoded, raw_password):
+    try:
+        rehash_password(user_id, old_encoded, raw_password)
+    except Exception as e:
+        logger.warning(
+            "Échec du rehash du mot de passe de l'utilisateur %s : %s",
+            user_id, e,
+        )
+    finally:
+        connections.close_all()
+
+
+def schedule_rehash(user_id, old_encoded, raw_password):
+    """Planifie la mise à niveau du hash hors du chemin de la requête"""
+    if not settings.PASSWORD_REHASH_DEFERRED:
+        rehash_password(user_id, old_encoded, raw_password)
+        return
+    transaction.on_commit(
+        lambda: _executor.submit(
+            _rehash_in_background, user_id, old_encoded, raw_password,
+        )
+    )
+
+
+def benchmark_hasher(hasher, password='benchmark-password', rounds=5):
+    """Nombre de hashs par seconde pour ``hasher``"""
+    salt = hasher.salt()
+    start = time.perf_counter()
+    for i in range(rounds):
+        make_password(password, salt, hasher=hasher)
+    return rounds / (time.perf_counter() - start)
@@ -0,0 +1,232 @@
+"""Mesures par requête : SQL, hachage, sérialisation, rendu et e-mails.
+
+``InstrumentationMiddleware`` ouvre une mesure par requête ;
+``count_queries`` est installé sur chaque connexion à son ouverture
+(signal ``connection_created``, dans le thread qui l'utilise : sous ASGI
+les vues synchrones tournent hors de la boucle d'événements) et compte
+les requêtes SQL ; ``timed`` attribue une durée à une phase. Les temps
+sont exclusifs : une requête SQL lancée pendant la validation d'un
+serializer compte dans ``db``, pas dans ``serialize``.
+Le corps d'une réponse en streaming n'est pas mesuré.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from core import metrics
+from core.db.health import HEALTH_STATS
+from core.db.pool import pool_stats
+
+PHASES = ('db', 'hash', 'serialize', 'render', 'email')
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+REQUESTS = metrics.Counter(
+    'http_requests_total', 'Requêtes HTTP traitées.',
+    ('view', 'method', 'status'),
+)
+DURATION = metrics.Histogram(
+    'http_request_duration_seconds', 'Durée totale des requêtes HTTP.',
+    ('view',),
+)
+QUERIES = metrics.Histogram(
+    'http_request_db_queries', 'Requêtes SQL par requête HTTP.', ('view',),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+PHASE_DURATION = metrics.Histogram(
+    'http_request_phase_seconds', 'Temps exclusif par phase (db, hash, ...).',
+    ('view', 'phase'),
+)
+
+# Métriques de core.db.pool : nom Prometheus, type, fusion entre workers
+POOL_METRICS = {
+    'size': ('db_pool_connections', 'gauge', 'sum'),
+    'idle': ('db_pool_idle_connections', 'gauge', 'sum'),
+    'in_use': ('db_pool_in_use_connections', 'gauge', 'sum'),
+    'checkouts': ('db_pool_checkouts_total', 'counter', 'sum'),
+    'connects': ('db_pool_connects_total', 'counter', 'sum'),
+    'reconnects': ('db_pool_reconnects_total', 'counter', 'sum'),
+    'timeouts': ('db_pool_timeouts_total', 'counter', 'sum'),
+    'wait_time_total': ('db_pool_wait_seconds_total', 'counter', 'sum'),
+    'wait_time_max': ('db_pool_wait_seconds_max', 'gauge', 'max'),
+}
+
+
+def _pool_values(key):
+    return lambda: {
+        alias: stats[key] for alias, stats in pool_stats().items()
+    }
+
+
+POOL_SERIES = [
+    metrics.Collected(name, f'core.db.pool : {key}.', 'alias',
+                      _pool_values(key), kind, aggregate)
+    for key, (name, kind, aggregate) in POOL_METRICS.items()
+]
+HEALTH_CHECKS = metrics.Collected(
+    'db_health_checks_total',
+    'Connexions persistantes testées (core.db.health).',
+    'result',
+    lambda: {'checked': HEALTH_STATS['checks'],
+             'closed': HEALTH_STATS['closed']},
+    'counter',
+)
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Durées (secondes) et nombre de requêtes SQL d'une requête HTTP"""
+
+    def __init__(self):
+        self.phases = {}
+        self.queries = 0
+        # Temps passé dans les phases enfants, par niveau d'imbrication
+        self._children = [0.0]
+
+    def enter(self):
+        self._children.append(0.0)
+
+    def exit(self, phase, elapsed):
+        children = self._children.pop()
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed - children
+        self._children[-1] += elapsed
+
+    def server_timing(self, total):
+        """Valeur de l'en-tête ``Server-Timing`` (millisecondes)"""
+        db = self.phases.get('db', 0.0) * 1000
+        parts = [f'db;dur={db:.2f};desc="{self.queries} queries"']
+        for phase in PHASES[1:]:
+            if phase in self.phases:
+                parts.append(f'{phase};dur={self.phases[phase] * 1000:.2f}')
+        app = total - sum(self.phases.values())
+        parts.append(f'app;dur={app * 1000:.2f}')
+        parts.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(parts)
+
+
+def current_timings():
+    """Mesures de la requête en cours, ou None hors requête"""
+    return _current.get()
+
+
+@contextmanager
+def timed(phase):
+    """Attribue la durée du bloc à ``phase`` (sans effet hors requête)"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    timings.enter()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.exit(phase, time.perf_counter() - start)
+
+
+class TimedSerializerMixin:
+    """Validation et représentation d'un serializer, en phase ``serialize``"""
+
+    def is_valid(self, *args, **kwargs):
+        with timed('serialize'):
+            return super().is_valid(*args, **kwargs)
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+def count_queries(execute, sql, params, many, context):
+    """``execute_wrapper`` : nombre et durée des requêtes SQL"""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    timings.queries += 1
+    timings.enter()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.exit('db', time.perf_counter() - start)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """Receveur de ``connection_created`` : installe ``count_queries``.
+
+    Placé en tête : ``execute_wrapper()`` retire toujours le dernier
+    wrapper de la liste.
+    """
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_queries)
+
+
+def record(request, response, timings, total):
+    """Met à jour les métriques et ajoute l'en-tête ``Server-Timing``"""
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match is not None else 'unmatched'
+    method = request.method if request.method in METHODS else 'other'
+    REQUESTS.inc(view, method, str(response.status_code))
+    DURATION.observe(total, view)
+    QUERIES.observe(timings.queries, view)
+    for phase, value in timings.phases.items():
+        PHASE_DURATION.observe(value, view, phase)
+    if settings.INSTRUMENTATION['SERVER_TIMING']:
+        response['Server-Timing'] = timings.server_timing(total)
+    directory = settings.INSTRUMENTATION.get('METRICS_DIR')
+    if directory:
+        metrics.flush(directory,
+                      settings.INSTRUMENTATION['METRICS_FLUSH_INTERVAL'])
+
+
+class InstrumentationMiddleware:
+    """Mesure chaque requête (à placer en tête de ``MIDDLEWARE``)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Reconnu comme coroutine par Django (cf. MiddlewareMixin)
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.INSTRUMENTATION['ENABLED']:
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        record(request, response, timings, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.INSTRUMENTATION['ENABLED']:
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        record(request, response, timings, time.perf_counter() - start)
+        return response
+
+
+def render_metrics():
+    """Toutes les métriques, pools de connexions compris.
+
+    Avec ``METRICS_DIR``, celles de tous les workers gunicorn.
+    """
+    directory = settings.INSTRUMENTATION.get('METRICS_DIR')
+    return metrics.render_registry(directory=directory)
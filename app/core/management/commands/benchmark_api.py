@@ -0,0 +1,109 @@
+import json
+import platform
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+
+from core.benchmark import METRICS, SCENARIOS, ApiBenchmark, compare
+
+
+class Command(BaseCommand):
+    """Django command to load-test the users API against a baseline."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS,
+                            default=SCENARIOS)
+        parser.add_argument('--users', type=int, default=1000,
+                            help='Utilisateurs créés avant les mesures.')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requêtes mesurées par scénario.')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--output',
+                            help='Écrire les résultats JSON dans ce fichier.')
+        parser.add_argument('--baseline', help='Résultats JSON de référence.')
+        parser.add_argument('--metric', choices=METRICS, default='p95')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Dégradation tolérée par rapport à la '
+                                 'référence (0.2 = +20%%).')
+        parser.add_argument('--current-db', action='store_true',
+                            help='Utiliser la base courante (transaction '
+                                 "annulée) au lieu d'une base de test créée "
+                                 "pour l'occasion.")
+
+    def run_benchmark(self, options):
+        bench = ApiBenchmark(options['users'], options['requests'],
+                             options['warmup'])
+        results = {}
+        for name in options['scenarios']:
+            results[name] = stats = bench.run_scenario(name)
+            self.stdout.write(
+                f"{name:24} p50 {stats['p50']:9.2f} ms  "
+                f"p95 {stats['p95']:9.2f} ms  "
+                f"p99 {stats['p99']:9.2f} ms  "
+                f"{stats['sequential_rps']:9.1f} req/s (1 client)  "
+                f"erreurs {stats['errors']}"
+            )
+        return results
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+
+        overrides = {
+            'ALLOWED_HOSTS': ['*'],
+            'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+            # Le banc mesure les vues, pas la limitation de débit
+            'THROTTLE': dict(settings.THROTTLE, ENABLED=False),
+        }
+
+        with override_settings(**overrides):
+            if options['current_db']:
+                with transaction.atomic():
+                    results = self.run_benchmark(options)
+                    # Les données du banc ne sont jamais conservées
+                    transaction.set_rollback(True)
+            else:
+                old_name = connection.settings_dict['NAME']
+                connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False
+                )
+                try:
+                    results = self.run_benchmark(options)
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'meta': {
+                'database': connection.vendor,
+                'hasher': get_hasher().algorithm,
+                'python': platform.python_version(),
+                'users': options['users'],
+                'requests': options['requests'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options['metric'],
+                                  options['tolerance'])
+            if regressions:
+                raise CommandError('Régressions ({}) : {}'.format(
+                    options['metric'],
+                    ', '.join(f'{name} {ref:.2f} -> {value:.2f} ms'
+                              for name, ref, value in regressions),
+                ))
+            self.stdout.write(self.style.SUCCESS(
+                'Aucune régression par rapport à la référence'
+            ))
+        failed = [name for name, stats in results.items() if stats['errors']]
+        if failed:
+            raise CommandError(f"Réponses inattendues : {', '.join(failed)}")
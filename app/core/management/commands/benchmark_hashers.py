@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from core.hashers import benchmark_hasher
+
+
+class Command(BaseCommand):
+    """Django command to benchmark password hasher profiles."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('profiles', nargs='*',
+                            help='Profils à mesurer (défaut : tous).')
+        parser.add_argument('--rounds', type=int, default=5,
+                            help='Nombre de hashs calculés par profil.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        known = settings.PASSWORD_HASHER_PROFILES
+        profiles = options['profiles'] or list(known)
+        for name in profiles:
+            if name not in known:
+                raise CommandError(f'Profil inconnu : {name}')
+            hasher = import_string(known[name][0])()
+            try:
+                rate = benchmark_hasher(hasher, rounds=options['rounds'])
+            except ValueError as e:
+                # Dépendance optionnelle absente (argon2-cffi, bcrypt...)
+                self.stdout.write(
+                    f'{name:10} {hasher.algorithm:15} non disponible ({e})')
+                continue
+            self.stdout.write(
+                f'{name:10} {hasher.algorithm:15} {rate:12.1f} hashs/s  '
+                f'{1000 / rate:9.2f} ms/hash'
+            )
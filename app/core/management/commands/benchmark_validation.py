@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.validation import UserValidator, np
+from users.management.commands.benchmark_serializers import best_time
+from users.serializers import UserSerializer
+
+
+def sample_payloads(rows, today=None):
+    """Payloads d'inscription, un sur dix invalide (âge, date future, genre)"""
+    today = today or date.today()
+    payloads = []
+    for i in range(rows):
+        birth = date(1960, 1, 1) + timedelta(days=i * 37 % 15000)
+        genre = 'HF'[i % 2]
+        if i % 10 == 3:
+            birth = today - timedelta(days=365 * 5)
+        elif i % 10 == 6:
+            birth = today + timedelta(days=30)
+        elif i % 10 == 9:
+            genre = ''
+        payloads.append({
+            'email': f'bench{i}@example.com',
+            'password': 'benchpass123',
+            'name': f'Bench {i}',
+            'genre': genre,
+            'date_naissance': birth.isoformat(),
+        })
+    return payloads
+
+
+class Command(BaseCommand):
+    """Django command to benchmark user payload validation."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000,
+                            help='Nombre de payloads par mesure.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Meilleur temps sur N exécutions.')
+
+    def cases(self, payloads):
+        columns = {
+            'date_naissance': [p['date_naissance'] for p in payloads],
+            'genre': [p['genre'] for p in payloads],
+        }
+        cases = [
+            # Inclut la requête d'unicité de l'email
+            ('UserSerializer.is_valid',
+             lambda: [UserSerializer(data=p).is_valid() for p in payloads]),
+            ('validate (un validateur par payload)',
+             lambda: [UserValidator().validate(p) for p in payloads]),
+            ('validate_many', lambda: UserValidator().validate_many(payloads)),
+            ('validate_columns (listes)',
+             lambda: UserValidator().validate_columns(columns)),
+        ]
+        if np is not None:
+            arrays = {
+                'date_naissance': np.array(columns['date_naissance'],
+                                           dtype='datetime64[D]'),
+                'genre': columns['genre'],
+            }
+            cases.append(('validate_columns (NumPy)',
+                          lambda: UserValidator().validate_columns(arrays)))
+        return cases
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        rows = options['rows']
+        self.stdout.write(f"{rows} payloads, meilleur de {options['repeat']}")
+        for name, func in self.cases(sample_payloads(rows)):
+            elapsed, _ = best_time(func, options['repeat'])
+            per_payload = elapsed * 1e6 / rows
+            self.stdout.write(f'{name:38} {per_payload:9.2f} µs/payload')
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.schema import brotli, write_schema
+
+
+class Command(BaseCommand):
+    """Django command to precompute the OpenAPI schema (/api/schema/)."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=None,
+                            help='Répertoire de sortie (défaut : '
+                                 f'SCHEMA_DIR = {settings.SCHEMA_DIR}).')
+        parser.add_argument('--no-compress', action='store_true',
+                            help='Ne pas écrire les variantes gzip/brotli.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if brotli is None and not options['no_compress']:
+            self.stderr.write('brotli non installé : variantes .br ignorées')
+        written = write_schema(options['output_dir'],
+                               compress=not options['no_compress'])
+        for path in written:
+            self.stdout.write(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Schéma OpenAPI généré ({len(written)} fichiers)'
+        ))
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from core.query_audit import is_sequential_scan, known_queries, seed_users
+
+
+class Command(BaseCommand):
+    """Django command to EXPLAIN the project's hot queries."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Insérer N utilisateurs factices (annulé à la fin).')
+        parser.add_argument(
+            '--fail-on-seq-scan', action='store_true',
+            help='Échouer si un parcours séquentiel est détecté.')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        using = options['database']
+        connection = connections[using]
+        table = get_user_model()._meta.db_table
+        flagged = []
+
+        with transaction.atomic(using=using):
+            if options['seed']:
+                self.stdout.write(
+                    f"Insertion de {options['seed']} utilisateurs...")
+                seed_users(options['seed'])
+                quoted = connection.ops.quote_name(table)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE {quoted}')
+
+            explain_options = {}
+            if connection.vendor == 'postgresql':
+                explain_options['analyze'] = True
+            for name, queryset in known_queries().items():
+                plan = queryset.using(using).explain(**explain_options)
+                seq_scan = is_sequential_scan(plan, connection.vendor, table)
+                if seq_scan:
+                    flagged.append(name)
+                if seq_scan:
+                    status = self.style.ERROR('SEQ SCAN')
+                else:
+                    status = self.style.SUCCESS('OK')
+                self.stdout.write(f'== {name} [{status}]')
+                self.stdout.write(plan)
+
+            # Les données de test ne sont jamais conservées
+            transaction.set_rollback(True, using=using)
+
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(f"Parcours séquentiels : {', '.join(flagged)}")
+        self.stdout.write(
+            f'{len(flagged)} requête(s) avec parcours séquentiel')
@@ -0,0 +1,98 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.user_export import (
+    FORMATS,
+    TEXT_WRITERS,
+    iter_user_chunks,
+    parse_fields,
+    write_parquet,
+)
+
+
+class Command(BaseCommand):
+    """Django command to export users as CSV, NDJSON or Parquet."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', help="Fichier de sortie ('-' pour la sortie standard).")
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument(
+            '--fields',
+            help="Champs séparés par des virgules (ex. email,name,age).")
+        parser.add_argument(
+            '--after-id', type=int, default=0,
+            help='Exporter seulement les utilisateurs après cet id.')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help="Reprendre après le dernier id enregistré dans "
+                 "<output>.checkpoint.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            fields = parse_fields(options['fields'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        output = options['output']
+        fmt = options['format']
+        checkpoint = f'{output}.checkpoint' if output != '-' else None
+        after_id = options['after_id']
+        resuming = False
+        if options['resume']:
+            if checkpoint is None or fmt == 'parquet':
+                raise CommandError(
+                    "--resume nécessite un fichier de sortie CSV ou NDJSON.")
+            if os.path.exists(checkpoint):
+                with open(checkpoint) as f:
+                    after_id = int(f.read().strip() or 0)
+                resuming = True
+
+        state = {'count': 0, 'last_id': after_id}
+
+        def track(chunk):
+            state['count'] += len(chunk)
+            state['last_id'] = chunk[-1]['id']
+
+        chunks = iter_user_chunks(
+            fields, after_id=after_id, chunk_size=options['chunk_size'])
+
+        if fmt == 'parquet':
+            if output == '-':
+                raise CommandError(
+                    'Le format parquet nécessite un fichier de sortie.')
+            try:
+                write_parquet(output, chunks, fields, on_chunk=track)
+            except RuntimeError as e:
+                raise CommandError(str(e))
+        else:
+            self.write_text(
+                output, fmt, chunks, fields, track, checkpoint, resuming)
+
+        self.stderr.write(self.style.SUCCESS(
+            f"{state['count']} utilisateurs exportés "
+            f"(dernier id : {state['last_id']})"
+        ))
+
+    def write_text(self, output, fmt, chunks, fields, track, checkpoint,
+                   resuming):
+        def tracked():
+            for chunk in chunks:
+                yield chunk
+                track(chunk)
+                if checkpoint is not None:
+                    with open(checkpoint, 'w') as f:
+                        f.write(str(chunk[-1]['id']))
+
+        data = TEXT_WRITERS[fmt](tracked(), fields, header=not resuming)
+        if output == '-':
+            for part in data:
+                self.stdout.write(part.decode(), ending='')
+            return
+        with open(output, 'ab' if resuming else 'wb') as out:
+            for part in data:
+                out.write(part)
+                out.flush()
@@ -0,0 +1,80 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.user_import import (
+    UserImporter, detect_format, open_input, read_rows,
+)
+
+
+class Command(BaseCommand):
+    """Django command to bulk import users from CSV or NDJSON."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help="Fichier CSV/NDJSON ('-' pour l'entrée standard).")
+        parser.add_argument(
+            '--format', choices=['csv', 'ndjson'],
+            help="Format d'entrée (déduit de l'extension par défaut).")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--method', choices=['auto', 'copy', 'bulk'], default='auto',
+            help="COPY (PostgreSQL) ou bulk_create ; auto choisit selon la "
+                 "base.")
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Processus pour le hachage des mots de passe (0 = aucun '
+                 'pool).')
+        parser.add_argument(
+            '--unusable-passwords', action='store_true',
+            help="Ne pas hacher : comptes à activer par invitation.")
+        parser.add_argument(
+            '--rejects', help='Fichier CSV des lignes rejetées.')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        fmt = options['format'] or detect_format(options['path'])
+        importer = UserImporter(
+            batch_size=options['batch_size'],
+            method=options['method'],
+            workers=options['workers'],
+            unusable_passwords=options['unusable_passwords'],
+            using=options['database'],
+        )
+
+        rejects_file = writer = None
+        if options['rejects']:
+            rejects_file = open(
+                options['rejects'], 'w', newline='', encoding='utf-8')
+            writer = csv.writer(rejects_file)
+            writer.writerow(['line', 'email', 'errors'])
+
+        def on_reject(line_no, email, errors):
+            if writer is not None:
+                writer.writerow([line_no, email, ' | '.join(errors)])
+
+        def on_progress(imported, rejected):
+            self.stdout.write(
+                f'{imported + rejected} lignes traitées : '
+                f'{imported} importées, {rejected} rejetées')
+
+        try:
+            stream = open_input(options['path'])
+        except OSError as e:
+            raise CommandError(str(e))
+        try:
+            imported, rejected = importer.run(
+                read_rows(stream, fmt),
+                on_reject=on_reject, on_progress=on_progress,
+            )
+        finally:
+            if stream is not None and options['path'] != '-':
+                stream.close()
+            if rejects_file is not None:
+                rejects_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Import terminé ({importer.method}) : '
+            f'{imported} utilisateurs importés, {rejected} rejetés'
+        ))
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.admin_jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    """Worker qui exécute les actions de masse lancées depuis l'admin."""
+
+    def add_arguments(self, parser):
+        conf = settings.ADMIN_JOBS
+        parser.add_argument('--batch-size', type=int,
+                            default=conf['BATCH_SIZE'],
+                            help="Nombre d'ids par tranche (une "
+                                 'transaction par tranche).')
+        parser.add_argument('--loop', action='store_true',
+                            help='Tourner en continu au lieu de traiter '
+                                 'la file une fois.')
+        parser.add_argument('--interval', type=float,
+                            default=conf['POLL_INTERVAL'],
+                            help="Attente (secondes) quand aucune tâche "
+                                 "n'attend, avec --loop.")
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if not settings.TOKEN_AUTH_CACHE.get('SHARED_CACHE'):
+            # invalidate_users ne vide que le cache de ce processus
+            self.stderr.write(self.style.WARNING(
+                "TOKEN_AUTH_SHARED_CACHE non défini : les workers web gardent "
+                "les comptes désactivés en cache jusqu'au TTL."
+            ))
+        while True:
+            done = run_pending_jobs(batch_size=options['batch_size'])
+            if done:
+                self.stdout.write(f'Tâches traitées : {done}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS("File des tâches de l'admin traitée")
+        )
@@ -1,21 +1,129 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+import json
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
 from django.db.utils import OperationalError
 from psycopg2 import OperationalError as Psycopg2OpError
 
+
+class NotReady(Exception):
+    """La base répond mais n'est pas prête (migrations manquantes)."""
+
+
+def backoff_delay(attempt, base, maximum):
+    """Backoff exponentiel avec jitter : entre cap/2 et cap secondes."""
+    cap = min(maximum, base * 2 ** (attempt - 1))
+    return cap / 2 + random.uniform(0, cap / 2)
+
+
 class Command(BaseCommand):
     """Django command to wait for database."""
-    
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append', dest='databases',
+            help="Alias à attendre (répétable, défaut : default).")
+        parser.add_argument(
+            '--all-databases', action='store_true',
+            help='Attendre toutes les bases configurées, en parallèle.')
+        parser.add_argument(
+            '--timeout', type=float, default=None,
+            help='Abandon après N secondes (défaut : attendre indéfiniment).')
+        parser.add_argument('--base-delay', type=float, default=0.5)
+        parser.add_argument('--max-delay', type=float, default=10.0)
+        parser.add_argument(
+            '--migrations', action='store_true',
+            help='Attendre aussi que toutes les migrations soient '
+                 'appliquées.')
+        parser.add_argument('--json', action='store_true',
+                            help='Résultats en JSON (une ligne par base).')
+
+    def probe(self, alias, check_migrations):
+        """Vérifie qu'une base est prête : checks, SELECT 1, migrations."""
+        self.check(databases=[alias])
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if check_migrations:
+            executor = MigrationExecutor(connection)
+            plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+            if plan:
+                raise NotReady(f'{len(plan)} migration(s) non appliquée(s)')
+
+    def wait_for(self, alias, options, deadline):
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.probe(alias, options['migrations'])
+                return {
+                    'database': alias,
+                    'ready': True,
+                    'attempts': attempt,
+                    'elapsed': round(time.monotonic() - start, 3),
+                }
+            except (Psycopg2OpError, OperationalError, NotReady) as e:
+                delay = backoff_delay(
+                    attempt, options['base_delay'], options['max_delay'])
+                late = time.monotonic() + delay
+                if deadline is not None and late > deadline:
+                    return {
+                        'database': alias,
+                        'ready': False,
+                        'attempts': attempt,
+                        'elapsed': round(time.monotonic() - start, 3),
+                        'error': str(e),
+                    }
+                if not options['json']:
+                    self.stdout.write(
+                        f'Database {alias} indisponible, '
+                        f'attente {delay:.2f}s...')
+                time.sleep(delay)
+
+    def wait_in_thread(self, alias, options, deadline):
+        try:
+            return self.wait_for(alias, options, deadline)
+        finally:
+            connections.close_all()
+
     def handle(self, *args, **options):
         """Entrypoint for command."""
-        self.stdout.write('Waiting for db...')
-        db_up = False
-        while not db_up:
-            try:
-                self.check(databases=['default'])  
-                db_up = True
-            except (Psycopg2OpError, OperationalError):
-                self.stdout.write('Database indisponible, attente 1s...')
-                time.sleep(1)
-        
-        self.stdout.write(self.style.SUCCESS('Database disponible'))
\ No newline at end of file
+        if options['all_databases']:
+            aliases = list(connections)
+        else:
+            aliases = options['databases'] or ['default']
+        deadline = None
+        if options['timeout'] is not None:
+            deadline = time.monotonic() + options['timeout']
+
+        if not options['json']:
+            self.stdout.write('Waiting for db...')
+        start = time.monotonic()
+        if len(aliases) == 1:
+            results = [self.wait_for(aliases[0], options, deadline)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(aliases)) as pool:
+                results = list(pool.map(
+                    lambda alias: self.wait_in_thread(
+                        alias, options, deadline),
+                    aliases,
+                ))
+        elapsed = round(time.monotonic() - start, 3)
+
+        failed = [r['database'] for r in results if not r['ready']]
+        if options['json']:
+            for result in results:
+                self.stdout.write(json.dumps(result))
+            summary = {'ready': not failed, 'elapsed': elapsed}
+            self.stdout.write(json.dumps(summary))
+        if failed:
+            raise CommandError(
+                f"Database indisponible après {elapsed}s : "
+                f"{', '.join(failed)}")
+        if not options['json']:
+            self.stdout.write(
+                self.style.SUCCESS(f'Database disponible ({elapsed}s)'))
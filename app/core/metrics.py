@@ -0,0 +1,354 @@
+"""Compteurs et histogrammes en mémoire, au format texte de Prometheus.
+
+Sans ``METRICS_MULTIPROC_DIR``, les valeurs sont celles du processus qui
+répond au scrape (``runserver``, un seul worker). Derrière gunicorn,
+chaque worker écrit ses valeurs dans ce répertoire (``flush``, au plus
+une fois par ``METRICS_FLUSH_INTERVAL``) et le scrape, servi par
+n'importe quel worker, additionne tous les fichiers : les compteurs sont
+ceux de tout le serveur. Le master verse les compteurs d'un worker
+arrêté dans ``archive.json`` (``archive_process``, cf.
+``gunicorn.conf.py``) : les totaux restent monotones malgré le recyclage
+des workers (``max_requests``). Les jauges d'un worker arrêté sont
+abandonnées.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+ARCHIVE = 'archive.json'
+
+REGISTRY = []
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+# Fichier du processus (pid + instant du premier flush : jamais réutilisé)
+_process = {'pid': None, 'name': None, 'flushed': 0.0}
+
+
+def escape_label(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = (
+        '{}="{}"'.format(name, escape_label(value))
+        for name, value in zip(names, values)
+    )
+    return '{' + ','.join(pairs) + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def header(name, help_text, kind):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+
+
+class Counter:
+    archived = True
+    mode = 'sum'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        REGISTRY.append(self)
+
+    def inc(self, *labels, amount=1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def reset(self):
+        with _lock:
+            self._values.clear()
+
+    def snapshot(self):
+        with _lock:
+            return dict(self._values)
+
+    def render(self, values=None):
+        if values is None:
+            values = self.snapshot()
+        lines = header(self.name, self.help_text, 'counter')
+        for labels, value in sorted(values.items()):
+            suffix = format_labels(self.labels, labels)
+            lines.append(f'{self.name}{suffix} {format_value(value)}')
+        return lines
+
+
+class Histogram:
+    archived = True
+    mode = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [effectif par bucket (+Inf en dernier), somme]
+        self._values = {}
+        REGISTRY.append(self)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with _lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                counts = [0] * (len(self.buckets) + 1)
+                entry = self._values[labels] = [counts, 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, *labels):
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def reset(self):
+        with _lock:
+            self._values.clear()
+
+    def snapshot(self):
+        with _lock:
+            return {
+                labels: [list(counts), total]
+                for labels, (counts, total) in self._values.items()
+            }
+
+    def render(self, values=None):
+        if values is None:
+            values = self.snapshot()
+        names = self.labels + ('le',)
+        lines = header(self.name, self.help_text, 'histogram')
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                suffix = format_labels(names, labels + (format_value(bound),))
+                lines.append(f'{self.name}_bucket{suffix} {cumulative}')
+            suffix = format_labels(self.labels, labels)
+            lines.append(f'{self.name}_sum{suffix} {format_value(total)}')
+            lines.append(f'{self.name}_count{suffix} {cumulative}')
+        return lines
+
+
+class Collected:
+    """Série lue au scrape : ``collect()`` = {valeur du label: nombre}.
+
+    Entre processus, les compteurs s'additionnent ; les jauges sont
+    additionnées (ou ``aggregate='max'``) sur les workers vivants.
+    """
+
+    def __init__(self, name, help_text, label, collect, kind='gauge',
+                 aggregate='sum'):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.collect = collect
+        self.kind = kind
+        self.mode = aggregate
+        self.archived = kind == 'counter'
+        REGISTRY.append(self)
+
+    def snapshot(self):
+        return {(key,): value for key, value in self.collect().items()}
+
+    def render(self, values=None):
+        values = self.snapshot() if values is None else values
+        if not values:
+            return []
+        return render_gauges(
+            self.name, self.help_text, self.label,
+            {labels[0]: value for labels, value in values.items()}, self.kind,
+        )
+
+
+def render_gauges(name, help_text, label, values, kind='gauge'):
+    """Série calculée au scrape : ``values`` = {valeur du label: nombre}"""
+    lines = header(name, help_text, kind)
+    for key, value in sorted(values.items()):
+        suffix = format_labels((label,), (key,))
+        lines.append(f'{name}{suffix} {format_value(value)}')
+    return lines
+
+
+def _merge(mode, total, values):
+    for labels, value in values.items():
+        if labels not in total:
+            total[labels] = value
+        elif mode == 'histogram':
+            counts, current = total[labels]
+            total[labels] = [[a + b for a, b in zip(counts, value[0])],
+                             current + value[1]]
+        elif mode == 'max':
+            total[labels] = max(total[labels], value)
+        else:
+            total[labels] += value
+
+
+def _dump(metrics):
+    # Le mode de fusion est écrit avec les valeurs : le master, qui verse
+    # les workers arrêtés dans l'archive, n'a pas le registre
+    return {
+        metric.name: {
+            'mode': metric.mode,
+            'archived': metric.archived,
+            'values': [[list(labels), value]
+                       for labels, value in metric.snapshot().items()],
+        }
+        for metric in metrics
+    }
+
+
+def _load(data, totals):
+    """Ajoute un instantané ``_dump`` à ``totals``"""
+    for name, metric in data.items():
+        entry = totals.setdefault(name, dict(metric, values={}))
+        values = {tuple(labels): value for labels, value in metric['values']}
+        _merge(metric['mode'], entry['values'], values)
+
+
+def _write_json(path, data):
+    """Écriture atomique : un scrape ne lit jamais un fichier partiel"""
+    tmp = f'{path}.{os.getpid()}-{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _process_file():
+    pid = os.getpid()
+    if _process['pid'] != pid:
+        # Processus forké (preload) : nouveau fichier
+        _process.update(pid=pid, name=f'{pid}-{time.time_ns()}.json',
+                        flushed=0.0)
+    return _process['name']
+
+
+def write_snapshot(directory, name=None):
+    """Écrit les valeurs du processus dans ``directory``"""
+    _write_json(os.path.join(directory, name or _process_file()),
+                _dump(REGISTRY))
+
+
+def flush(directory, interval):
+    """``write_snapshot`` au plus une fois par ``interval`` secondes"""
+    now = time.monotonic()
+    _process_file()
+    if now - _process['flushed'] < interval:
+        return
+    # Un seul thread écrit ; les autres ne l'attendent pas
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        _process['flushed'] = now
+        write_snapshot(directory)
+    finally:
+        _flush_lock.release()
+
+
+def _read_archive(directory):
+    try:
+        return _read_json(os.path.join(directory, ARCHIVE))
+    except FileNotFoundError:
+        return {'merged': [], 'metrics': {}}
+
+
+def read_snapshots(directory):
+    """Valeurs de tous les workers : {nom: {'values': {labels: valeur}}}"""
+    for _ in range(5):
+        names = [n for n in os.listdir(directory)
+                 if n.endswith('.json') and n != ARCHIVE]
+        archive = _read_archive(directory)
+        totals = {}
+        _load(archive['metrics'], totals)
+        merged = set(archive['merged'])
+        try:
+            for name in names:
+                if name not in merged:
+                    _load(_read_json(os.path.join(directory, name)), totals)
+        except FileNotFoundError:
+            # Fichier versé dans l'archive pendant la lecture : on relit
+            continue
+        return totals
+    raise RuntimeError(f'Lecture instable des métriques de {directory}')
+
+
+def archive_process(directory, pid):
+    """Verse les compteurs du worker ``pid`` (arrêté) dans l'archive.
+
+    Appelé par le master seulement (hook ``child_exit``). L'archive est
+    écrite avant la suppression du fichier et note son nom : un scrape
+    concurrent ne le compte jamais deux fois.
+    """
+    names = set(os.listdir(directory))
+    dead = sorted(n for n in names if n.startswith(f'{pid}-')
+                  and n.endswith('.json'))
+    if not dead:
+        return
+    archive = _read_archive(directory)
+    totals = {}
+    _load(archive['metrics'], totals)
+    for name in dead:
+        _load(_read_json(os.path.join(directory, name)), totals)
+    data = {
+        name: dict(metric, values=[
+            [list(labels), value] for labels, value in metric['values'].items()
+        ])
+        for name, metric in totals.items() if metric['archived']
+    }
+    # Noms encore présents seulement : les fichiers supprimés sont oubliés
+    merged = [n for n in archive['merged'] if n in names] + dead
+    _write_json(os.path.join(directory, ARCHIVE),
+                {'merged': merged, 'metrics': data})
+    for name in dead:
+        os.remove(os.path.join(directory, name))
+
+
+def clear_directory(directory):
+    """Vide ``directory`` au démarrage du master (hook ``on_starting``)"""
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith(('.json', '.tmp')):
+            os.remove(os.path.join(directory, name))
+
+
+def render_registry(extra=(), directory=None):
+    """Texte d'exposition (``text/plain; version=0.0.4``).
+
+    Avec ``directory``, les valeurs de tous les workers (le processus
+    courant écrit d'abord les siennes).
+    """
+    totals = None
+    if directory:
+        write_snapshot(directory)
+        totals = read_snapshots(directory)
+    lines = []
+    for metric in REGISTRY:
+        values = None
+        if totals is not None:
+            values = totals.get(metric.name, {}).get('values', {})
+        lines.extend(metric.render(values))
+    for block in extra:
+        lines.extend(block)
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:47
+
+import core.models
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_auto_20250529_1406'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='date_naissance',
+            field=models.DateField(validators=[core.models.validate_age]),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='genre',
+            field=models.CharField(choices=[('H', 'Homme'), ('F', 'Femme')], max_length=1, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_superuser', False)), fields=['id'], name='core_user_nonsuper_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='core_user_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active', 'is_staff'], name='core_user_active_staff_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Recherche par préfixe de l'admin : ^email et ^name deviennent
+# UPPER(col::text) LIKE UPPER('x%') sur PostgreSQL
+INDEXES = {
+    'core_user_email_upper_like_idx': 'email',
+    'core_user_name_upper_like_idx': 'name',
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, column in INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+            f'ON core_user (UPPER({column}::text) text_pattern_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY : pas de verrou d'écriture sur la table, hors transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_token_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
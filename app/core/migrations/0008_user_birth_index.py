@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_adminjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_naissance'], name='core_user_birth_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:21
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_user_birth_index'),
+    ]
+
+    # Sans default à l'ajout : les comptes existants restent à NULL (date
+    # d'inscription inconnue) au lieu de recevoir la date de la migration
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='date_joined',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='date_joined',
+            field=models.DateTimeField(
+                blank=True, default=django.utils.timezone.now, null=True,
+            ),
+        ),
+    ]
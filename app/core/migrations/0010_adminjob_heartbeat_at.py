@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_user_date_joined'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adminjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
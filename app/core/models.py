@@ -1,4 +1,7 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, Q
+from django.db.models.functions import Lower
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -8,32 +11,58 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import date
 
+from core.ages import age_expression, age_on, birth_range
+from core.instrumentation import timed
+from core.validation import UserValidator
+
 def validate_age(date_naissance):
-    """Validation personnalisée pour vérifier l'âge minimum"""
-    today = date.today()
-    
-    # Vérifier que la date n'est pas dans le futur
-    if date_naissance > today:
-        raise ValidationError(
-            "La date de naissance ne peut pas être dans le futur."
-        )
-    
-    # Calculer l'âge
-    age = today.year - date_naissance.year
-    
-    # Ajuster si l'anniversaire n'est pas encore passé cette année
-    if today.month < date_naissance.month or \
-       (today.month == date_naissance.month and today.day < date_naissance.day):
-        age -= 1
-    
-    # Vérifier l'âge minimum
-    if age < 12:
-        raise ValidationError(
-            f"Vous devez avoir au moins 12 ans pour créer un compte. "
-            f"Vous avez actuellement {age} ans."
+    """Validateur du champ : date passée et âge minimum (core.validation)"""
+    error = UserValidator().birth_date_error(date_naissance)
+    if error:
+        raise ValidationError(error)
+
+
+class UserQuerySet(models.QuerySet):
+    def aged_between(self, min_age=None, max_age=None, today=None):
+        """Âge compris entre ``min_age`` et ``max_age`` ans (bornes incluses),
+        traduit en intervalle sur l'index de ``date_naissance``"""
+        return self.filter(**birth_range(min_age, max_age, today))
+
+    def with_age(self, today=None):
+        """Annote ``age``, calculé par la base"""
+        return self.annotate(age=age_expression(today=today))
+
+    def age_histogram(self, bucket_size=10, today=None):
+        """``{début de tranche: effectif}`` en une requête agrégée"""
+        rows = (
+            self.order_by()
+            .with_age(today)
+            .annotate(bucket=F('age') / bucket_size * bucket_size)
+            .values('bucket')
+            .annotate(count=Count('pk'))
+            .order_by('bucket')
         )
+        return {row['bucket']: row['count'] for row in rows}
+
+
+class UseManager(BaseUserManager.from_queryset(UserQuerySet)):
+    def email_iexact(self, email):
+        """Recherche insensible à la casse, servie par l'index lower(email)"""
+        return self.alias(email_lower=Lower('email')).filter(
+            email_lower=email.lower())
+
+    def find_by_email(self, email):
+        """Utilisateur pour un email saisi (casse libre), en une requête.
+
+        La correspondance exacte est prioritaire ; sinon l'unique
+        correspondance insensible à la casse, ou None si elle est ambiguë.
+        """
+        matches = list(self.email_iexact(email)[:10])
+        for user in matches:
+            if user.email == email:
+                return user
+        return matches[0] if len(matches) == 1 else None
 
-class UseManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         """Créer et retourner un nouvel utilisateur"""
         if not email:
@@ -81,38 +110,140 @@ class User(AbstractBaseUser, PermissionsMixin):
         validators=[validate_age]  # Ajouter la validation d'âge
     )
 
+    # NULL pour les comptes antérieurs à ce champ (date inconnue)
+    date_joined = models.DateTimeField(
+        default=timezone.now, null=True, blank=True,
+    )
+
+    # Incrémenté pour révoquer tous les jetons signés (users.tokens)
+    token_version = models.PositiveIntegerField(default=0)
+
     objects = UseManager()
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['name']
 
+    class Meta:
+        indexes = [
+            # get_users : non superusers parcourus par id (keyset)
+            models.Index(
+                fields=['id'],
+                condition=Q(is_superuser=False),
+                name='core_user_nonsuper_id_idx',
+            ),
+            # Recherches d'email insensibles à la casse
+            models.Index(Lower('email'), name='core_user_email_lower_idx'),
+            # Filtres de l'admin
+            models.Index(fields=['is_active', 'is_staff'],
+                         name='core_user_active_staff_idx'),
+            # Filtres et statistiques par âge (core.ages.birth_range)
+            models.Index(fields=['date_naissance'],
+                         name='core_user_birth_idx'),
+        ]
+
+    # Champs comptés par users.stats : valeurs lues en base conservées pour
+    # ne modifier que les compteurs concernés à la sauvegarde
+    STATS_FIELDS = ('genre', 'is_active', 'date_naissance', 'date_joined')
+
     def __str__(self):
         return self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_stats_fields()
+        return instance
+
+    def remember_stats_fields(self):
+        loaded = self.__dict__
+        if all(field in loaded for field in self.STATS_FIELDS):
+            self._stats_values = tuple(
+                loaded[field] for field in self.STATS_FIELDS
+            )
+
+    def set_password(self, raw_password):
+        with timed('hash'):
+            super().set_password(raw_password)
+
+    def check_password(self, raw_password):
+        with timed('hash'):
+            return super().check_password(raw_password)
+
+    def revoke_tokens(self):
+        """Invalide les jetons signés déjà émis (effectif à la sauvegarde)"""
+        self.token_version += 1
+
     def get_age(self):
         """Calculer et retourner l'âge de l'utilisateur"""
         if not self.date_naissance:
             return None
-        
-        today = date.today()
-        age = today.year - self.date_naissance.year
-        
-        if today.month < self.date_naissance.month or \
-           (today.month == self.date_naissance.month and today.day < self.date_naissance.day):
-            age -= 1
-        
-        return age
+        return age_on(self.date_naissance, date.today())
 
     def clean(self):
         """Validation au niveau du modèle"""
         super().clean()
-        
         # Pour les utilisateurs normaux, ces champs sont requis
         if not self.is_superuser:
-            if not self.date_naissance:
-                raise ValidationError({
-                    'date_naissance': 'La date de naissance est requise.'
-                })
-            if not self.genre:
-                raise ValidationError({
-                    'genre': 'Le genre est requis.'
-                })
\ No newline at end of file
+            errors = UserValidator().required_errors(
+                {'date_naissance': self.date_naissance, 'genre': self.genre}
+            )
+            if errors:
+                raise ValidationError(errors)
+
+
+class AdminJob(models.Model):
+    """Action de l'admin sur beaucoup d'utilisateurs, exécutée par le worker
+    ``run_admin_jobs`` par tranches d'id (``core.admin_jobs``)"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    choix_status = [
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_RUNNING, 'En cours'),
+        (STATUS_DONE, 'Terminée'),
+        (STATUS_FAILED, 'Échec'),
+    ]
+
+    action = models.CharField(max_length=30)
+    status = models.CharField(max_length=10, choices=choix_status,
+                              default=STATUS_PENDING)
+    # Ids ciblés, compressés en intervalles [[début, fin], ...]
+    id_ranges = models.JSONField(default=list)
+    # Dernier id traité : une tâche interrompue reprend après
+    cursor = models.BigIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    affected = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Bail du worker, prolongé à chaque tranche : une tâche « en cours » sans
+    # battement depuis ADMIN_JOBS['CLAIM_TIMEOUT'] est reprise par un autre
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=Q(status='pending'),
+                name='core_adminjob_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'#{self.pk} {self.action} ({self.status})'
+
+    @property
+    def progress(self):
+        """Avancement en pourcentage"""
+        if not self.total:
+            return 100 if self.status == self.STATUS_DONE else 0
+        return min(100, self.processed * 100 // self.total)
@@ -0,0 +1,82 @@
+"""Requêtes connues du projet et détection des parcours séquentiels."""
+import re
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+SEED_EMAIL = 'explain{}@example.com'
+SEED_PASSWORD = 'explain-password'
+# Quelques admins, comptes inactifs et superusers parmi les utilisateurs
+SEED_FLAGS = {
+    'is_staff': lambda i: i % 500 == 0,
+    'is_active': lambda i: i % 50 != 0,
+    'is_superuser': lambda i: i % 1000 == 0,
+}
+
+
+def known_queries():
+    """Requêtes chaudes de l'application, par nom"""
+    User = get_user_model()
+    probe = SEED_EMAIL.format(1)
+    return {
+        'get_users (page keyset)': (
+            User.objects.filter(is_superuser=False, id__gt=0)
+            .order_by('id').values('id', 'email', 'name')[:100]
+        ),
+        'request_password_reset (email exact)': (
+            User.objects.filter(email=probe)
+        ),
+        'email insensible à la casse': (
+            User.objects.email_iexact(probe.upper())
+        ),
+        'admin changelist (tri par id)': User.objects.order_by('id')[:100],
+        'admin recherche par préfixe (^email)': (
+            User.objects.filter(email__istartswith='EXPLAIN1')
+            .order_by('id')[:100]
+        ),
+        'utilisateurs de 18 à 25 ans': (
+            User.objects.aged_between(18, 25).values_list('id', flat=True)
+        ),
+        'admin filtres is_active/is_staff': (
+            User.objects.filter(is_active=False, is_staff=True)
+            .order_by('id')[:100]
+        ),
+    }
+
+
+def seed_users(count, email=SEED_EMAIL, name='Explain {}',
+               password=SEED_PASSWORD, batch_size=5000, **flags):
+    """Crée ``count`` utilisateurs factices (mot de passe haché une fois).
+
+    ``flags`` remplace les fonctions ``i -> valeur`` de ``SEED_FLAGS``.
+    """
+    User = get_user_model()
+    encoded = make_password(password)
+    flags = {**SEED_FLAGS, **flags}
+    User.objects.bulk_create(
+        (
+            User(
+                email=email.format(i),
+                name=name.format(i),
+                genre='HF'[i % 2],
+                date_naissance='1990-01-01',
+                password=encoded,
+                **{field: value(i) for field, value in flags.items()},
+            )
+            for i in range(count)
+        ),
+        batch_size=batch_size,
+    )
+
+
+def is_sequential_scan(plan, vendor, table):
+    """Le plan contient-il un parcours complet de ``table`` ?"""
+    if vendor == 'postgresql':
+        return re.search(rf'Seq Scan on {table}\b', plan) is not None
+    if vendor == 'sqlite':
+        return any(
+            re.search(rf'\bSCAN (TABLE )?{table}\b', line)
+            and 'USING' not in line
+            for line in plan.splitlines()
+        )
+    return False
@@ -0,0 +1,80 @@
+"""Encodage/décodage JSON rapide (orjson si installé, sinon json stdlib)."""
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+_encoder = JSONEncoder()
+# Dates et heures passent par l'encodeur DRF (millisecondes, suffixe Z)
+_ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+
+def dumps(data):
+    """Sérialise ``data`` en JSON compact (bytes), comme JSONRenderer"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_encoder.default,
+                            option=_ORJSON_OPTIONS)
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False,
+        separators=(',', ':'),
+    ).encode()
+
+
+def loads(data):
+    """Décode du JSON (bytes ou str) ; lève ValueError s'il est invalide"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` compact encodé par orjson.
+
+    Indentation demandée, ``COMPACT_JSON`` ou ``UNICODE_JSON`` désactivés :
+    rendu DRF standard.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        accepted_media_type = accepted_media_type or ''
+        renderer_context = renderer_context or {}
+        if (
+            not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context)
+        ):
+            with timed('render'):
+                return super().render(data, accepted_media_type,
+                                      renderer_context)
+        with timed('render'):
+            return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` décodé par orjson (corps UTF-8)"""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        utf8 = encoding.lower().replace('_', '-') in ('utf-8', 'utf8')
+        if orjson is None or not utf8:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson refuse NaN/Infinity, comme STRICT_JSON
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
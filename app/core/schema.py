@@ -0,0 +1,143 @@
+"""Schéma OpenAPI précalculé (commande ``build_schema``, vue ``schema``).
+
+Le document est généré une fois au build, en YAML et en JSON, avec des
+variantes gzip et brotli ; la vue sert ces octets tels quels avec un
+ETag, sans introspection des vues à chaque requête.
+"""
+import gzip
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+FORMATS = {
+    'yaml': 'application/vnd.oai.openapi',
+    'json': 'application/vnd.oai.openapi+json',
+}
+# Extension du fichier -> Content-Encoding, par ordre de préférence
+ENCODINGS = {'.br': 'br', '.gz': 'gzip'}
+
+
+def schema_path(fmt, directory=None):
+    return os.path.join(directory or settings.SCHEMA_DIR, f'openapi.{fmt}')
+
+
+def generate_schema():
+    """Document OpenAPI complet (dict), comme ``SpectacularAPIView``"""
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def render_schema(schema, fmt):
+    from drf_spectacular.renderers import (
+        OpenApiJsonRenderer, OpenApiYamlRenderer,
+    )
+
+    if fmt == 'json':
+        renderer = OpenApiJsonRenderer()
+    else:
+        renderer = OpenApiYamlRenderer()
+    return renderer.render(schema, renderer_context={})
+
+
+def compressed_variants(content):
+    """``{extension: octets}`` des variantes précompressées disponibles"""
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content, quality=11)
+    return variants
+
+
+def _write(path, content):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def write_schema(directory=None, compress=True):
+    """Écrit ``openapi.{yaml,json}`` et variantes ; retourne les chemins"""
+    directory = directory or settings.SCHEMA_DIR
+    os.makedirs(directory, exist_ok=True)
+    schema = generate_schema()
+    written = []
+    for fmt in FORMATS:
+        path = schema_path(fmt, directory)
+        content = render_schema(schema, fmt)
+        _write(path, content)
+        written.append(path)
+        # Une variante périmée (brotli désinstallé...) ne doit pas rester
+        for ext in ENCODINGS:
+            if os.path.exists(path + ext):
+                os.remove(path + ext)
+        if compress:
+            for ext, data in compressed_variants(content).items():
+                _write(path + ext, data)
+                written.append(path + ext)
+    return written
+
+
+class SchemaFile:
+    """Contenu d'un schéma et de ses variantes, chargé en mémoire"""
+
+    def __init__(self, path, content_type):
+        self.path = path
+        self.content_type = content_type
+        self.mtime = os.stat(path).st_mtime_ns
+        with open(path, 'rb') as f:
+            content = f.read()
+        self.etag = hashlib.sha256(content).hexdigest()[:32]
+        self.variants = {None: content}
+        for ext, encoding in ENCODINGS.items():
+            if os.path.exists(path + ext):
+                with open(path + ext, 'rb') as f:
+                    self.variants[encoding] = f.read()
+
+    def variant(self, accept_encoding):
+        """``(encoding, octets, etag)`` de la meilleure variante acceptée"""
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS.values():
+            if encoding in accepted and encoding in self.variants:
+                # ETag distinct par représentation (validateur fort)
+                etag = f'"{self.etag}-{encoding}"'
+                return encoding, self.variants[encoding], etag
+        return None, self.variants[None], f'"{self.etag}"'
+
+
+def accepted_encodings(header):
+    """Encodages de ``Accept-Encoding`` (hors ``q=0``)"""
+    accepted = set()
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        if not name:
+            continue
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def load_schema(fmt):
+    """``SchemaFile`` du format, relu s'il a changé ; None s'il n'existe pas"""
+    path = schema_path(fmt)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    schema = _loaded.get(path)
+    if schema is None or schema.mtime != mtime:
+        with _lock:
+            schema = _loaded[path] = SchemaFile(path, FORMATS[fmt])
+    return schema
@@ -1,8 +1,16 @@
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.test import Client
 
+from core.query_audit import seed_users
+from core.testing import QueryBudgetMixin
+
+
 class AdminTest(TestCase):
     def setUp(self):
         self.client=Client()
@@ -33,4 +41,84 @@ class AdminTest(TestCase):
             pass
 
 
+@override_settings(ADMIN_CHANGELIST={'PER_PAGE': 100, 'MAX_COUNT': 1000})
+class AdminPerformanceTests(QueryBudgetMixin, TestCase):
+    """Liste de l'admin sur une table de plusieurs milliers d'utilisateurs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_users(5000)
+        cls.admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='testpass123',
+            name='Admin', genre='F', date_naissance='1980-01-01',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        self.url = reverse('admin:core_user_changelist')
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(self.url, params)
+        return res, [q['sql'] for q in queries.captured_queries]
+
+    def test_no_full_count_and_keyset_pages(self):
+        res, queries = self.get()
+        self.assertEqual(res.status_code, 200)
+        cl = res.context['cl']
+        self.assertEqual(len(cl.result_list), 100)
+        self.assertTrue(cl.paginator.capped)
+        self.assertContains(res, '1000+')
+        counts = [sql for sql in queries if 'COUNT(' in sql]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT 1001', counts[0])
+        self.assertIn('after=', cl.next_url)
+
+        last_id = list(cl.result_list)[-1].pk
+        res, queries = self.get(after=last_id)
+        cl = res.context['cl']
+        self.assertEqual(list(cl.result_list)[0].pk, last_id + 1)
+        page_query = next(
+            sql for sql in queries
+            if sql.startswith('SELECT "core_user"') and 'LIMIT 100' in sql
+        )
+        self.assertIn(f'"core_user"."id" > {last_id}', page_query)
+        self.assertNotIn('OFFSET', page_query)
+        self.assertContains(res, '« Début')
+
+    def test_query_budget(self):
+        with self.assertQueryBudget(6):
+            self.client.get(self.url, {'after': 2500})
+
+    def test_estimated_count(self):
+        with patch('core.admin_pagination.estimated_row_count',
+                   return_value=500000):
+            res, _ = self.get()
+        self.assertTrue(res.context['cl'].paginator.estimated)
+        self.assertContains(res, '~500000')
+
+    def test_prefix_search(self):
+        res, queries = self.get(q='explain123')
+        results = {user.email for user in res.context['cl'].result_list}
+        self.assertIn('explain123@example.com', results)
+        self.assertIn('explain1234@example.com', results)
+        self.assertTrue(all(e.startswith('explain123') for e in results))
+        self.assertTrue(
+            any("LIKE 'EXPLAIN123%'" in sql.upper() for sql in queries)
+        )
+
+    def test_sorting_and_invalid_after(self):
+        res = self.client.get(self.url, {'o': '1'})
+        self.assertEqual(res.status_code, 200)
+        self.assertIsNone(res.context['cl'].next_url)
+        res = self.client.get(self.url, {'after': 'x'})
+        self.assertEqual(res.status_code, 302)
 
+    def test_change_form_widgets(self):
+        user = get_user_model().objects.filter(is_superuser=False).first()
+        url = reverse('admin:core_user_change', args=[user.pk])
+        res = self.client.get(url)
+        self.assertContains(res, 'admin-autocomplete')
+        # Ids saisis au lieu d'un <select> de toutes les permissions
+        self.assertContains(res, '<input type="text" name="user_permissions"')
+        self.assertNotContains(res, '<select name="user_permissions"')
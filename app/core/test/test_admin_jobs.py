@@ -0,0 +1,209 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.admin_jobs import (
+    DEACTIVATE,
+    PASSWORD_RESET,
+    claim_job,
+    compress_ids,
+    create_job,
+    run_job,
+    run_pending_jobs,
+    slices,
+)
+from core.models import AdminJob
+from core.query_audit import seed_users
+from users.authentication import cache_user, get_cached_user
+from users.models import PasswordResetOutbox
+
+
+class AdminJobEngineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_users(250)
+        cls.User = get_user_model()
+
+    def test_compress_and_slices(self):
+        self.assertEqual(compress_ids([1, 2, 3, 7, 9, 10]),
+                         [[1, 3], [7, 7], [9, 10]])
+        ranges = [[1, 5], [8, 9]]
+        self.assertEqual(list(slices(ranges, 0, 2)),
+                         [(1, 2), (3, 4), (5, 5), (8, 9)])
+        self.assertEqual(list(slices(ranges, 4, 2)), [(5, 5), (8, 9)])
+
+    def test_whole_table_is_one_range(self):
+        with self.assertNumQueries(2):
+            job = create_job(DEACTIVATE, self.User.objects.all())
+        self.assertEqual(len(job.id_ranges), 1)
+        self.assertEqual(job.total, 250)
+
+    def test_deactivate_in_chunks_without_signals(self):
+        users = self.User.objects.filter(is_active=True,
+                                         email__startswith='explain1')
+        target = set(users.values_list('pk', flat=True))
+        cached = self.User.objects.get(pk=min(target))
+        cache_user(cached)
+        job = create_job(DEACTIVATE, users)
+        self.assertEqual(job.total, len(target))
+
+        with patch.object(post_save, 'send') as send:
+            self.assertEqual(run_pending_jobs(batch_size=20), 1)
+        senders = {call.kwargs['sender'] for call in send.call_args_list}
+        self.assertNotIn(self.User, senders)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AdminJob.STATUS_DONE)
+        self.assertEqual((job.processed, job.affected, job.progress),
+                         (len(target), len(target), 100))
+        targets = self.User.objects.filter(pk__in=target)
+        self.assertFalse(targets.filter(is_active=True).exists())
+        # Jetons signés révoqués (instantanés d'autres processus périmés)
+        revoked = self.User.objects.filter(pk__in=target, token_version=1)
+        self.assertEqual(revoked.count(), len(target))
+        self.assertTrue(self.User.objects.filter(
+            email='explain2@example.com', is_active=True
+        ).exists())
+        # Cache d'authentification invalidé : l'instance est relue en base
+        self.assertFalse(get_cached_user(cached.pk).is_active)
+
+    def test_password_reset_enqueues_in_bulk(self):
+        first = self.User.objects.filter(is_active=True).first()
+        PasswordResetOutbox.objects.create(user=first)
+        job = create_job(PASSWORD_RESET, self.User.objects.all())
+        with CaptureQueriesContext(connection) as queries:
+            run_job(job, batch_size=100)
+        # Un INSERT groupé par tranche de 100 ids
+        inserts = [q['sql'] for q in queries.captured_queries
+                   if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        active = self.User.objects.filter(is_active=True).count()
+        self.assertEqual(job.affected, active)
+        pending = PasswordResetOutbox.objects.filter(
+            status=PasswordResetOutbox.STATUS_PENDING
+        )
+        self.assertEqual(pending.count(), active)
+
+    def test_failure_keeps_cursor(self):
+        job = create_job(DEACTIVATE, self.User.objects.all())
+        failure = [None, RuntimeError('boom')]
+        with patch('core.admin_jobs.invalidate_users', side_effect=failure), \
+                self.assertLogs('core.admin_jobs', 'ERROR'):
+            run_job(job, batch_size=100)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AdminJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'boom')
+        self.assertEqual(job.processed, 100)
+        # Reprise après le dernier id de la tranche validée
+        run_job(job, batch_size=100)
+        self.assertEqual(job.status, AdminJob.STATUS_DONE)
+        self.assertEqual(job.processed, 250)
+        self.assertFalse(self.User.objects.filter(is_active=True).exists())
+
+    def test_stale_running_job_is_reclaimed(self):
+        create_job(DEACTIVATE, self.User.objects.all())
+        dead = claim_job(lease=300)
+        failure = [None, RuntimeError('kill -9')]
+        with patch('core.admin_jobs.invalidate_users', side_effect=failure), \
+                self.assertLogs('core.admin_jobs', 'ERROR'):
+            run_job(dead, batch_size=100)
+        # Worker tué : la tâche reste « en cours » après la 1re tranche
+        jobs = AdminJob.objects.filter(pk=dead.pk)
+        jobs.update(status=AdminJob.STATUS_RUNNING)
+        self.assertIsNone(claim_job(lease=300))
+
+        jobs.update(heartbeat_at=timezone.now() - timedelta(seconds=301))
+        with self.assertLogs('core.admin_jobs', 'WARNING'):
+            job = claim_job(lease=300)
+        self.assertEqual((job.pk, job.cursor), (dead.pk, dead.cursor))
+        run_job(job, batch_size=100)
+        self.assertEqual((job.status, job.processed),
+                         (AdminJob.STATUS_DONE, 250))
+
+        # L'ancien worker, repris, n'écrit plus rien
+        with self.assertLogs('core.admin_jobs', 'WARNING'):
+            run_job(dead, batch_size=100)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed),
+                         (AdminJob.STATUS_DONE, 250))
+
+
+@override_settings(ADMIN_CHANGELIST={'PER_PAGE': 100, 'MAX_COUNT': 1000})
+class AdminActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_users(300)
+        cls.admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='testpass123',
+            name='Admin', genre='F', date_naissance='1980-01-01',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def test_select_all_returns_job_immediately(self):
+        res = self.client.post(reverse('admin:core_user_changelist'), {
+            'action': 'deactivate_users',
+            'select_across': '1',
+            'index': '0',
+            helpers.ACTION_CHECKBOX_NAME: ['1'],
+        }, follow=True)
+        job = AdminJob.objects.get()
+        self.assertContains(res, f'Tâche n°{job.pk}')
+        self.assertEqual(job.status, AdminJob.STATUS_PENDING)
+        self.assertEqual(job.total, 301)
+        # Rien n'est modifié avant le passage du worker
+        users = get_user_model().objects
+        self.assertEqual(users.filter(is_active=False).count(), 6)
+
+        run_pending_jobs()
+        self.assertEqual(
+            list(users.filter(is_active=True).values_list('pk', flat=True)),
+            [self.admin_user.pk],
+        )
+        url = reverse('admin:core_adminjob_change', args=[job.pk])
+        res = self.client.get(url)
+        self.assertContains(res, '100 % (301/301)')
+
+    def test_resume_failed_job(self):
+        job = AdminJob.objects.create(
+            action=DEACTIVATE, status=AdminJob.STATUS_FAILED, error='boom'
+        )
+        self.client.post(reverse('admin:core_adminjob_changelist'), {
+            'action': 'resume_jobs',
+            helpers.ACTION_CHECKBOX_NAME: [str(job.pk)],
+        })
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error),
+                         (AdminJob.STATUS_PENDING, ''))
+
+    def test_resume_only_failed_or_stale_jobs(self):
+        now = timezone.now()
+        expired = now - timedelta(hours=1)
+        # (statut, bail, statut après l'action)
+        cases = [
+            (AdminJob.STATUS_PENDING, None, AdminJob.STATUS_PENDING),
+            (AdminJob.STATUS_RUNNING, now, AdminJob.STATUS_RUNNING),
+            (AdminJob.STATUS_RUNNING, expired, AdminJob.STATUS_PENDING),
+            (AdminJob.STATUS_DONE, expired, AdminJob.STATUS_DONE),
+        ]
+        jobs = [
+            AdminJob.objects.create(action=DEACTIVATE, status=status,
+                                    heartbeat_at=heartbeat)
+            for status, heartbeat, _ in cases
+        ]
+        res = self.client.post(reverse('admin:core_adminjob_changelist'), {
+            'action': 'resume_jobs',
+            helpers.ACTION_CHECKBOX_NAME: [str(job.pk) for job in jobs],
+        }, follow=True)
+        self.assertContains(res, '1 tâche(s) remise(s) en file.')
+        statuses = [AdminJob.objects.get(pk=job.pk).status for job in jobs]
+        self.assertEqual(statuses, [expected for *_, expected in cases])
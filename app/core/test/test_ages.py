@@ -0,0 +1,111 @@
+from datetime import date
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.backends.postgresql.base import (
+    DatabaseWrapper as PostgresWrapper,
+)
+from django.test import SimpleTestCase, TestCase
+
+from core import ages
+from core.ages import age_on, birth_range, compute_ages
+
+TODAY = date(2025, 6, 15)
+BIRTHS = [
+    date(2013, 6, 15),  # 12 ans aujourd'hui
+    date(2013, 6, 16),  # 11 ans, anniversaire demain
+    date(2000, 2, 29),
+    date(1999, 12, 31),
+    date(1990, 1, 1),
+    date(1960, 6, 14),
+    date(1925, 7, 1),
+]
+
+
+class AgeFunctionsTests(SimpleTestCase):
+    def test_compute_ages(self):
+        expected = [12, 11, 25, 25, 35, 65, 99]
+        self.assertEqual(compute_ages(BIRTHS, TODAY), expected)
+        self.assertEqual(compute_ages(BIRTHS + [None], TODAY),
+                         expected + [None])
+
+    @skipUnless(ages.np is not None, 'NumPy non installé')
+    def test_numpy_matches_python(self):
+        births = [date(1900 + i % 120, 1 + i % 12, 1 + i % 28)
+                  for i in range(1000)]
+        births += [date(2000, 2, 29), None]
+        days = (TODAY, date(2024, 2, 29), date(2025, 2, 28), date(2025, 3, 1))
+        for today in days:
+            with patch.object(ages, 'NUMPY_MIN_SIZE', 0):
+                vectorized = compute_ages(births, today)
+            self.assertEqual(vectorized,
+                             [age_on(birth, today) for birth in births])
+
+    def test_birth_range(self):
+        lookups = birth_range(18, 25, TODAY)
+        self.assertEqual(lookups, {
+            'date_naissance__lte': date(2007, 6, 15),
+            'date_naissance__gt': date(1999, 6, 15),
+        })
+        self.assertEqual(birth_range(max_age=1, today=date(2024, 2, 29)),
+                         {'date_naissance__gt': date(2022, 2, 28)})
+
+
+class AgeQuerySetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        get_user_model().objects.bulk_create([
+            get_user_model()(email=f'age{i}@example.com', name=f'Age {i}',
+                             genre='F', date_naissance=birth)
+            for i, birth in enumerate(BIRTHS)
+        ])
+
+    def setUp(self):
+        self.users = get_user_model().objects
+
+    def test_aged_between(self):
+        with self.assertNumQueries(1):
+            users = self.users.aged_between(12, 35, today=TODAY)
+            emails = list(users.values_list('email', flat=True))
+        self.assertEqual(sorted(emails), [
+            'age0@example.com', 'age2@example.com',
+            'age3@example.com', 'age4@example.com',
+        ])
+        seniors = self.users.aged_between(min_age=65, today=TODAY)
+        self.assertEqual(seniors.count(), 2)
+        children = self.users.filter(genre='F').aged_between(max_age=11,
+                                                             today=TODAY)
+        self.assertEqual(children.count(), 1)
+
+    def test_with_age_matches_python(self):
+        rows = self.users.with_age(today=TODAY)
+        computed = dict(rows.values_list('date_naissance', 'age'))
+        self.assertEqual(computed,
+                         {birth: age_on(birth, TODAY) for birth in BIRTHS})
+
+    def test_age_histogram(self):
+        with self.assertNumQueries(1):
+            histogram = self.users.age_histogram(today=TODAY)
+        self.assertEqual(histogram, {10: 2, 20: 2, 30: 1, 60: 1, 90: 1})
+        # 10.0 == 10 : le type des clés (clés de users.stats) est vérifié
+        self.assertEqual({type(bucket) for bucket in histogram}, {int})
+        adults = self.users.aged_between(20, today=TODAY)
+        self.assertEqual(adults.age_histogram(50, TODAY), {0: 3, 50: 2})
+
+    def test_postgresql_age_is_integer(self):
+        """``EXTRACT`` rend un double sous PostgreSQL : tranche entière"""
+        settings = dict(connection.settings_dict, NAME='sql_only')
+        pg = PostgresWrapper(settings, alias='sql_only')
+        rows = self.users.order_by().with_age(today=TODAY).values('age')
+        sql, _ = rows.query.get_compiler(connection=pg).as_sql()
+        self.assertIn(
+            'CAST(EXTRACT(\'year\' FROM "core_user"."date_naissance") '
+            'AS integer)', sql,
+        )
+
+    def test_get_age(self):
+        user = self.users.get(email='age4@example.com')
+        self.assertEqual(user.get_age(),
+                         age_on(user.date_naissance, date.today()))
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from core.benchmark import compare, percentile, summarize
+
+
+class BenchmarkHelpersTests(SimpleTestCase):
+    def test_percentile(self):
+        values = [1, 2, 3, 4]
+        self.assertEqual(percentile(values, 50), 2.5)
+        self.assertEqual(percentile(values, 100), 4)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_summarize(self):
+        stats = summarize([0.001, 0.002, 0.003], errors=1, elapsed=0.5)
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['p50'], 2.0)
+        self.assertEqual(stats['sequential_rps'], 6.0)
+
+    def test_compare(self):
+        baseline = {'moi': {'p95': 10.0}, 'token': {'p95': 100.0}}
+        results = {'moi': {'p95': 13.0}, 'token': {'p95': 110.0},
+                   'create': {'p95': 5.0}}
+        self.assertEqual(compare(results, baseline, 'p95', 0.2),
+                         [('moi', 10.0, 13.0)])
+
+
+class BenchmarkCommandTests(TestCase):
+    def run_command(self, **options):
+        out = StringIO()
+        call_command(
+            'benchmark_api', users=5, requests=3, warmup=1, current_db=True,
+            stdout=out, **options
+        )
+        return out.getvalue()
+
+    def test_runs_every_scenario_and_rolls_back(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            self.run_command(output=output)
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(
+            set(report['results']),
+            {'create', 'token', 'moi', 'get_users',
+             'password_reset', 'password_reset_confirm'},
+        )
+        for stats in report['results'].values():
+            self.assertEqual(stats['errors'], 0)
+        self.assertEqual(get_user_model().objects.count(), 0)
+
+    def test_baseline_regression_fails(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+            with open(baseline, 'w') as f:
+                json.dump({'results': {'moi': {'p95': 0.0001}}}, f)
+            with self.assertRaises(CommandError):
+                self.run_command(scenarios=['moi'], baseline=baseline)
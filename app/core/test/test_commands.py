@@ -1,5 +1,7 @@
+import json
+from io import StringIO
 
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.db.utils import OperationalError
 from unittest.mock import patch
 
@@ -25,4 +27,49 @@ class CommandTest(TestCase):
 
         call_command('wait_for_db')
 
-        self.assertEqual(patched_check.call_count, 6)
\ No newline at end of file
+        self.assertEqual(patched_check.call_count, 6)
+
+    @patch('time.sleep', return_value=None)
+    @patch('core.management.commands.wait_for_db.Command.check')
+    def test_wait_for_db_timeout(self, patched_check, patched_sleep):
+        patched_check.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', timeout=0, stdout=StringIO())
+
+        self.assertEqual(patched_check.call_count, 1)
+
+    @patch('time.sleep', return_value=None)
+    @patch('core.management.commands.wait_for_db.Command.check')
+    def test_wait_for_db_backoff(self, patched_check, patched_sleep):
+        patched_check.side_effect = [OperationalError] * 4 + [True]
+
+        call_command('wait_for_db', base_delay=1, max_delay=4,
+                     stdout=StringIO())
+
+        delays = [c.args[0] for c in patched_sleep.call_args_list]
+        for delay, cap in zip(delays, [1, 2, 4, 4]):
+            self.assertGreaterEqual(delay, cap / 2)
+            self.assertLessEqual(delay, cap)
+
+    @patch('time.sleep', return_value=None)
+    @patch('core.management.commands.wait_for_db.MigrationExecutor')
+    def test_wait_for_db_migrations(self, patched_executor, patched_sleep):
+        executor = patched_executor.return_value
+        executor.migration_plan.side_effect = [['pending'], []]
+
+        call_command('wait_for_db', migrations=True, stdout=StringIO())
+
+        self.assertEqual(patched_sleep.call_count, 1)
+
+    def test_wait_for_db_json(self):
+        out = StringIO()
+
+        call_command('wait_for_db', json=True, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        result, summary = [json.loads(line) for line in lines]
+        self.assertEqual(result['database'], 'default')
+        self.assertTrue(result['ready'])
+        self.assertEqual(result['attempts'], 1)
+        self.assertTrue(summary['ready'])
@@ -0,0 +1,101 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import (
+    check_password,
+    get_hasher,
+    identify_hasher,
+    make_password,
+)
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.hashers import ScryptPasswordHasher, needs_rehash
+
+SCRYPT_PARAMS = {
+    'PBKDF2_ITERATIONS': 1000,
+    'SCRYPT_N': 2 ** 4,
+    'SCRYPT_R': 8,
+    'SCRYPT_P': 1,
+    'ARGON2_TIME_COST': 1,
+    'ARGON2_MEMORY_COST': 8,
+    'ARGON2_PARALLELISM': 1,
+}
+
+
+@override_settings(PASSWORD_HASH_PARAMS=SCRYPT_PARAMS)
+class HasherTests(TestCase):
+    def test_scrypt_round_trip(self):
+        encoded = make_password('secret123', hasher='scrypt')
+        self.assertTrue(encoded.startswith('scrypt$16$'))
+        self.assertTrue(check_password('secret123', encoded))
+        self.assertFalse(check_password('wrong', encoded))
+
+    def test_scrypt_must_update_when_cost_changes(self):
+        encoded = make_password('secret123', hasher='scrypt')
+        hasher = ScryptPasswordHasher()
+        self.assertFalse(hasher.must_update(encoded))
+        cheaper = {**SCRYPT_PARAMS, 'SCRYPT_N': 2 ** 5}
+        with self.settings(PASSWORD_HASH_PARAMS=cheaper):
+            self.assertTrue(hasher.must_update(encoded))
+
+    def test_tuned_pbkdf2_iterations(self):
+        encoded = make_password('secret123', hasher='pbkdf2_sha256')
+        self.assertEqual(encoded.split('$')[1], '1000')
+
+
+@override_settings(PASSWORD_HASH_PARAMS=SCRYPT_PARAMS)
+class DeferredRehashTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='hash@example.com',
+            password='unused',
+            name='Hash User',
+            date_naissance='2000-01-01',
+        )
+        # Ancien hash (PBKDF2) à migrer vers le hasher préféré
+        self.user.password = make_password(
+            'OldPass123!', hasher='pbkdf2_sha256')
+        self.user.save()
+        self.old_encoded = self.user.password
+
+    def test_login_does_not_rehash_inline(self):
+        self.assertTrue(needs_rehash(self.old_encoded))
+        with self.captureOnCommitCallbacks() as callbacks:
+            user = authenticate(
+                username='hash@example.com', password='OldPass123!')
+        self.assertEqual(user, self.user)
+        self.assertEqual(len(callbacks), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, self.old_encoded)
+
+    @override_settings(PASSWORD_REHASH_DEFERRED=False)
+    def test_rehash_upgrades_to_preferred_hasher(self):
+        authenticate(username='hash@example.com', password='OldPass123!')
+        self.user.refresh_from_db()
+        self.assertFalse(needs_rehash(self.user.password))
+        self.assertEqual(identify_hasher(self.user.password).algorithm,
+                         get_hasher().algorithm)
+        self.assertTrue(self.user.check_password('OldPass123!'))
+
+    def test_wrong_password_does_not_rehash(self):
+        with patch('core.backends.schedule_rehash') as schedule:
+            self.assertIsNone(
+                authenticate(username='hash@example.com', password='nope'))
+        schedule.assert_not_called()
+
+
+class HasherProfileTests(TestCase):
+    def test_md5_only_in_test_profile(self):
+        md5 = 'django.contrib.auth.hashers.MD5PasswordHasher'
+        for name, hashers in settings.PASSWORD_HASHER_PROFILES.items():
+            self.assertEqual(md5 in hashers, name == 'fast', name)
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_benchmark_hashers(self):
+        out = StringIO()
+        call_command('benchmark_hashers', 'fast', rounds=1, stdout=out)
+        self.assertIn('hashs/s', out.getvalue())
@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.ages import age_cutoff
+from core.user_import import validate_rows
+
+
+def row(email, genre, date_naissance):
+    return {'email': email, 'genre': genre, 'date_naissance': date_naissance}
+
+
+class ValidateRowsTests(TestCase):
+    def test_age_cutoff_leap_day(self):
+        self.assertEqual(age_cutoff(date(2024, 2, 29), min_age=1),
+                         date(2023, 2, 28))
+
+    def test_batch_validation(self):
+        today = date(2025, 6, 1)
+        rows = [
+            (2, row('ok@Example.com', 'F', '2013-06-01')),
+            (3, row('young@example.com', 'F', '2013-06-02')),
+            (4, row('future@example.com', 'H', '2026-01-01')),
+            (5, row('genre@example.com', 'X', '2000-01-01')),
+            (6, row('ok@example.com', 'H', 'hier')),
+            (7, row('taken@example.com', 'H', '2000-01-01')),
+        ]
+        valid, rejected = validate_rows(
+            rows, today=today, existing_emails={'taken@example.com'})
+        self.assertEqual([line for line, _ in valid], [2])
+        self.assertEqual(valid[0][1]['email'], 'ok@example.com')
+        errors = {line: errs for line, _, errs in rejected}
+        self.assertIn('12 ans', errors[3][0])
+        self.assertIn('futur', errors[4][0])
+        self.assertIn('genre', errors[5][0])
+        self.assertIn('Email déjà utilisé.', errors[6])
+        self.assertIn('Date de naissance invalide', errors[6][1])
+        self.assertIn('Email déjà utilisé.', errors[7])
+
+    def test_non_text_values_rejected_per_row(self):
+        rows = [
+            (1, {'email': 42, 'genre': True, 'date_naissance': 1.5,
+                 'password': 123}),
+            (2, row('a@b', 'H', '1990-01-01')),
+            (3, {'email': 'ok@example.com', 'name': 7, 'genre': 'F',
+                 'date_naissance': '1990-01-01'}),
+        ]
+        valid, rejected = validate_rows(rows, today=date(2025, 6, 1))
+        errors = {line: errs for line, _, errs in rejected}
+        self.assertEqual(len(errors[1]), 4)
+        self.assertEqual(errors[2], ['Email invalide.'])
+        self.assertEqual(valid[0][1]['name'], '7')
+
+
+class ImportUsersCommandTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_import_csv_with_rejects(self):
+        with open(self.path('users.csv'), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerows([
+                ['email', 'name', 'genre', 'date_naissance', 'password'],
+                ['a@example.com', 'A', 'F', '1990-01-01', 'Secret123!'],
+                ['b@example.com', 'B', 'H', '1991-02-02', ''],
+                ['c@example.com', 'C', 'F', date.today().isoformat(), 'x'],
+            ])
+
+        call_command(
+            'import_users', self.path('users.csv'),
+            batch_size=2, workers=2, rejects=self.path('rejects.csv'),
+            stdout=StringIO(),
+        )
+
+        User = get_user_model()
+        self.assertEqual(User.objects.count(), 2)
+        a = User.objects.get(email='a@example.com')
+        self.assertTrue(a.check_password('Secret123!'))
+        b = User.objects.get(email='b@example.com')
+        self.assertFalse(b.has_usable_password())
+        with open(self.path('rejects.csv')) as f:
+            rejects = list(csv.DictReader(f))
+        self.assertEqual([r['line'] for r in rejects], ['4'])
+        self.assertIn('12 ans', rejects[0]['errors'])
+
+    def test_import_ndjson_unusable_passwords(self):
+        with open(self.path('users.ndjson'), 'w') as f:
+            for i in range(3):
+                f.write(json.dumps({
+                    'email': f'n{i}@example.com', 'name': f'N{i}',
+                    'genre': 'H', 'date_naissance': '1985-05-05',
+                    'password': 'Secret123!',
+                }) + '\n')
+            f.write('pas du json\n')
+
+        out = StringIO()
+        call_command('import_users', self.path('users.ndjson'),
+                     unusable_passwords=True, stdout=out)
+
+        users = get_user_model().objects.filter(email__startswith='n')
+        self.assertEqual(users.count(), 3)
+        self.assertFalse(any(u.has_usable_password() for u in users))
+        self.assertIn('3 utilisateurs importés, 1 rejetés', out.getvalue())
+
+    def test_import_ndjson_non_text_email_rejected(self):
+        with open(self.path('users.ndjson'), 'w') as f:
+            for email in (123, 'ok@example.com'):
+                f.write(json.dumps({
+                    'email': email, 'name': 'N', 'genre': 'F',
+                    'date_naissance': '1985-05-05', 'password': 'Secret123!',
+                }) + '\n')
+
+        out = StringIO()
+        call_command('import_users', self.path('users.ndjson'),
+                     rejects=self.path('rejects.csv'), stdout=out)
+
+        emails = get_user_model().objects.values_list('email', flat=True)
+        self.assertEqual(list(emails), ['ok@example.com'])
+        self.assertIn('1 utilisateurs importés, 1 rejetés', out.getvalue())
+        with open(self.path('rejects.csv')) as f:
+            rejects = list(csv.DictReader(f))
+        self.assertEqual([r['line'] for r in rejects], ['1'])
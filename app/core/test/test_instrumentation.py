@@ -0,0 +1,222 @@
+import os
+import shutil
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import (
+    AsyncClient, SimpleTestCase, TestCase, override_settings,
+)
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.db import pool
+from core.instrumentation import (
+    DURATION,
+    QUERIES,
+    REQUESTS,
+    RequestTimings,
+    _current,
+    render_metrics,
+    timed,
+)
+from core.testing import QueryBudgetMixin
+
+INSTRUMENTATION = {
+    'ENABLED': True, 'SERVER_TIMING': True,
+    'METRICS_TOKEN': None, 'METRICS_PUBLIC': True,
+}
+
+
+class FakeConnection:
+    def close(self):
+        pass
+
+
+class MetricsTests(SimpleTestCase):
+    def test_histogram_exposition(self):
+        histogram = metrics.Histogram('test_seconds', 'Test.', ('view',),
+                                      buckets=(0.1, 1))
+        metrics.REGISTRY.remove(histogram)
+        histogram.observe(0.05, 'a')
+        histogram.observe(0.5, 'a')
+        histogram.observe(5, 'a')
+        lines = histogram.render()
+        self.assertIn('test_seconds_bucket{view="a",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{view="a",le="1"} 2', lines)
+        self.assertIn('test_seconds_bucket{view="a",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count{view="a"} 3', lines)
+        self.assertIn('test_seconds_sum{view="a"} 5.55', lines)
+
+    def test_workers_share_a_directory(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        counter = metrics.Counter('test_shared_total', 'Test.', ('view',))
+        histogram = metrics.Histogram('test_shared_seconds', 'Test.',
+                                      ('view',), buckets=(1,))
+        gauge = metrics.Collected('test_shared_gauge', 'Test.', 'alias',
+                                  lambda: {'a': 2})
+        for metric in (counter, histogram, gauge):
+            self.addCleanup(metrics.REGISTRY.remove, metric)
+        # Autre worker (pid 1)
+        counter.inc('a', amount=2)
+        histogram.observe(0.5, 'a')
+        metrics.write_snapshot(directory, name='1-0.json')
+        counter.reset()
+        histogram.reset()
+        counter.inc('a')
+        histogram.observe(5, 'a')
+
+        output = metrics.render_registry(directory=directory)
+        self.assertIn('test_shared_total{view="a"} 3', output)
+        self.assertIn('test_shared_seconds_bucket{view="a",le="1"} 1',
+                      output)
+        self.assertIn('test_shared_seconds_count{view="a"} 2', output)
+        self.assertIn('test_shared_gauge{alias="a"} 4', output)
+
+        # Worker 1 arrêté : compteurs archivés, jauge abandonnée
+        metrics.archive_process(directory, 1)
+        self.assertNotIn('1-0.json', os.listdir(directory))
+        output = metrics.render_registry(directory=directory)
+        self.assertIn('test_shared_total{view="a"} 3', output)
+        self.assertIn('test_shared_seconds_count{view="a"} 2', output)
+        self.assertIn('test_shared_gauge{alias="a"} 2', output)
+
+    def test_label_escaping(self):
+        self.assertEqual(metrics.format_labels(('v',), ('a"b\\',)),
+                         '{v="a\\"b\\\\"}')
+
+    def test_timed_phases_are_exclusive(self):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            timings.enter()
+            with timed('hash'):
+                pass
+            timings.exit('serialize', 1.0)
+        finally:
+            _current.reset(token)
+        self.assertLess(timings.phases['hash'], 0.5)
+        self.assertAlmostEqual(
+            timings.phases['serialize'] + timings.phases['hash'], 1.0
+        )
+
+    def test_timed_outside_request(self):
+        with timed('hash'):
+            pass
+        self.assertIsNone(_current.get())
+
+    def test_pool_metrics(self):
+        test_pool = pool.get_pool(
+            'metrics-test',
+            lambda: pool.ConnectionPool(FakeConnection, max_size=2),
+        )
+        try:
+            test_pool.checkin(test_pool.checkout())
+            output = render_metrics()
+        finally:
+            pool._pools.pop('metrics-test')
+        labels = '{alias="metrics-test"}'
+        self.assertIn(f'db_pool_checkouts_total{labels} 1', output)
+        self.assertIn(f'db_pool_idle_connections{labels} 1', output)
+
+
+@override_settings(INSTRUMENTATION=INSTRUMENTATION)
+class MiddlewareTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='timing@example.com',
+            password='testpass123',
+            name='Timing',
+            genre='H',
+            date_naissance='1990-01-01',
+        )
+        self.client = APIClient()
+
+    def test_server_timing_and_metrics(self):
+        before = REQUESTS.value('user:token', 'POST', '200')
+        count = DURATION.count('user:token')
+        res = self.client.post(
+            reverse('user:token'),
+            {'email': self.user.email, 'password': 'testpass123'},
+        )
+        self.assertEqual(res.status_code, 200)
+        timing = res['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        for phase in ('hash', 'serialize', 'render', 'total'):
+            self.assertIn(f'{phase};dur=', timing)
+        self.assertEqual(REQUESTS.value('user:token', 'POST', '200'),
+                         before + 1)
+        self.assertEqual(DURATION.count('user:token'), count + 1)
+        self.assertGreaterEqual(QUERIES.count('user:token'), 1)
+
+    def test_async_view(self):
+        token = Token.objects.create(user=self.user)
+        res = self.client.get(reverse('user:async_moi'),
+                              HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('total;dur=', res['Server-Timing'])
+
+    async def test_sync_view_over_asgi(self):
+        """Vue synchrone servie en ASGI : requêtes SQL du thread de la vue"""
+        token = await sync_to_async(Token.objects.create)(user=self.user)
+        # Django 3.2 : les arguments nommés sont les en-têtes ASGI
+        res = await AsyncClient().get(
+            reverse('user:moi'), authorization=f'Token {token.key}',
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertRegex(res['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+    def test_server_timing_disabled(self):
+        disabled = dict(INSTRUMENTATION, SERVER_TIMING=False)
+        with override_settings(INSTRUMENTATION=disabled):
+            res = self.client.post(reverse('user:token'), {})
+        self.assertNotIn('Server-Timing', res)
+
+    def test_metrics_endpoint(self):
+        self.client.post(reverse('user:token'), {})
+        res = self.client.get(reverse('metrics'))
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(
+            'http_requests_total'
+            '{view="user:token",method="POST",status="400"}',
+            res.content.decode(),
+        )
+
+    def test_metrics_dir(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        shared = dict(INSTRUMENTATION, METRICS_DIR=directory,
+                      METRICS_FLUSH_INTERVAL=0)
+        with override_settings(INSTRUMENTATION=shared):
+            self.client.post(reverse('user:token'), {})
+            self.assertEqual(len(os.listdir(directory)), 1)
+            res = self.client.get(reverse('metrics'))
+        self.assertIn(
+            'http_requests_total'
+            '{view="user:token",method="POST",status="400"}',
+            res.content.decode(),
+        )
+
+    def test_metrics_token(self):
+        protected = dict(INSTRUMENTATION, METRICS_TOKEN='secret')
+        with override_settings(INSTRUMENTATION=protected):
+            res = self.client.get(reverse('metrics'))
+            self.assertEqual(res.status_code, 401)
+            res = self.client.get(reverse('metrics'),
+                                  HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(res.status_code, 200)
+
+    def test_metrics_closed_by_default(self):
+        closed = dict(INSTRUMENTATION, METRICS_PUBLIC=False)
+        with override_settings(INSTRUMENTATION=closed):
+            res = self.client.get(reverse('metrics'))
+        self.assertEqual(res.status_code, 403)
+
+    def test_query_budget_exceeded(self):
+        with self.assertRaises(AssertionError) as cm:
+            with self.assertQueryBudget(0):
+                get_user_model().objects.count()
+        self.assertIn('1 requêtes SQL pour un budget de 0', str(cm.exception))
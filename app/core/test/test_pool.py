@@ -0,0 +1,199 @@
+import threading
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from psycopg2 import extensions
+from rest_framework.test import APIClient
+
+from core.db import health, pool as pools
+from core.db.pool import ConnectionPool, PoolTimeout
+from core.db.postgresql_pool import base as pool_backend
+
+PASSWORD_RESET_URL = reverse('user:password_reset')
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.usable = True
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def make_pool(self, **kwargs):
+        return ConnectionPool(connect=FakeConnection, **kwargs)
+
+    def test_connection_is_reused(self):
+        pool = self.make_pool(max_size=2)
+        first = pool.checkout()
+        pool.checkin(first)
+        self.assertIs(pool.checkout(), first)
+        stats = pool.stats()
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['connects'], 1)
+
+    def test_overflow_connections_are_closed(self):
+        pool = self.make_pool(max_size=1, max_overflow=1)
+        a, b = pool.checkout(), pool.checkout()
+        pool.checkin(b)
+        self.assertTrue(b.closed)
+        pool.checkin(a)
+        self.assertFalse(a.closed)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_timeout_when_exhausted(self):
+        pool = self.make_pool(max_size=1, max_overflow=0, timeout=0.05)
+        pool.checkout()
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiter_gets_returned_connection(self):
+        pool = self.make_pool(max_size=1, max_overflow=0, timeout=2)
+        conn = pool.checkout()
+        threading.Timer(0.05, pool.checkin, args=[conn]).start()
+        self.assertIs(pool.checkout(), conn)
+        self.assertGreater(pool.stats()['wait_time_max'], 0)
+
+    def test_unhealthy_idle_connection_is_replaced(self):
+        pool = self.make_pool(check=lambda conn: conn.usable, check_interval=0)
+        conn = pool.checkout()
+        conn.usable = False
+        pool.checkin(conn)
+        fresh = pool.checkout()
+        self.assertIsNot(fresh, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['reconnects'], 1)
+
+
+class PersistentConnectionTests(TransactionTestCase):
+    """Signaux de requête envoyés à la main : le client de test
+    déconnecte ``close_old_connections`` pendant ses requêtes."""
+
+    def setUp(self):
+        max_age = connection.settings_dict['CONN_MAX_AGE']
+        self.addCleanup(
+            connection.settings_dict.__setitem__, 'CONN_MAX_AGE', max_age)
+        # close_at est fixé à l'ouverture de la connexion
+        connection.close()
+
+    def request_cycle(self):
+        request_started.send(sender=self.__class__)
+        connection.ensure_connection()
+        request_finished.send(sender=self.__class__)
+
+    def test_connection_reused_across_requests(self):
+        connection.settings_dict['CONN_MAX_AGE'] = 60
+        self.request_cycle()
+        raw = connection.connection
+        self.request_cycle()
+        self.assertIsNotNone(raw)
+        self.assertIs(connection.connection, raw)
+
+    def test_connection_closed_without_max_age(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('base SQLite en mémoire : jamais fermée')
+        connection.settings_dict['CONN_MAX_AGE'] = 0
+        self.request_cycle()
+        self.assertIsNone(connection.connection)
+
+
+class FakePgConnection(FakeConnection):
+    isolation_level = extensions.ISOLATION_LEVEL_READ_COMMITTED
+
+    def __init__(self):
+        super().__init__()
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class PoolBackendTests(SimpleTestCase):
+    """``core.db.postgresql_pool`` avec des connexions psycopg2 simulées"""
+
+    def setUp(self):
+        alias = f'pool_test_{id(self)}'
+        self.addCleanup(pools._pools.pop, alias, None)
+        self.db = pool_backend.DatabaseWrapper({
+            'NAME': 'test', 'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '',
+            'OPTIONS': {}, 'CONN_MAX_AGE': 0, 'AUTOCOMMIT': True,
+            'TIME_ZONE': None,
+            'POOL': {'MAX_SIZE': 1, 'MAX_OVERFLOW': 0, 'CHECK_INTERVAL': 3600},
+        }, alias)
+        connect = patch.object(
+            pool_backend.base.DatabaseWrapper, 'get_new_connection',
+            side_effect=lambda *args: FakePgConnection(),
+        )
+        connect.start()
+        self.addCleanup(connect.stop)
+
+    def open(self):
+        params = self.db.get_connection_params()
+        self.db.connection = self.db.get_new_connection(params)
+        return self.db.connection
+
+    def test_connection_returned_to_pool(self):
+        raw = self.open()
+        self.db._close()
+        self.assertFalse(raw.closed)
+        self.assertIs(self.open(), raw)
+        stats = self.db.get_pool().stats()
+        self.assertEqual((stats['connects'], stats['checkouts']), (1, 2))
+
+    def test_open_transaction_rolled_back_before_reuse(self):
+        raw = self.open()
+        raw.status = extensions.TRANSACTION_STATUS_INTRANS
+        self.db._close()
+        self.assertEqual(raw.rollbacks, 1)
+        self.assertIs(self.open(), raw)
+
+    def test_connection_in_atomic_block_discarded(self):
+        raw = self.open()
+        self.db.in_atomic_block = True
+        self.db._close()
+        self.assertTrue(raw.closed)
+        self.assertEqual(self.db.get_pool().stats()['size'], 0)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL requis')
+class PoolBackendPostgresTests(TransactionTestCase):
+    def test_real_connection_reused(self):
+        alias = 'pool_it'
+        db = pool_backend.DatabaseWrapper(
+            {**connection.settings_dict, 'ENGINE': 'core.db.postgresql_pool'},
+            alias,
+        )
+        self.addCleanup(pools._pools.pop, alias, None)
+        self.addCleanup(lambda: db.get_pool().close_all())
+        with db.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = db.connection
+        db.close()
+        self.assertIsNone(db.connection)
+        with db.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(db.connection, raw)
+        db.close()
+
+
+class HealthCheckTests(TransactionTestCase):
+    def test_health_check_runs_on_request_start(self):
+        connection.ensure_connection()
+        connection.settings_dict['HEALTH_CHECK_INTERVAL'] = 0
+        self.addCleanup(connection.settings_dict.pop, 'HEALTH_CHECK_INTERVAL')
+        checks = health.HEALTH_STATS['checks']
+        APIClient().post(PASSWORD_RESET_URL, {})
+        self.assertEqual(health.HEALTH_STATS['checks'], checks + 1)
+        self.assertIsNotNone(connection.connection)
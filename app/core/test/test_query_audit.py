@@ -0,0 +1,52 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.query_audit import is_sequential_scan
+
+
+class EmailLookupTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email='Case@example.com', password='testpass123',
+            date_naissance='2000-01-01',
+        )
+
+    def test_email_iexact(self):
+        users = get_user_model().objects.email_iexact('CASE@EXAMPLE.COM')
+        self.assertEqual(list(users), [self.user])
+
+    def test_find_by_email_prefers_exact_match(self):
+        User = get_user_model()
+        other = User.objects.create_user(
+            email='case@example.com', password='testpass123',
+            date_naissance='2000-01-01',
+        )
+        find = User.objects.find_by_email
+        self.assertEqual(find('case@example.com'), other)
+        self.assertEqual(find('Case@example.com'), self.user)
+        self.assertIsNone(User.objects.find_by_email('CASE@example.com'))
+        self.assertIsNone(User.objects.find_by_email('absent@example.com'))
+
+
+class ExplainQueriesCommandTests(TestCase):
+    def test_plans_are_reported_and_seed_rolled_back(self):
+        out = StringIO()
+        call_command('explain_queries', seed=300, stdout=out)
+        self.assertIn('get_users (page keyset)', out.getvalue())
+        self.assertEqual(get_user_model().objects.count(), 0)
+
+    def test_is_sequential_scan(self):
+        def seq_scan(plan, vendor):
+            return is_sequential_scan(plan, vendor, 'core_user')
+
+        self.assertTrue(seq_scan(
+            'Seq Scan on core_user  (cost=0.00..1.01)', 'postgresql'))
+        self.assertFalse(seq_scan(
+            'Index Scan using core_user_pkey on core_user', 'postgresql'))
+        self.assertTrue(seq_scan('2 0 0 SCAN core_user', 'sqlite'))
+        self.assertFalse(seq_scan(
+            '2 0 0 SEARCH core_user USING INDEX x (id>?)', 'sqlite'))
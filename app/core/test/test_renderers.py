@@ -0,0 +1,89 @@
+import io
+import os
+import runpy
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import NotAcceptable, ParseError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BrowsableAPIRenderer, TemplateHTMLRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from app import settings as project_settings
+from core.renderers import FastJSONParser
+from users.views import ManageApiView
+
+
+def renderer_classes(debug):
+    """Renderers calculés par settings.py pour DEBUG=``debug``"""
+    with patch.dict(os.environ, {'DEBUG': '1' if debug else '0'}):
+        values = runpy.run_path(project_settings.__file__)
+    paths = values['REST_FRAMEWORK']['DEFAULT_RENDERER_CLASSES']
+    return [import_string(path) for path in paths]
+
+
+class RendererSettingsTests(TestCase):
+    def test_debug_keeps_browsable_api(self):
+        self.assertIn(BrowsableAPIRenderer, renderer_classes(debug=True))
+
+    def test_production_renderers_never_touch_templates(self):
+        classes = renderer_classes(debug=False)
+        for renderer_class in classes:
+            self.assertFalse(issubclass(
+                renderer_class, (BrowsableAPIRenderer, TemplateHTMLRenderer)
+            ))
+            self.assertNotEqual(renderer_class.format, 'html')
+
+        request = Request(
+            APIRequestFactory().get('/', HTTP_ACCEPT='text/html')
+        )
+        renderers = [r() for r in classes]
+        with self.assertRaises(NotAcceptable):
+            DefaultContentNegotiation().select_renderer(request, renderers)
+
+        with patch('rest_framework.renderers.loader') as loader:
+            for renderer in renderers:
+                renderer.render({'email': 'a@example.com'},
+                                'application/json', {})
+        loader.get_template.assert_not_called()
+        loader.select_template.assert_not_called()
+
+    def test_html_request_in_production_gets_no_template(self):
+        user = get_user_model().objects.create_user(
+            email='html@example.com',
+            password='testpass123',
+            name='Html',
+            genre='F',
+            date_naissance='1990-01-01',
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        production = renderer_classes(debug=False)
+        with patch.object(ManageApiView, 'renderer_classes', production), \
+                patch('rest_framework.renderers.loader') as loader:
+            res = client.get(reverse('user:moi'),
+                             HTTP_ACCEPT='text/html,*/*;q=0.8')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'application/json')
+        loader.get_template.assert_not_called()
+
+
+class FastJSONParserTests(TestCase):
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body), 'application/json',
+                            {'encoding': 'utf-8'})
+
+    def test_same_result_as_json_parser(self):
+        body = '{"email": "é@example.com", "n": [1, 2.5, null, true]}'.encode()
+        self.assertEqual(self.parse(FastJSONParser(), body),
+                         self.parse(JSONParser(), body))
+
+    def test_invalid_json(self):
+        for body in (b'{"email": ', b'{"n": NaN}'):
+            with self.assertRaises(ParseError):
+                self.parse(FastJSONParser(), body)
@@ -0,0 +1,75 @@
+import gzip
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core.schema import accepted_encodings
+
+SCHEMA_URL = reverse('api-schema')
+
+
+class SchemaViewTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        call_command('build_schema', output_dir=cls.directory,
+                     stdout=StringIO(), stderr=StringIO())
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def get(self, url=SCHEMA_URL, **headers):
+        with override_settings(SCHEMA_DIR=self.directory):
+            return self.client.get(url, **headers)
+
+    def test_serves_precomputed_yaml(self):
+        res = self.get()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'application/vnd.oai.openapi')
+        self.assertTrue(res.content.startswith(b'openapi: 3'))
+        self.assertIn('ETag', res)
+
+    def test_json_format(self):
+        responses = (self.get(SCHEMA_URL + '?format=json'),
+                     self.get(HTTP_ACCEPT='application/json'))
+        for res in responses:
+            self.assertEqual(res['Content-Type'],
+                             'application/vnd.oai.openapi+json')
+            paths = json.loads(res.content)['paths']
+            self.assertIn('/api/user/create/', paths)
+
+    def test_gzip_variant(self):
+        plain = self.get()
+        res = self.get(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotEqual(res['ETag'], plain['ETag'])
+        self.assertIn('Accept-Encoding', res['Vary'])
+
+    def test_if_none_match(self):
+        etag = self.get()['ETag']
+        res = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b'')
+
+    @override_settings(SCHEMA_DIR='/nonexistent/schema', DEBUG=False)
+    def test_missing_schema_in_production(self):
+        self.assertEqual(self.client.get(SCHEMA_URL).status_code, 503)
+
+    @override_settings(SCHEMA_DIR='/nonexistent/schema', DEBUG=True)
+    def test_live_fallback_in_debug(self):
+        res = self.client.get(SCHEMA_URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(b'/api/user/create/', res.content)
+
+    def test_accepted_encodings(self):
+        self.assertEqual(accepted_encodings('br;q=0, gzip;q=0.5'), {'gzip'})
+        self.assertEqual(accepted_encodings(None), set())
@@ -0,0 +1,123 @@
+from datetime import date
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from core import validation
+from core.validation import (
+    BIRTH_FUTURE, BIRTH_INVALID, BIRTH_REQUIRED, GENRE_INVALID, GENRE_REQUIRED,
+    UserValidator,
+)
+from users.serializers import UserSerializer
+
+TODAY = date(2025, 6, 15)
+ROWS = [
+    {'genre': 'H', 'date_naissance': '1990-01-01'},
+    {'genre': 'F', 'date_naissance': date(2013, 6, 15)},  # 12 ans aujourd'hui
+    {'genre': 'F', 'date_naissance': '2013-06-16'},  # 11 ans
+    {'genre': 'X', 'date_naissance': '2026-01-01'},
+    {'genre': '', 'date_naissance': 'hier'},
+    {'genre': None, 'date_naissance': None},
+]
+
+
+class UserValidatorTests(SimpleTestCase):
+    def setUp(self):
+        self.validator = UserValidator(TODAY)
+
+    def test_validate(self):
+        errors = self.validator.validate_many(ROWS)
+        self.assertEqual(errors[:2], [{}, {}])
+        self.assertIn('11 ans', errors[2]['date_naissance'])
+        self.assertEqual(errors[3], {'date_naissance': BIRTH_FUTURE,
+                                     'genre': GENRE_INVALID})
+        self.assertEqual(errors[4], {'date_naissance': BIRTH_INVALID,
+                                     'genre': GENRE_REQUIRED})
+        self.assertEqual(errors[5], {'date_naissance': BIRTH_REQUIRED,
+                                     'genre': GENRE_REQUIRED})
+
+    def test_partial(self):
+        validate = self.validator.validate
+        self.assertEqual(validate({'name': 'x'}, partial=True), {})
+        self.assertEqual(validate({'genre': 'X'}, partial=True),
+                         {'genre': GENRE_INVALID})
+
+    def test_clean_birth_date(self):
+        clean = self.validator.clean_birth_date
+        self.assertEqual(clean(' 1990-01-01 '), (date(1990, 1, 1), None))
+        self.assertEqual(clean('1990-13-01'), (None, BIRTH_INVALID))
+
+    def test_columns_match_rows(self):
+        columns = {field: [row[field] for row in ROWS]
+                   for field in ('genre', 'date_naissance')}
+        rows = self.validator.validate_many(ROWS)
+        expected = {i: errors for i, errors in enumerate(rows) if errors}
+        self.assertEqual(self.validator.validate_columns(columns), expected)
+
+    @skipUnless(validation.np is not None, 'NumPy non installé')
+    def test_numpy_columns(self):
+        np = validation.np
+        births = np.array(
+            ['1990-01-01', '2013-06-15', '2013-06-16', '2026-01-01', 'NaT'],
+            dtype='datetime64[D]',
+        )
+        errors = self.validator.validate_columns({'date_naissance': births})
+        self.assertEqual(sorted(errors), [2, 3, 4])
+        self.assertIn('11 ans', errors[2]['date_naissance'])
+        self.assertEqual(errors[3]['date_naissance'], BIRTH_FUTURE)
+        self.assertEqual(errors[4]['date_naissance'], BIRTH_REQUIRED)
+
+
+class SharedRulesTests(TestCase):
+    def payload(self, **kwargs):
+        return {'email': 'val@example.com', 'password': 'testpass123',
+                'name': 'Val', 'genre': 'H', 'date_naissance': '1990-01-01',
+                **kwargs}
+
+    def test_serializer_checks_age_once(self):
+        with patch.object(UserValidator, 'clean_birth_date', autospec=True,
+                          side_effect=UserValidator.clean_birth_date) as check:
+            self.assertTrue(UserSerializer(data=self.payload()).is_valid())
+        self.assertEqual(check.call_count, 1)
+
+    def test_serializer_messages(self):
+        today = date.today().isoformat()
+        serializer = UserSerializer(data=self.payload(date_naissance=today))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('12 ans', serializer.errors['date_naissance'][0])
+        serializer = UserSerializer(data=self.payload(genre=None))
+        self.assertFalse(serializer.is_valid())
+        # Messages de l'API inchangés
+        self.assertEqual(serializer.errors['genre'], ['Le genre est requis.'])
+
+    def test_partial_update_keeps_required_fields(self):
+        user = get_user_model().objects.create_user(
+            email='val@example.com', password='testpass123', name='Val',
+            genre='F', date_naissance=date(1990, 1, 1),
+        )
+        serializer = UserSerializer(user, data={'name': 'Nouveau'},
+                                    partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_fields_built_once(self):
+        first, second = UserSerializer().fields, UserSerializer().fields
+        self.assertEqual(list(first), list(second))
+        self.assertIsNot(first['email'], second['email'])
+
+    def test_model_clean(self):
+        user = get_user_model()(email='val@example.com', name='Val')
+        with self.assertRaises(ValidationError) as ctx:
+            user.clean()
+        self.assertEqual(set(ctx.exception.message_dict),
+                         {'genre', 'date_naissance'})
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_validation', rows=20, repeat=1, stdout=out)
+        self.assertIn('UserSerializer.is_valid', out.getvalue())
+        self.assertIn('validate_columns', out.getvalue())
@@ -0,0 +1,34 @@
+"""Outils de test : budgets de requêtes SQL par endpoint."""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """Assertions de budget SQL pour les ``TestCase``.
+
+    Contrairement à ``assertNumQueries``, le budget est un maximum :
+    une optimisation ne casse pas le test, une régression si.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context)
+        if executed > max_queries:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}'
+                for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'{executed} requêtes SQL pour un budget de '
+                      f'{max_queries} :\n{queries}')
+
+    def assertEndpointBudget(self, max_queries, method, url, client=None,
+                             **kwargs):
+        """Appelle l'endpoint et vérifie son budget ; retourne la réponse"""
+        client = client or self.client
+        with self.assertQueryBudget(max_queries):
+            response = getattr(client, method.lower())(url, **kwargs)
+        return response
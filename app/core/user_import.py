@@ -0,0 +1,240 @@
+"""Import en masse d'utilisateurs (commande ``import_users``).
+
+Les lignes sont lues en streaming, validées par lots (une seule date
+limite calculée par lot, une seule requête pour les doublons), les mots
+de passe sont hachés dans un pool de processus, puis chaque lot est
+chargé avec ``COPY`` (PostgreSQL) ou ``bulk_create``.
+"""
+import csv
+import io
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connections, transaction
+
+from core.validation import UserValidator
+from users.stats import adjust as adjust_stats, count_users
+
+
+def open_input(path):
+    if path == '-':
+        return sys.stdin
+    return open(path, newline='', encoding='utf-8')
+
+
+def detect_format(path):
+    return 'ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+def read_rows(stream, fmt):
+    """Génère ``(numéro de ligne, dict)`` depuis un flux CSV ou NDJSON"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = {'__error__': 'JSON invalide.'}
+        if not isinstance(row, dict):
+            row = {'__error__': 'Objet JSON attendu.'}
+        yield line_no, row
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def text(value):
+    """Valeur d'une cellule en texte (NDJSON : nombres, booléens...)"""
+    return '' if value is None else str(value).strip()
+
+
+def validate_rows(rows, today=None, existing_emails=()):
+    """Valide un lot de ``(ligne, dict)``.
+
+    Retourne ``(valides, rejets)`` : ``valides`` est une liste de
+    ``(ligne, données nettoyées)``, ``rejets`` une liste de
+    ``(ligne, email, erreurs)``.
+    """
+    validator = UserValidator(today)
+    seen = set(existing_emails)
+    valid, rejected = [], []
+
+    for line_no, row in rows:
+        errors = []
+        if '__error__' in row:
+            rejected.append((line_no, '', [row['__error__']]))
+            continue
+
+        email = BaseUserManager.normalize_email(text(row.get('email')))
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append("Email invalide.")
+        else:
+            if email in seen:
+                errors.append("Email déjà utilisé.")
+
+        genre = text(row.get('genre'))
+        error = validator.genre_error(genre)
+        if error:
+            errors.append(error)
+        birth, error = validator.clean_birth_date(row.get('date_naissance'))
+        if error:
+            errors.append(error)
+
+        password = row.get('password') or None
+        if password is not None and not isinstance(password, str):
+            errors.append("Mot de passe invalide.")
+
+        if errors:
+            rejected.append((line_no, email, errors))
+            continue
+        seen.add(email)
+        valid.append((line_no, {
+            'email': email,
+            'name': text(row.get('name')),
+            'genre': genre,
+            'date_naissance': birth,
+            'password': password,
+        }))
+    return valid, rejected
+
+
+def existing_emails(emails, using='default'):
+    User = get_user_model()
+    found = User.objects.using(using).filter(email__in=list(emails))
+    return set(found.values_list('email', flat=True))
+
+
+def hash_passwords(passwords, pool=None):
+    """Hache les mots de passe (``None`` -> mot de passe inutilisable)"""
+    if pool is None:
+        return [make_password(p) for p in passwords]
+    return list(pool.map(make_password, passwords, chunksize=64))
+
+
+def build_users(cleaned, hashes):
+    User = get_user_model()
+    users = []
+    for data, encoded in zip(cleaned, hashes):
+        data = dict(data)
+        data.pop('password')
+        users.append(User(password=encoded, **data))
+    return users
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+def copy_users(users, using='default'):
+    """Charge les utilisateurs avec ``COPY ... FROM STDIN`` (PostgreSQL)"""
+    User = get_user_model()
+    connection = connections[using]
+    fields = [f for f in User._meta.concrete_fields if not f.primary_key]
+    buffer = io.StringIO()
+    for user in users:
+        buffer.write('\t'.join(
+            _copy_value(
+                f.get_db_prep_save(getattr(user, f.attname), connection))
+            for f in fields
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
+    columns = ', '.join(connection.ops.quote_name(f.column) for f in fields)
+    table = connection.ops.quote_name(User._meta.db_table)
+    with connection.cursor() as cursor:
+        sql = f'COPY {table} ({columns}) FROM STDIN'
+        cursor.cursor.copy_expert(sql, buffer)
+
+
+def load_users(users, method, using='default'):
+    if method == 'copy':
+        copy_users(users, using=using)
+    else:
+        manager = get_user_model().objects.using(using)
+        manager.bulk_create(users, batch_size=1000)
+
+
+class UserImporter:
+    """Pipeline lecture -> validation -> hachage -> chargement, par lots"""
+
+    def __init__(self, batch_size=5000, method='auto', workers=0,
+                 unusable_passwords=False, using='default'):
+        self.batch_size = batch_size
+        self.using = using
+        if method == 'auto':
+            postgresql = connections[using].vendor == 'postgresql'
+            method = 'copy' if postgresql else 'bulk'
+        self.method = method
+        self.workers = workers
+        self.unusable_passwords = unusable_passwords
+        self.imported = 0
+        self.rejected = 0
+
+    def run(self, rows, on_reject=None, on_progress=None):
+        pool = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+        try:
+            for batch in batched(rows, self.batch_size):
+                emails = [
+                    BaseUserManager.normalize_email(text(row.get('email')))
+                    for _, row in batch
+                ]
+                taken = existing_emails(emails, using=self.using)
+                valid, rejected = validate_rows(batch, existing_emails=taken)
+                if valid:
+                    cleaned = [data for _, data in valid]
+                    if self.unusable_passwords:
+                        passwords = [None] * len(cleaned)
+                    else:
+                        passwords = [data['password'] for data in cleaned]
+                    hashes = hash_passwords(passwords, pool)
+                    users = build_users(cleaned, hashes)
+                    with transaction.atomic(using=self.using):
+                        load_users(users, self.method, using=self.using)
+                        # Pas de signal post_save : compteurs ajustés par lot
+                        incremental = settings.USER_STATS['INCREMENTAL']
+                        if incremental and self.using == 'default':
+                            adjust_stats(count_users(users))
+                self.imported += len(valid)
+                self.rejected += len(rejected)
+                if on_reject is not None:
+                    for reject in rejected:
+                        on_reject(*reject)
+                if on_progress is not None:
+                    on_progress(self.imported, self.rejected)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.imported, self.rejected
@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.db import connections
+
+
+def estimated_row_count(model, using='default'):
+    """Nombre de lignes estimé par PostgreSQL (pg_class.reltuples).
+
+    Retourne None si la base n'est pas PostgreSQL ou si la table
+    n'a jamais été analysée.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def approximate_count(queryset, cache_key, mode='cached', timeout=60):
+    """Compte approximatif d'un queryset, sans COUNT(*) à chaque appel.
+
+    - ``exact``    : COUNT(*) classique
+    - ``cached``   : COUNT(*) mis en cache pendant ``timeout`` secondes
+    - ``estimate`` : estimation PostgreSQL de la table, sinon ``cached``
+    """
+    if mode == 'exact':
+        return queryset.count()
+    if mode == 'estimate':
+        estimate = estimated_row_count(queryset.model, using=queryset.db)
+        if estimate is not None:
+            return estimate
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, timeout)
+    return count
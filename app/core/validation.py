@@ -0,0 +1,126 @@
+"""Règles de validation des données utilisateur, écrites une seule fois.
+
+``UserSerializer``, le modèle (``validate_age``, ``User.clean``) et
+l'import en masse passent par ``UserValidator``. La date du jour et la
+date limite d'âge sont calculées à la création du validateur : un lot ne
+les calcule qu'une fois, et une date valide ne coûte qu'une comparaison
+(l'âge n'est calculé que pour le message d'erreur).
+
+Entrées acceptées : un dict (``validate``), une liste de dicts
+(``validate_many``) ou des colonnes, listes ou tableaux NumPy
+(``validate_columns``).
+"""
+from datetime import date
+
+from core.ages import MIN_AGE, age_cutoff, age_on
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle
+    np = None
+
+GENRES = frozenset(['H', 'F'])
+BIRTH_REQUIRED = "La date de naissance est requise."
+BIRTH_INVALID = "Date de naissance invalide (AAAA-MM-JJ)."
+BIRTH_FUTURE = "La date de naissance ne peut pas être dans le futur."
+GENRE_REQUIRED = "Le genre est requis."
+GENRE_INVALID = "Le genre doit être H ou F."
+# Champs obligatoires des utilisateurs non superusers
+REQUIRED = {'date_naissance': BIRTH_REQUIRED, 'genre': GENRE_REQUIRED}
+
+
+def too_young_message(age, min_age=MIN_AGE):
+    return (
+        f"Vous devez avoir au moins {min_age} ans pour créer un compte. "
+        f"Vous avez actuellement {age} ans."
+    )
+
+
+def parse_date(value):
+    """``date`` depuis une date ou une chaîne ISO ; ValueError sinon"""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip())
+
+
+class UserValidator:
+    def __init__(self, today=None, min_age=MIN_AGE):
+        self.today = today or date.today()
+        self.min_age = min_age
+        self.cutoff = age_cutoff(self.today, min_age)
+
+    def clean_birth_date(self, value):
+        """``(date, erreur)`` pour ``date_naissance`` (date ou texte)"""
+        if not value:
+            return None, BIRTH_REQUIRED
+        if not isinstance(value, date):
+            try:
+                value = parse_date(value)
+            except ValueError:
+                return None, BIRTH_INVALID
+        if value <= self.cutoff:
+            return value, None
+        if value > self.today:
+            return value, BIRTH_FUTURE
+        age = age_on(value, self.today)
+        return value, too_young_message(age, self.min_age)
+
+    def birth_date_error(self, value):
+        """Message d'erreur pour ``date_naissance``, ou None"""
+        return self.clean_birth_date(value)[1]
+
+    def genre_error(self, value):
+        if isinstance(value, str) and value in GENRES:
+            return None
+        return GENRE_INVALID if value else GENRE_REQUIRED
+
+    def required_errors(self, data):
+        """Champs obligatoires absents de ``data``"""
+        return {field: message for field, message in REQUIRED.items()
+                if not data.get(field)}
+
+    def validate(self, data, partial=False):
+        """``{champ: message}`` d'un dict ; ``partial`` : champs présents"""
+        errors = {}
+        if not partial or 'date_naissance' in data:
+            error = self.birth_date_error(data.get('date_naissance'))
+            if error:
+                errors['date_naissance'] = error
+        if not partial or 'genre' in data:
+            error = self.genre_error(data.get('genre'))
+            if error:
+                errors['genre'] = error
+        return errors
+
+    def validate_many(self, rows):
+        """Erreurs de chaque dict de ``rows`` (même date du jour partout)"""
+        return [self.validate(row) for row in rows]
+
+    def validate_columns(self, columns):
+        """``{indice: {champ: message}}`` pour des colonnes de même longueur"""
+        errors = {}
+        births = columns.get('date_naissance')
+        if births is not None:
+            for i, error in self._birth_column_errors(births):
+                errors.setdefault(i, {})['date_naissance'] = error
+        genres = columns.get('genre')
+        if genres is not None:
+            for i, genre in enumerate(genres):
+                if not isinstance(genre, str) or genre not in GENRES:
+                    errors.setdefault(i, {})['genre'] = self.genre_error(genre)
+        return errors
+
+    def _birth_column_errors(self, births):
+        if (np is not None and isinstance(births, np.ndarray)
+                and births.dtype.kind == 'M'):
+            # Tableau datetime64 : seules les lignes hors limites sont revues
+            days = births.astype('datetime64[D]')
+            cutoff = np.datetime64(self.cutoff, 'D')
+            suspects = np.isnat(days) | (days > cutoff)
+            for i in np.flatnonzero(suspects):
+                yield int(i), self.birth_date_error(days[i].item())
+            return
+        for i, birth in enumerate(births):
+            error = self.birth_date_error(birth)
+            if error:
+                yield i, error
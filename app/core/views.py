@@ -1,3 +1,86 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+from drf_spectacular.views import SpectacularAPIView
 
-# Create your views here.
+from core.instrumentation import render_metrics
+from core.schema import load_schema
+
+_live_schema_view = SpectacularAPIView.as_view()
+
+
+def requested_format(request):
+    """``json`` ou ``yaml`` d'après ``?format=`` puis l'en-tête Accept"""
+    fmt = request.GET.get('format')
+    if fmt in ('json', 'yaml'):
+        return fmt
+    for media_type in request.META.get('HTTP_ACCEPT', '').split(','):
+        media_type = media_type.split(';')[0].strip()
+        if 'json' in media_type:
+            return 'json'
+        if 'yaml' in media_type or media_type == 'application/vnd.oai.openapi':
+            return 'yaml'
+    return 'yaml'
+
+
+@require_safe
+def schema(request):
+    """Schéma OpenAPI généré par ``build_schema`` (ETag, gzip/brotli).
+
+    Sans fichier, le schéma est généré à la volée seulement en DEBUG.
+    """
+    fmt = requested_format(request)
+    schema_file = load_schema(fmt)
+    if schema_file is None:
+        if settings.DEBUG:
+            return _live_schema_view(request)
+        return HttpResponse(
+            "Schéma non généré : lancer `python manage.py build_schema`.",
+            status=503,
+            content_type='text/plain; charset=utf-8',
+        )
+
+    encoding, content, etag = schema_file.variant(
+        request.META.get('HTTP_ACCEPT_ENCODING')
+    )
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and (
+        etag in parse_etags(if_none_match) or '*' in if_none_match
+    ):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=schema_file.content_type)
+        response['Content-Disposition'] = f'inline; filename="openapi.{fmt}"'
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={settings.SCHEMA_MAX_AGE}'
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
+
+
+@require_safe
+def metrics(request):
+    """Métriques au format Prometheus (tous les workers avec
+    ``METRICS_DIR``, cf. ``core.metrics``).
+
+    Si ``INSTRUMENTATION['METRICS_TOKEN']`` est défini, il est exigé en
+    ``Authorization: Bearer <jeton>`` ; sinon l'accès est refusé sauf si
+    ``METRICS_PUBLIC`` est activé (par défaut en DEBUG).
+    """
+    config = settings.INSTRUMENTATION
+    token = config['METRICS_TOKEN']
+    if not token:
+        if not config.get('METRICS_PUBLIC'):
+            return HttpResponse(status=403)
+    elif not constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(
+        render_metrics(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
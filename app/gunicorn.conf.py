@@ -0,0 +1,61 @@
+"""Configuration gunicorn de production.
+
+API (vues synchrones) en WSGI, workers à threads :
+
+    gunicorn -c gunicorn.conf.py app.wsgi:application
+
+Endpoints ``/api/user/async/`` en ASGI, workers uvicorn :
+
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \
+        gunicorn -c gunicorn.conf.py app.asgi:application
+
+Sous ASGI, Django 3.2 exécute chaque vue synchrone dans un unique thread
+par worker (``thread_sensitive``) : servir toute l'API en ASGI
+sérialiserait les requêtes d'un même processus. Le proxy
+(``nginx.conf``) envoie donc seulement les vues async aux workers
+uvicorn.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8080')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get(
+    'WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1
+))
+# Requêtes traitées en parallèle par worker (gthread uniquement)
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Workers recyclés régulièrement (fuites mémoire), avec jitter pour
+# éviter qu'ils redémarrent tous en même temps
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+# Métriques partagées entre workers (core.metrics) : répertoire vidé au
+# démarrage, compteurs d'un worker arrêté versés dans l'archive
+metrics_dir = os.environ.get('METRICS_MULTIPROC_DIR')
+
+
+def on_starting(server):
+    if metrics_dir:
+        from core.metrics import clear_directory
+        clear_directory(metrics_dir)
+
+
+def worker_exit(server, worker):
+    if metrics_dir:
+        from core.metrics import write_snapshot
+        write_snapshot(metrics_dir)
+
+
+def child_exit(server, worker):
+    if metrics_dir:
+        from core.metrics import archive_process
+        archive_process(metrics_dir, worker.pid)
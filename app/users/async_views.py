@@ -0,0 +1,184 @@
+"""Vues async (ASGI) de l'API users.
+
+Django 3.2 n'a pas d'ORM async et DRF pas de vues async : ces vues sont
+de simples coroutines Django, l'accès à la base passe par
+``sync_to_async`` et réutilise ``users.services``. Sous uvicorn, un
+worker sert ainsi de nombreux clients lents sans bloquer un thread
+pendant la lecture de la requête ou l'écriture de la réponse.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import BaseThrottle
+
+from core.renderers import dumps, loads
+from users.authentication import CachedTokenAuthentication
+from users.cache import cache_profile, cached_response, respond
+from users.read_serializers import PROFILE_READ
+from users.throttling import check_rate, normalize_email_ident
+from users.serializers import UserSerializer
+
+from .services import (
+    RESET_REQUESTED_MESSAGE,
+    PasswordResetError,
+    check_reset_payload,
+    request_password_reset_for,
+    reset_password_for,
+    user_for_update,
+    users_page,
+)
+
+NOT_AUTHENTICATED = "Informations d'authentification non fournies."
+PERMISSION_DENIED = "Vous n'avez pas la permission d'effectuer cette action."
+USER_INACTIVE = "Utilisateur inactif ou supprimé."
+
+
+async def authenticate(request):
+    """Utilisateur du header ``Authorization: Token <clé>`` ou None"""
+    auth = request.headers.get("Authorization", "").split()
+    if len(auth) != 2 or auth[0].lower() != "token":
+        return None
+    try:
+        check = CachedTokenAuthentication().authenticate_credentials
+        user, _ = await sync_to_async(check)(auth[1])
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+def async_api_view(methods, staff_only=False, authenticated=False):
+    """Méthodes autorisées, authentification par token et exemption CSRF.
+
+    Les décorateurs de Django 3.2 (``csrf_exempt``,
+    ``require_http_methods``) renvoient une fonction synchrone : Django
+    ne verrait plus la coroutine, d'où ce décorateur dédié.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                detail = f"Méthode « {request.method} » non autorisée."
+                return JsonResponse({"detail": detail}, status=405)
+            if authenticated or staff_only:
+                request.api_user = await authenticate(request)
+                if request.api_user is None:
+                    return JsonResponse({"detail": NOT_AUTHENTICATED},
+                                        status=401)
+                if staff_only and not request.api_user.is_staff:
+                    return JsonResponse({"detail": PERMISSION_DENIED},
+                                        status=403)
+            return await view(request, *args, **kwargs)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+async def acheck_rate(scope, **idents):
+    """``check_rate`` ; le store ``cache`` (I/O réseau) passe par un thread"""
+    if settings.THROTTLE["BACKEND"] == "cache":
+        return await sync_to_async(check_rate)(scope, **idents)
+    return check_rate(scope, **idents)
+
+
+def profile_response(request, user):
+    """Profil depuis users.cache, sérialisé et mis en cache si absent"""
+    response = cached_response(request, user.pk)
+    if response is None:
+        body = dumps(PROFILE_READ.to_dict(user))
+        etag = cache_profile(user.pk, body, JSONRenderer.media_type)
+        response = respond(request, body, JSONRenderer.media_type, etag)
+    return response
+
+
+def json_body(request):
+    """Corps JSON de la requête ; lève ValueError s'il est invalide"""
+    if not request.body:
+        return {}
+    data = loads(request.body)
+    if not isinstance(data, dict):
+        raise ValueError("Objet JSON attendu.")
+    return data
+
+
+@async_api_view(["GET"], staff_only=True)
+async def get_users(request):
+    """Liste paginée des utilisateurs (le streaming reste sur la vue sync)"""
+    try:
+        page = await sync_to_async(users_page)(request)
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    return HttpResponse(dumps(page), content_type=JSONRenderer.media_type)
+
+
+@async_api_view(["GET", "PATCH"], authenticated=True)
+async def profile(request):
+    user = request.api_user
+    if request.method == "GET":
+        return await sync_to_async(profile_response)(request, user)
+
+    try:
+        data = json_body(request)
+    except ValueError:
+        return JsonResponse({"detail": "JSON invalide."}, status=400)
+
+    def update():
+        # Comme ManageApiView.get_object : la ligne en base, pas
+        # l'instantané du cache d'authentification
+        fresh = user_for_update(user.pk)
+        if fresh is None:
+            return {"detail": USER_INACTIVE}, 401
+        serializer = UserSerializer(fresh, data=data, partial=True)
+        if not serializer.is_valid():
+            return serializer.errors, 400
+        serializer.save()
+        return serializer.data, 200
+
+    body, status = await sync_to_async(update)()
+    return JsonResponse(body, status=status)
+
+
+@async_api_view(["POST"])
+async def request_password_reset(request):
+    try:
+        email = json_body(request).get("email")
+    except ValueError:
+        return JsonResponse({"detail": "JSON invalide."}, status=400)
+    if not email:
+        return JsonResponse({"message": "Veuillez fournir un email."},
+                            status=400)
+
+    wait = await acheck_rate(
+        "password_reset",
+        ip=BaseThrottle().get_ident(request),
+        email=normalize_email_ident(email),
+    )
+    if wait is not None:
+        response = JsonResponse(
+            {"detail": "Trop de requêtes, réessayez plus tard."}, status=429
+        )
+        response["Retry-After"] = str(int(wait) + 1)
+        return response
+
+    try:
+        await sync_to_async(request_password_reset_for)(email)
+    except Exception as e:
+        message = f"Erreur lors de l'envoi de l'e-mail: {e}"
+        return JsonResponse({"message": message}, status=500)
+    return JsonResponse({"message": RESET_REQUESTED_MESSAGE})
+
+
+@async_api_view(["POST"])
+async def reset_password(request):
+    try:
+        payload = check_reset_payload(json_body(request))
+        await sync_to_async(reset_password_for)(*payload)
+    except ValueError:
+        return JsonResponse({"detail": "JSON invalide."}, status=400)
+    except PasswordResetError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    return JsonResponse({"message": "Mot de passe réinitialisé avec succès."})
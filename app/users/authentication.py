@@ -0,0 +1,233 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from users.tokens import ACCESS, InvalidToken, is_signed_token, read_token
+
+TOKEN_PREFIX = 'auth:token:'
+USER_PREFIX = 'auth:user:'
+
+
+class LRUCache:
+    """Cache LRU en mémoire du processus, avec expiration (TTL)"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SnapshotCache:
+    """Cache des instantanés : LRU du processus, ou cache Django partagé.
+
+    Avec un cache partagé (``SHARED_CACHE``), le LRU local n'est pas
+    utilisé : une invalidation faite par un autre processus (worker web,
+    ``run_admin_jobs``) est vue immédiatement. Le LRU seul ne convient
+    qu'à un déploiement en un seul processus.
+
+    Deux espaces de clés :
+    - ``auth:token:<key>`` -> id de l'utilisateur
+    - ``auth:user:<id>``   -> instantané des champs de l'utilisateur
+    """
+
+    def __init__(self, max_size, ttl, shared_alias=None):
+        self.ttl = ttl
+        self.shared = caches[shared_alias] if shared_alias else None
+        self.local = LRUCache(max_size, ttl) if self.shared is None else None
+
+    def get(self, key):
+        if self.shared is not None:
+            return self.shared.get(key)
+        return self.local.get(key)
+
+    def set(self, key, value):
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl)
+        else:
+            self.local.set(key, value)
+
+    def delete_many(self, keys):
+        if self.shared is not None:
+            self.shared.delete_many(keys)
+            return
+        for key in keys:
+            self.local.delete(key)
+
+    def clear(self):
+        if self.local is not None:
+            self.local.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_snapshot_cache():
+    """Cache du processus, construit à partir de ``TOKEN_AUTH_CACHE``"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                conf = settings.TOKEN_AUTH_CACHE
+                _cache = SnapshotCache(
+                    max_size=conf['MAX_SIZE'],
+                    ttl=conf['TTL'],
+                    shared_alias=conf.get('SHARED_CACHE'),
+                )
+    return _cache
+
+
+def reset_snapshot_cache():
+    """Oublie le cache local (tests, changement de configuration)"""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.clear()
+        _cache = None
+
+
+# Jamais mis en cache : chargé à la demande (champ différé)
+SNAPSHOT_EXCLUDED = frozenset(['password'])
+
+
+def make_user_snapshot(user):
+    """Valeurs des champs concrets de l'utilisateur, sérialisables"""
+    return tuple(
+        (field.attname, getattr(user, field.attname))
+        for field in user._meta.concrete_fields
+        if field.attname not in SNAPSHOT_EXCLUDED
+    )
+
+
+def user_from_snapshot(snapshot):
+    """Instance ``User`` sans requête SQL (mot de passe différé)"""
+    names, values = zip(*snapshot)
+    return get_user_model().from_db('default', names, values)
+
+
+def cache_user(user):
+    key = f'{USER_PREFIX}{user.pk}'
+    get_snapshot_cache().set(key, make_user_snapshot(user))
+
+
+def get_cached_user(user_id):
+    """Utilisateur depuis le cache, sinon depuis la base (puis mis en cache)"""
+    snapshot = get_snapshot_cache().get(f'{USER_PREFIX}{user_id}')
+    if snapshot is not None:
+        return user_from_snapshot(snapshot)
+    return load_user(user_id)
+
+
+def load_user(user_id):
+    """Utilisateur lu en base, instantané du cache remplacé"""
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is not None:
+        cache_user(user)
+    return user
+
+
+def invalidate_token(key):
+    get_snapshot_cache().delete_many([f'{TOKEN_PREFIX}{key}'])
+
+
+def invalidate_users(user_ids):
+    get_snapshot_cache().delete_many([f'{USER_PREFIX}{pk}' for pk in user_ids])
+
+
+def invalidate_user(user_id):
+    invalidate_users([user_id])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` avec cache : un hit ne fait aucune requête SQL.
+
+    Le cache est invalidé par les signaux de ``users.signals`` (nouveau
+    token, sauvegarde de l'utilisateur : reset du mot de passe,
+    désactivation, modification du profil). Les jetons signés de
+    ``users.tokens`` sont acceptés en plus des tokens DRF.
+    """
+
+    def authenticate_credentials(self, key):
+        if is_signed_token(key):
+            return self.authenticate_signed(key)
+        cache = get_snapshot_cache()
+        user_id = cache.get(f'{TOKEN_PREFIX}{key}')
+
+        if user_id is None:
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            user = token.user
+            cache.set(f'{TOKEN_PREFIX}{key}', user.pk)
+            cache_user(user)
+        else:
+            user = get_cached_user(user_id)
+            if user is None:
+                invalidate_token(key)
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            token = Token(key=key, user=user)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+
+        return (user, token)
+
+    def authenticate_signed(self, key):
+        """Jeton d'accès signé (users.tokens), vérifié sans requête SQL"""
+        try:
+            user_id, _expires, version, _jti = read_token(key, ACCESS)
+        except InvalidToken as e:
+            raise exceptions.AuthenticationFailed(str(e))
+        user = get_cached_user(user_id)
+        if user is not None and user.token_version != version:
+            # Instantané périmé possible (LRU d'un autre processus) : la
+            # base tranche avant de refuser
+            user = load_user(user_id)
+        if user is None or user.token_version != version:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return (user, key)
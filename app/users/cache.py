@@ -0,0 +1,106 @@
+"""Cache des réponses de ``/api/user/moi/`` (GET).
+
+Le JSON rendu est stocké par utilisateur avec son ETag dans un cache
+Django (``PROFILE_CACHE``). L'entrée est supprimée à chaque sauvegarde
+de l'utilisateur (signal ``post_save``) : profil, admin, reset de mot
+de passe.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+PROFILE_PREFIX = 'users:profile:'
+
+# Champs affichés par ProfileSerializer : sauver d'autres champs
+# (last_login, password...) n'invalide pas le cache
+PROFILE_FIELDS = frozenset(['email', 'name'])
+
+
+def profile_cache():
+    return caches[settings.PROFILE_CACHE['CACHE']]
+
+
+def profile_key(user_id):
+    return f'{PROFILE_PREFIX}{user_id}'
+
+
+def make_etag(body):
+    return '"%s"' % hashlib.md5(body).hexdigest()
+
+
+def get_cached_profile(user_id):
+    """``(body, content_type, etag)`` en cache, ou None"""
+    return profile_cache().get(profile_key(user_id))
+
+
+def cache_profile(user_id, body, content_type):
+    etag = make_etag(body)
+    profile_cache().set(
+        profile_key(user_id), (body, content_type, etag),
+        settings.PROFILE_CACHE['TIMEOUT'],
+    )
+    return etag
+
+
+def invalidate_profiles(user_ids):
+    profile_cache().delete_many([profile_key(user_id) for user_id in user_ids])
+
+
+def invalidate_profile(user_id):
+    profile_cache().delete(profile_key(user_id))
+
+
+def etag_matches(request, etag):
+    """``If-None-Match`` correspond-il à ``etag`` ?"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    etag = etag.strip('"')
+    return '*' in etags or any(
+        e.lstrip('W/').strip('"') == etag for e in etags
+    )
+
+
+def finalize(response, etag):
+    response['ETag'] = etag
+    # Réponse propre à l'utilisateur : les clients revalident avec l'ETag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Accept', 'Authorization'))
+    return response
+
+
+def respond(request, body, content_type, etag):
+    if etag_matches(request, etag):
+        return finalize(HttpResponseNotModified(), etag)
+    return finalize(HttpResponse(body, content_type=content_type), etag)
+
+
+def cached_response(request, user_id):
+    """Réponse 304 ou 200 depuis le cache, sans sérialiser ; None si absent"""
+    cached = get_cached_profile(user_id)
+    if cached is None:
+        return None
+    return respond(request, *cached)
+
+
+def store_after_render(request, response, user_id):
+    """Met en cache la réponse DRF une fois rendue (callback post-render)"""
+    def callback(rendered):
+        if rendered.status_code != 200:
+            return
+        etag = cache_profile(
+            user_id, rendered.content, rendered['Content-Type']
+        )
+        if etag_matches(request, etag):
+            # Même contenu que celui du client : la réponse rendue est
+            # remplacée
+            return finalize(HttpResponseNotModified(), etag)
+        finalize(rendered, etag)
+
+    response.add_post_render_callback(callback)
+    return response
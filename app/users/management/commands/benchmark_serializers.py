@@ -0,0 +1,104 @@
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from core.query_audit import seed_users
+from core.renderers import dumps
+from users.read_serializers import PROFILE_READ, USER_LIST_READ
+from users.serializers import ProfileSerializer
+
+
+class UserListSerializer(serializers.ModelSerializer):
+    """Équivalent ModelSerializer de la liste de get_users (référence)"""
+
+    class Meta:
+        model = get_user_model()
+        fields = ['id', 'email', 'name']
+
+
+def best_time(func, repeat):
+    """Meilleur temps (s) sur ``repeat`` exécutions, et le dernier résultat"""
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    """Django command to benchmark DRF serializers against read serializers."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Nombre de lignes par mesure.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Meilleur temps sur N exécutions.')
+        parser.add_argument('--db', action='store_true',
+                            help='Mesurer aussi la liste lue en base '
+                                 '(données annulées à la fin).')
+
+    def cases(self, rows, use_db):
+        User = get_user_model()
+        renderer = JSONRenderer()
+        users = [
+            User(id=i + 1, email=f'bench{i}@example.com', name=f'Bench {i}',
+                 genre='HF'[i % 2], date_naissance=date(1990, 1, 1))
+            for i in range(rows)
+        ]
+        cases = [
+            ('profil (objet par objet)',
+             lambda: [renderer.render(ProfileSerializer(u).data)
+                      for u in users],
+             lambda: [dumps(PROFILE_READ.to_dict(u)) for u in users]),
+            ('liste (instances)',
+             lambda: renderer.render(
+                 UserListSerializer(users, many=True).data
+             ),
+             lambda: dumps([USER_LIST_READ.to_dict(u) for u in users])),
+        ]
+        if use_db:
+            queryset = User.objects.order_by('id')[:rows]
+            cases.append(
+                ('liste (base)',
+                 lambda: renderer.render(
+                     UserListSerializer(queryset, many=True).data
+                 ),
+                 lambda: dumps(USER_LIST_READ.dicts(queryset))),
+            )
+        return cases
+
+    def run(self, options):
+        cases = self.cases(options['rows'], options['db'])
+        for name, reference, fast in cases:
+            ref_time, ref_output = best_time(reference, options['repeat'])
+            fast_time, fast_output = best_time(fast, options['repeat'])
+            if ref_output != fast_output:
+                raise CommandError(
+                    f'{name} : sorties différentes entre DRF et le fast-path'
+                )
+            self.stdout.write(
+                f'{name:26} DRF {ref_time * 1000:9.1f} ms'
+                f'   fast {fast_time * 1000:9.1f} ms'
+                f'   x{ref_time / fast_time:5.1f}'
+            )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        self.stdout.write(
+            f"{options['rows']} lignes, meilleur de {options['repeat']}"
+        )
+        if not options['db']:
+            self.run(options)
+            return
+        with transaction.atomic():
+            seed_users(options['rows'])
+            self.run(options)
+            # Les données de test ne sont jamais conservées
+            transaction.set_rollback(True)
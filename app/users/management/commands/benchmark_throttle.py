@@ -0,0 +1,74 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from users.throttling import CacheSlidingWindowStore, LocalTokenBucketStore
+
+
+def per_call_us(func, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+class Command(BaseCommand):
+    """Django command to measure the cost of throttled (rejected) requests."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5000)
+        parser.add_argument('--logins', type=int, default=5,
+                            choices=range(1, 255), metavar='N',
+                            help='Logins refusés (hachage) mesurés '
+                                 'pour comparaison.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        iterations = options['iterations']
+
+        for name, store in (
+            ('token bucket (local)', LocalTokenBucketStore(max_keys=1000)),
+            ('fenêtre glissante (cache)',
+             CacheSlidingWindowStore(settings.THROTTLE['CACHE'])),
+        ):
+            store.hit('benchmark', 1, 3600)
+            cost = per_call_us(lambda: store.hit('benchmark', 1, 3600),
+                               iterations)
+            self.stdout.write(f'{name:28} rejet {cost:10.2f} µs')
+
+        # Chemin complet d'une requête WSGI (middlewares, DRF), sans client
+        # de test
+        config = dict(settings.THROTTLE, ENABLED=True, BACKEND='local')
+        config['RATES'] = dict(config['RATES'], auth={'ip': '1/hour'})
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        url = reverse('user:token')
+        body = json.dumps({'email': 'benchmark@example.invalid',
+                           'password': 'benchmark'})
+
+        def post(ip):
+            request = factory.post(url, body, content_type='application/json',
+                                   REMOTE_ADDR=ip)
+            return handler.get_response(request)
+
+        ips = (f'198.51.100.{i}' for i in range(1, 255))
+        # Les 429 sont journalisés par django.request : hors mesure
+        logging.disable(logging.WARNING)
+        try:
+            with override_settings(THROTTLE=config, ALLOWED_HOSTS=['*']):
+                # Une IP neuve par login : requête acceptée, refusée après
+                # hachage
+                login = per_call_us(lambda: post(next(ips)), options['logins'])
+                post('192.0.2.1')
+                rejected = per_call_us(lambda: post('192.0.2.1'), iterations)
+        finally:
+            logging.disable(logging.NOTSET)
+        label = 'requête token rejetée (429)'
+        self.stdout.write(f'{label:28} {rejected:16.2f} µs')
+        self.stdout.write(f"{'login refusé (hachage)':28} {login:16.2f} µs")
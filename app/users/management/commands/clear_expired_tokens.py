@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from users.models import UsedRefreshToken
+
+
+def delete_in_batches(queryset, batch_size):
+    """Supprime par lots de clés primaires (transactions et verrous courts)"""
+    deleted = 0
+    while True:
+        keys = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not keys:
+            return deleted
+        deleted += queryset.model.objects.filter(pk__in=keys).delete()[0]
+
+
+class Command(BaseCommand):
+    """Purge les jetons de rafraîchissement expirés (et vieux tokens DRF)."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--legacy-days', type=int,
+                            help='Supprimer aussi les tokens DRF créés '
+                                 'il y a plus de N jours.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        now = timezone.now()
+        refresh = delete_in_batches(
+            UsedRefreshToken.objects.filter(expires_at__lt=now),
+            options['batch_size'],
+        )
+        self.stdout.write(
+            f'Jetons de rafraîchissement expirés supprimés : {refresh}'
+        )
+        if options['legacy_days'] is not None:
+            legacy = delete_in_batches(
+                Token.objects.filter(
+                    created__lt=now - timedelta(days=options['legacy_days'])
+                ),
+                options['batch_size'],
+            )
+            self.stdout.write(f'Tokens DRF supprimés : {legacy}')
+        self.stdout.write(self.style.SUCCESS('Purge des jetons terminée'))
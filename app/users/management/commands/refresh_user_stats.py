@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.stats import TOTAL, UNKNOWN, refresh_stats
+
+
+class Command(BaseCommand):
+    """Recalcule la table de synthèse des statistiques utilisateurs."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Recalculer en continu, toutes les '
+                                 '--interval secondes.')
+        parser.add_argument('--interval', type=float, default=3600)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        while True:
+            counts = refresh_stats()
+            self.stdout.write(self.style.SUCCESS(
+                f'Statistiques recalculées : {counts[(TOTAL, UNKNOWN)]} '
+                f'utilisateurs, {len(counts)} compteurs'
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    """Worker qui envoie les e-mails de réinitialisation en file d'attente."""
+
+    def add_arguments(self, parser):
+        conf = settings.PASSWORD_RESET_OUTBOX
+        parser.add_argument('--batch-size', type=int,
+                            default=conf['BATCH_SIZE'])
+        parser.add_argument('--max-attempts', type=int,
+                            default=conf['MAX_ATTEMPTS'])
+        parser.add_argument(
+            '--backoff', type=int, default=conf['BACKOFF'],
+            help='Délai de base (secondes) avant une nouvelle tentative.')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Tourner en continu au lieu de vider la file une fois.')
+        parser.add_argument(
+            '--interval', type=float, default=conf['POLL_INTERVAL'],
+            help='Attente (secondes) quand la file est vide, avec --loop.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        while True:
+            stats = drain_outbox(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+                backoff=options['backoff'],
+            )
+            processed = sum(stats.values())
+            if processed:
+                self.stdout.write(
+                    f"Envoyés: {stats['sent']}, "
+                    f"reprogrammés: {stats['retried']}, "
+                    f"abandonnés: {stats['failed']}"
+                )
+            if processed < options['batch_size']:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS('File des e-mails de reset traitée'))
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:21
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_usedrefreshtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=20)),
+                ('key', models.CharField(blank=True, max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='userstat',
+            constraint=models.UniqueConstraint(fields=('dimension', 'key'), name='users_userstat_dimension_key'),
+        ),
+    ]
@@ -1,3 +1,84 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
-# Create your models here.
+
+class PasswordResetOutbox(models.Model):
+    """E-mail de réinitialisation en attente d'envoi par le worker"""
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    choix_status = [
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_SENT, 'Envoyé'),
+        (STATUS_FAILED, 'Échec'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='password_reset_emails',
+    )
+    status = models.CharField(
+        max_length=10, choices=choix_status, default=STATUS_PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # Dédoublonnage : un seul e-mail en attente par utilisateur
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=Q(status='pending'),
+                name='users_outbox_one_pending_per_user',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=Q(status='pending'),
+                name='users_outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} ({self.status})'
+
+
+class UsedRefreshToken(models.Model):
+    """Jeton de rafraîchissement déjà utilisé (rotation : tout rejeu est refusé).
+
+    Seul l'identifiant aléatoire du jeton est conservé, jusqu'à son
+    expiration (commande ``clear_expired_tokens``).
+    """
+    jti = models.CharField(max_length=16, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
+
+
+class UserStat(models.Model):
+    """Compteur d'utilisateurs pour une valeur d'une dimension (users.stats).
+
+    Tenu à jour par les signaux de ``users.signals`` et recalculé par
+    ``manage.py refresh_user_stats``.
+    """
+    dimension = models.CharField(max_length=20)
+    key = models.CharField(max_length=20, blank=True)
+    count = models.BigIntegerField(default=0)
+    refreshed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key'],
+                                    name='users_userstat_dimension_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.dimension}={self.key} : {self.count}'
@@ -0,0 +1,129 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import PasswordResetOutbox
+from users.utils import build_password_reset_email
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_password_reset(user):
+    """Met en file un e-mail de reset ; ignore si un envoi est déjà en attente.
+
+    Retourne True si une nouvelle entrée a été créée.
+    """
+    _, created = PasswordResetOutbox.objects.get_or_create(
+        user=user,
+        status=PasswordResetOutbox.STATUS_PENDING,
+    )
+    return created
+
+
+def enqueue_password_resets(user_ids):
+    """Met en file les e-mails de reset d'un lot d'utilisateurs en une requête.
+
+    Les utilisateurs ayant déjà un envoi en attente sont ignorés par la
+    contrainte unique (``ignore_conflicts``).
+    """
+    PasswordResetOutbox.objects.bulk_create(
+        [PasswordResetOutbox(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+
+
+def retry_delay(attempts, backoff):
+    """Délai exponentiel avant la tentative suivante"""
+    return timedelta(seconds=backoff * 2 ** (attempts - 1))
+
+
+def claim_batch(batch_size, lease):
+    """Réserve un lot d'e-mails dus et valide aussitôt la transaction.
+
+    Les lignes sont verrouillées le temps de repousser ``next_attempt_at``
+    de ``lease`` secondes (``SKIP LOCKED`` sur PostgreSQL) : les autres
+    workers ne les voient plus, et un worker arrêté en cours d'envoi les
+    rend disponibles à l'expiration du bail.
+    """
+    with transaction.atomic():
+        batch = list(
+            PasswordResetOutbox.objects
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('user')
+            .filter(status=PasswordResetOutbox.STATUS_PENDING,
+                    next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if batch:
+            PasswordResetOutbox.objects.filter(
+                pk__in=[entry.pk for entry in batch]
+            ).update(
+                next_attempt_at=timezone.now() + timedelta(seconds=lease)
+            )
+    return batch
+
+
+def drain_outbox(batch_size=None, max_attempts=None, backoff=None):
+    """Envoie un lot d'e-mails en attente avec une seule connexion SMTP.
+
+    Le lot est réservé (``claim_batch``) puis envoyé hors transaction :
+    aucun verrou n'est tenu pendant les échanges SMTP, et plusieurs
+    workers peuvent tourner en parallèle. Retourne le nombre d'e-mails
+    envoyés, reprogrammés et abandonnés.
+    """
+    conf = settings.PASSWORD_RESET_OUTBOX
+    batch_size = batch_size or conf['BATCH_SIZE']
+    max_attempts = max_attempts or conf['MAX_ATTEMPTS']
+    backoff = conf['BACKOFF'] if backoff is None else backoff
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+
+    batch = claim_batch(batch_size, conf['CLAIM_TIMEOUT'])
+    if not batch:
+        return stats
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        connection_error = None
+    except Exception as e:
+        connection_error = e
+
+    for entry in batch:
+        try:
+            if connection_error is not None:
+                raise connection_error
+            email = build_password_reset_email(
+                entry.user, connection=connection
+            )
+            email.send()
+        except Exception as e:
+            entry.attempts += 1
+            entry.last_error = str(e)
+            if entry.attempts >= max_attempts:
+                entry.status = PasswordResetOutbox.STATUS_FAILED
+                stats['failed'] += 1
+                logger.error(
+                    "Abandon de l'e-mail de reset pour %s : %s",
+                    entry.user.email, e,
+                )
+            else:
+                delay = retry_delay(entry.attempts, backoff)
+                entry.next_attempt_at = timezone.now() + delay
+                stats['retried'] += 1
+        else:
+            entry.status = PasswordResetOutbox.STATUS_SENT
+            entry.sent_at = timezone.now()
+            stats['sent'] += 1
+
+    if connection_error is None:
+        connection.close()
+
+    PasswordResetOutbox.objects.bulk_update(
+        batch,
+        ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'],
+    )
+    return stats
@@ -0,0 +1,106 @@
+from django.http import StreamingHttpResponse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from rest_framework.utils.urls import replace_query_param
+
+from core.renderers import dumps
+
+CURSOR_PARAM = 'cursor'
+PAGE_SIZE_PARAM = 'page_size'
+
+STREAM_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+
+def encode_cursor(last_id):
+    """Encode le dernier id vu dans un curseur opaque"""
+    return urlsafe_base64_encode(force_bytes(last_id))
+
+
+def decode_cursor(cursor):
+    """Décode un curseur, lève ValueError s'il est invalide"""
+    if not cursor:
+        return 0
+    try:
+        last_id = int(urlsafe_base64_decode(cursor).decode())
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Curseur invalide.")
+    if last_id < 0:
+        raise ValueError("Curseur invalide.")
+    return last_id
+
+
+def get_page_size(request, default, maximum):
+    """Taille de page demandée, bornée par ``maximum``"""
+    raw = request.GET.get(PAGE_SIZE_PARAM)
+    if raw is None:
+        return default
+    try:
+        size = int(raw)
+    except ValueError:
+        raise ValueError("page_size doit être un entier.")
+    if size < 1:
+        raise ValueError("page_size doit être positif.")
+    return min(size, maximum)
+
+
+def keyset_page(request, queryset, serializer, page_size):
+    """Page de ``queryset`` (trié par id) après le curseur de la requête.
+
+    ``serializer`` est un ``ReadSerializer`` (users.read_serializers).
+    Retourne ``(rows, next_url)`` ; une ligne de plus est lue pour savoir
+    s'il existe une page suivante, sans COUNT ni OFFSET.
+    """
+    after = decode_cursor(request.GET.get(CURSOR_PARAM))
+    page = queryset.filter(id__gt=after).order_by('id')[:page_size + 1]
+    rows = serializer.dicts(page)
+    next_url = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_url = replace_query_param(
+            request.build_absolute_uri(),
+            CURSOR_PARAM,
+            encode_cursor(rows[-1]['id']),
+        )
+    return rows, next_url
+
+
+def iter_json_chunks(queryset, serializer, fmt, chunk_size):
+    """Génère le queryset en morceaux NDJSON ou tableau JSON.
+
+    ``iterator()`` utilise un curseur côté serveur sur PostgreSQL : la
+    mémoire reste constante quel que soit le nombre de lignes.
+    """
+    rows = serializer.iter_dicts(queryset.order_by('id'),
+                                 chunk_size=chunk_size)
+    buffer = []
+    first = True
+    if fmt == 'json':
+        yield b'['
+    for row in rows:
+        buffer.append(dumps(row))
+        if len(buffer) >= chunk_size:
+            yield _join_chunk(buffer, fmt, first)
+            first = False
+            buffer = []
+    if buffer:
+        yield _join_chunk(buffer, fmt, first)
+    if fmt == 'json':
+        yield b']'
+
+
+def _join_chunk(buffer, fmt, first):
+    if fmt == 'ndjson':
+        return b'\n'.join(buffer) + b'\n'
+    chunk = b','.join(buffer)
+    return chunk if first else b',' + chunk
+
+
+def streaming_response(queryset, serializer, fmt, chunk_size):
+    """Réponse HTTP en streaming (``ndjson`` ou ``json``)"""
+    return StreamingHttpResponse(
+        iter_json_chunks(queryset, serializer, fmt, chunk_size),
+        content_type=STREAM_CONTENT_TYPES[fmt],
+    )
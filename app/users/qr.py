@@ -0,0 +1,163 @@
+"""Rendu des QR codes des e-mails de réinitialisation, sans PIL.
+
+La matrice est calculée avec ``qrcode`` en version, niveau de correction
+et masque fixes (pas de recherche du meilleur ajustement), puis encodée
+directement en PNG 1 bit (zlib) ou en SVG.
+"""
+import struct
+import zlib
+from collections import namedtuple
+
+import qrcode
+from qrcode.constants import (
+    ERROR_CORRECT_H,
+    ERROR_CORRECT_L,
+    ERROR_CORRECT_M,
+    ERROR_CORRECT_Q,
+)
+from qrcode.exceptions import DataOverflowError
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+ERROR_LEVELS = {
+    'L': ERROR_CORRECT_L,
+    'M': ERROR_CORRECT_M,
+    'Q': ERROR_CORRECT_Q,
+    'H': ERROR_CORRECT_H,
+}
+
+SIGNING_SALT = 'users.qr'
+
+QRImage = namedtuple('QRImage', ['content', 'content_type', 'filename'])
+Renderer = namedtuple('Renderer', ['func', 'content_type', 'extension'])
+
+RENDERERS = {}
+
+
+def register_renderer(name, content_type, extension):
+    """Enregistre un format de sortie : ``func(matrix, box_size) -> bytes``"""
+    def decorator(func):
+        RENDERERS[name] = Renderer(func, content_type, extension)
+        return func
+    return decorator
+
+
+def qr_matrix(data, version=None, error_level='L', border=4):
+    """Matrice de modules (True = noir), bordure comprise"""
+    def build(fixed_version, mask_pattern):
+        qr = qrcode.QRCode(
+            version=fixed_version,
+            error_correction=ERROR_LEVELS[error_level],
+            border=border,
+            mask_pattern=mask_pattern,
+        )
+        qr.add_data(data, optimize=0)
+        qr.make(fit=fixed_version is None)
+        return qr.get_matrix()
+
+    if version is None:
+        return build(None, None)
+    try:
+        return build(version, 0)
+    except DataOverflowError:
+        # Données trop longues pour la version fixée : ajustement automatique
+        return build(None, 0)
+
+
+def _png_chunk(tag, data):
+    return (
+        struct.pack('>I', len(data)) + tag + data
+        + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+    )
+
+
+@register_renderer('png', 'image/png', 'png')
+def render_png(matrix, box_size):
+    """PNG niveaux de gris 1 bit, encodé à la main"""
+    size = len(matrix) * box_size
+    padding = '1' * (-size % 8)
+    lines = []
+    for row in matrix:
+        bits = ''.join(('0' if cell else '1') * box_size for cell in row)
+        bits += padding
+        line = b'\x00' + int(bits, 2).to_bytes(len(bits) // 8, 'big')
+        lines.append(line * box_size)
+    header = struct.pack('>IIBBBBB', size, size, 1, 0, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + _png_chunk(b'IHDR', header)
+        + _png_chunk(b'IDAT', zlib.compress(b''.join(lines), 9))
+        + _png_chunk(b'IEND', b'')
+    )
+
+
+@register_renderer('svg', 'image/svg+xml', 'svg')
+def render_svg(matrix, box_size):
+    """SVG avec un seul ``path`` (modules noirs consécutifs fusionnés)"""
+    n = len(matrix)
+    parts = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < n:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < n and row[x]:
+                x += 1
+            parts.append(f'M{start},{y}h{x - start}v1h-{x - start}z')
+    size = n * box_size
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{size}" height="{size}" '
+        f'viewBox="0 0 {n} {n}" shape-rendering="crispEdges">'
+        f'<rect width="{n}" height="{n}" fill="#fff"/>'
+        f'<path d="{"".join(parts)}" fill="#000"/></svg>'
+    ).encode()
+
+
+def render_qr(data, fmt='png', version=None, error_level='L', box_size=4,
+              border=4):
+    """Rend ``data`` dans le format ``fmt`` (voir ``RENDERERS``).
+
+    Pas de cache : ``data`` est un lien de reset à usage unique, qui ne
+    doit pas rester en mémoire et ne serait jamais redemandé.
+    """
+    renderer = RENDERERS[fmt]
+    matrix = qr_matrix(data, version=version, error_level=error_level,
+                       border=border)
+    return QRImage(
+        renderer.func(matrix, box_size),
+        renderer.content_type,
+        f'reset_qr.{renderer.extension}',
+    )
+
+
+def render_reset_qr(data, fmt=None):
+    """Rend un QR code avec la configuration ``PASSWORD_RESET_QR``"""
+    conf = settings.PASSWORD_RESET_QR
+    return render_qr(
+        data,
+        fmt=fmt or conf['FORMAT'],
+        version=conf['VERSION'],
+        error_level=conf['ERROR_LEVEL'],
+        box_size=conf['BOX_SIZE'],
+        border=conf['BORDER'],
+    )
+
+
+def make_qr_url(data):
+    """URL signée qui rendra le QR code seulement si quelqu'un l'ouvre"""
+    signed = signing.dumps(data, salt=SIGNING_SALT, compress=True)
+    path = reverse('user:password_reset_qr', args=[signed])
+    return f"{settings.BACKEND_URL}{path}"
+
+
+def load_qr_data(signed):
+    """Vérifie signature et âge de l'URL ; lève ``signing.BadSignature``"""
+    return signing.loads(
+        signed,
+        salt=SIGNING_SALT,
+        max_age=settings.PASSWORD_RESET_QR['MAX_AGE'],
+    )
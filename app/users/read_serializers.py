@@ -0,0 +1,103 @@
+"""Sérialiseurs de lecture légers pour les endpoints en lecture seule.
+
+La liste des champs et leurs conversions sont résolues une seule fois à
+l'import ; les lignes viennent de ``values_list`` (pas d'instances ni
+d'introspection DRF) et la sortie reste identique à celle des
+``ModelSerializer`` équivalents.
+"""
+from django.contrib.auth import get_user_model
+from django.db import models
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from core.instrumentation import timed
+
+# Représentation DRF des types non JSON natifs (format des settings DRF)
+_CONVERTERS = {
+    models.DateTimeField: serializers.DateTimeField().to_representation,
+    models.DateField: serializers.DateField().to_representation,
+    models.DecimalField: str,
+}
+
+
+def _converter(field):
+    for field_class, convert in _CONVERTERS.items():
+        if isinstance(field, field_class):
+            return convert
+    return None
+
+
+class ReadSerializer:
+    """Champs précompilés d'un modèle, rendus en dicts ou tuples"""
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(fields)
+        model_fields = [model._meta.get_field(name) for name in self.fields]
+        self.attnames = tuple(field.attname for field in model_fields)
+        # Index et fonction des seuls champs à convertir
+        self.converters = tuple(
+            (i, convert)
+            for i, convert in enumerate(map(_converter, model_fields))
+            if convert is not None
+        )
+
+    def _convert(self, row):
+        if not self.converters:
+            return row
+        row = list(row)
+        for i, convert in self.converters:
+            if row[i] is not None:
+                row[i] = convert(row[i])
+        return row
+
+    def _values(self, instance):
+        return self._convert([getattr(instance, n) for n in self.attnames])
+
+    def to_tuple(self, instance):
+        with timed('serialize'):
+            return tuple(self._values(instance))
+
+    def to_dict(self, instance):
+        """Équivalent de ``ModelSerializer(instance).data``"""
+        with timed('serialize'):
+            return dict(zip(self.fields, self._values(instance)))
+
+    def tuples(self, queryset):
+        with timed('serialize'):
+            rows = queryset.values_list(*self.fields)
+            return [tuple(self._convert(row)) for row in rows]
+
+    def dicts(self, queryset):
+        """Équivalent de ``ModelSerializer(queryset, many=True).data``"""
+        fields = self.fields
+        with timed('serialize'):
+            rows = queryset.values_list(*fields)
+            return [dict(zip(fields, self._convert(row))) for row in rows]
+
+    def iter_dicts(self, queryset, chunk_size=2000):
+        """Comme ``dicts`` mais en streaming (``iterator()``)"""
+        fields = self.fields
+        rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+        for row in rows:
+            yield dict(zip(fields, self._convert(row)))
+
+
+class FastReadMixin:
+    """GET d'un objet rendu par ``read_serializer`` au lieu du serializer DRF.
+
+    À activer vue par vue ; ``read_serializer = None`` garde le
+    comportement DRF standard.
+    """
+    read_serializer = None
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.read_serializer is None:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(self.read_serializer.to_dict(self.get_object()))
+
+
+User = get_user_model()
+
+PROFILE_READ = ReadSerializer(User, ('email', 'name'))
+USER_LIST_READ = ReadSerializer(User, ('id', 'email', 'name'))
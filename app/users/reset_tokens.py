@@ -0,0 +1,143 @@
+"""Jetons de réinitialisation du mot de passe.
+
+Format : ``<horodatage>.<version>.<empreinte>.<signature>`` (base 36,
+empreinte HMAC du hash du mot de passe, HMAC-SHA256 de l'uid et des trois
+premiers champs). Format, validité et signature sont vérifiés avant
+toute requête SQL ; la version et l'empreinte sont comparées à
+l'utilisateur chargé. Comme avec ``default_token_generator``, tout
+changement de mot de passe (admin, ``changepassword``, shell) invalide
+les jetons en circulation. Un jeton utilisé est noté dans le cache (rejeu
+refusé sans requête) ; le reset incrémente ``token_version``, le jeton
+reste donc invalide même si le cache est vidé.
+
+Les jetons de ``default_token_generator`` déjà envoyés restent acceptés
+tant que ``ACCEPT_LEGACY`` est actif.
+"""
+import base64
+import re
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import (
+    base36_to_int, int_to_base36, urlsafe_base64_decode,
+)
+
+SALT = 'users.reset_tokens'
+TOKEN_RE = re.compile(
+    r'([0-9a-z]{1,8})\.([0-9a-z]{1,8})\.([A-Za-z0-9_-]{22})'
+    r'\.([A-Za-z0-9_-]{43})'
+)
+LEGACY_TOKEN_RE = re.compile(r'[0-9a-z]{1,13}-[0-9a-f]{20,64}')
+USED_PREFIX = 'reset:used:'
+# Décalage d'horloge toléré entre serveurs (secondes)
+CLOCK_SKEW = 60
+
+INVALID_TOKEN = "Token invalide ou expiré."
+UNKNOWN_USER = "Utilisateur introuvable."
+
+
+class PasswordResetError(Exception):
+    """Uid ou token de reset refusé (``field`` : 'uid' ou 'token')"""
+
+    def __init__(self, message, field='token'):
+        super().__init__(message)
+        self.field = field
+
+
+def _encode(digest):
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def _password_tag(password):
+    """Empreinte du hash du mot de passe, changée par ``set_password``"""
+    digest = salted_hmac(SALT + '.password', password or '',
+                         algorithm='sha256').digest()
+    return _encode(digest[:16])
+
+
+def _signature(user_id, timestamp, version, password_tag):
+    value = f'{user_id}|{timestamp}|{version}|{password_tag}'
+    return _encode(salted_hmac(SALT, value, algorithm='sha256').digest())
+
+
+def make_reset_token(user, now=None):
+    timestamp = int(now if now is not None else time.time())
+    password_tag = _password_tag(user.password)
+    return '.'.join((
+        int_to_base36(timestamp),
+        int_to_base36(user.token_version),
+        password_tag,
+        _signature(user.pk, timestamp, user.token_version, password_tag),
+    ))
+
+
+def decode_uid(uid):
+    try:
+        return int(urlsafe_base64_decode(uid or '').decode())
+    except (ValueError, TypeError):
+        raise PasswordResetError(UNKNOWN_USER, 'uid')
+
+
+def check_reset_token(uid, token, now=None):
+    """Vérifications sans requête SQL.
+
+    Retourne ``(user_id, version, empreinte)``, à comparer à l'utilisateur
+    chargé ; ``version`` et ``empreinte`` valent None pour un jeton
+    legacy, vérifié par ``default_token_generator``.
+    """
+    user_id = decode_uid(uid)
+    token = token or ''
+    match = TOKEN_RE.fullmatch(token)
+    if match is None:
+        legacy = settings.PASSWORD_RESET_TOKENS['ACCEPT_LEGACY']
+        if legacy and LEGACY_TOKEN_RE.fullmatch(token):
+            return user_id, None, None
+        raise PasswordResetError(INVALID_TOKEN)
+    timestamp, version = base36_to_int(match[1]), base36_to_int(match[2])
+    age = (now if now is not None else time.time()) - timestamp
+    if not -CLOCK_SKEW <= age <= settings.PASSWORD_RESET_TOKENS['TTL']:
+        raise PasswordResetError(INVALID_TOKEN)
+    expected = _signature(user_id, timestamp, version, match[3])
+    if not constant_time_compare(match[4], expected):
+        raise PasswordResetError(INVALID_TOKEN)
+    return user_id, version, match[3]
+
+
+def _used_tokens():
+    return caches[settings.PASSWORD_RESET_TOKENS['CACHE']]
+
+
+def reset_password_for(uid, token, new_password, now=None):
+    """Vérifie uid + token, change le mot de passe ; lève PasswordResetError"""
+    user_id, version, password_tag = check_reset_token(uid, token, now)
+    used_key = USED_PREFIX + token.rsplit('.', 1)[-1]
+    cache = _used_tokens()
+    # add() est atomique : deux envois simultanés du même jeton, un seul passe
+    if not cache.add(used_key, 1, settings.PASSWORD_RESET_TOKENS['TTL']):
+        raise PasswordResetError("Token déjà utilisé.")
+    try:
+        user = get_user_model().objects.filter(pk=user_id).first()
+        if user is None:
+            raise PasswordResetError(UNKNOWN_USER, 'uid')
+        if version is None:
+            valid = default_token_generator.check_token(user, token)
+        else:
+            valid = version == user.token_version and constant_time_compare(
+                password_tag, _password_tag(user.password)
+            )
+        if not valid:
+            raise PasswordResetError(INVALID_TOKEN)
+        user.set_password(new_password)
+        user.revoke_tokens()
+        user.save()
+    except PasswordResetError:
+        raise
+    except Exception:
+        # Échec technique : le jeton reste utilisable
+        cache.delete(used_key)
+        raise
+    return user
@@ -1,77 +1,73 @@
+import copy
+
 from django.contrib.auth import (
     get_user_model,
     authenticate,
 )
 from django.utils.translation import gettext as _
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.functional import cached_property
 from rest_framework import serializers
-from datetime import date
 
 from django.contrib.auth import get_user_model
-from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_decode
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.contrib.auth.password_validation import validate_password
 
-class UserSerializer(serializers.ModelSerializer):
+from core.instrumentation import TimedSerializerMixin
+from core.validation import REQUIRED, UserValidator
+from users.reset_tokens import PasswordResetError, reset_password_for
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer pour les objets utilisateur"""
     
     class Meta:
         model = get_user_model()
         fields = ['email', 'password', 'name', 'genre', 'date_naissance']
         extra_kwargs = {
-            'password': {'write_only': True, 'min_length': 8}
+            'password': {'write_only': True, 'min_length': 8},
+            # Âge vérifié une seule fois, par validate_date_naissance
+            'date_naissance': {'validators': []},
         }
 
+    # Champs construits une seule fois (introspection du modèle), copiés
+    # ensuite
+    _compiled_fields = None
+
+    def get_fields(self):
+        cls = type(self)
+        if cls.__dict__.get('_compiled_fields') is None:
+            cls._compiled_fields = super().get_fields()
+        return copy.deepcopy(cls._compiled_fields)
+
+    @cached_property
+    def validator(self):
+        return UserValidator()
+
     def validate_date_naissance(self, value):
-        """Validation personnalisée pour la date de naissance"""
-        if not value:
-            raise serializers.ValidationError("La date de naissance est requise.")
-        
-        today = date.today()
-        
-        # Vérifier que la date n'est pas dans le futur
-        if value > today:
-            raise serializers.ValidationError(
-                "La date de naissance ne peut pas être dans le futur."
-            )
-        
-        # Calculer l'âge
-        age = today.year - value.year
-        
-        # Ajuster si l'anniversaire n'est pas encore passé cette année
-        if today.month < value.month or \
-           (today.month == value.month and today.day < value.day):
-            age -= 1
-        
-        # Vérifier l'âge minimum
-        if age < 12:
-            raise serializers.ValidationError(
-                f"Vous devez avoir au moins 12 ans pour créer un compte. "
-                f"Vous avez actuellement {age} ans."
-            )
-        
+        """Date dans le passé et âge minimum (core.validation)"""
+        error = self.validator.birth_date_error(value)
+        if error:
+            raise serializers.ValidationError(error)
         return value
 
     def validate_genre(self, value):
         """Validation pour le genre"""
-        if not value:
-            raise serializers.ValidationError("Le genre est requis.")
+        error = self.validator.genre_error(value)
+        if error:
+            raise serializers.ValidationError(error)
         return value
 
     def validate(self, data):
-        """Validation globale"""
-        # Vérifier que les champs requis sont présents pour les utilisateurs normaux
-        if not data.get('date_naissance'):
-            raise serializers.ValidationError({
-                'date_naissance': 'La date de naissance est requise.'
-            })
-        
-        if not data.get('genre'):
-            raise serializers.ValidationError({
-                'genre': 'Le genre est requis.'
-            })
-        
+        """Champs requis ; en mise à jour partielle, valeurs actuelles"""
+        current = data
+        if self.instance is not None:
+            current = {field: getattr(self.instance, field)
+                       for field in REQUIRED}
+            current.update(data)
+        errors = self.validator.required_errors(current)
+        if errors:
+            raise serializers.ValidationError(errors)
         return data
 
     def create(self, validated_data):
@@ -84,18 +80,18 @@ class UserSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         """Mettre à jour et retourner un utilisateur"""
-        print("update called with:", validated_data)
         password = validated_data.pop('password', None)
         user = super().update(instance, validated_data)
-        print("Updated user:", user.name)
-        
+
         if password:
             user.set_password(password)
+            user.revoke_tokens()
             user.save()
-        
+
         return user
 
-class AuthTokenSerializer(serializers.Serializer):
+
+class AuthTokenSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer pour l'authentification par token"""
     email = serializers.EmailField()
     password = serializers.CharField(
@@ -131,20 +127,23 @@ class AuthTokenSerializer(serializers.Serializer):
 
 User = get_user_model()
 
-class ProfileSerializer(serializers.ModelSerializer):
+
+class ProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['email', 'name']
 
 
-class PasswordResetRequestSerializer(serializers.Serializer):
+class PasswordResetRequestSerializer(TimedSerializerMixin,
+                                     serializers.Serializer):
     email = serializers.EmailField()
 
     # Pas de fuite d’info : on ne valide pas l’existence ici.
     # La vue répondra 200 dans tous les cas.
 
 
-class PasswordResetConfirmSerializer(serializers.Serializer):
+class PasswordResetConfirmSerializer(TimedSerializerMixin,
+                                     serializers.Serializer):
     uid = serializers.CharField()
     token = serializers.CharField()
     new_password = serializers.CharField(min_length=8, write_only=True)
@@ -162,15 +161,10 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
 
     def save(self, **kwargs):
         try:
-            uid = urlsafe_base64_decode(self.validated_data["uid"]).decode()
-            user = User.objects.get(pk=uid)
-        except Exception:
-            raise serializers.ValidationError({"uid": "UID invalide."})
-
-        token = self.validated_data["token"]
-        if not default_token_generator.check_token(user, token):
-            raise serializers.ValidationError({"token": "Token invalide ou expiré."})
-
-        user.set_password(self.validated_data["new_password"])
-        user.save()
-        return user    
\ No newline at end of file
+            return reset_password_for(
+                self.validated_data["uid"],
+                self.validated_data["token"],
+                self.validated_data["new_password"],
+            )
+        except PasswordResetError as e:
+            raise serializers.ValidationError({e.field: str(e)})
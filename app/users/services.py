@@ -0,0 +1,111 @@
+"""Logique métier partagée par les vues sync (DRF) et async (ASGI)."""
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from core.utils import approximate_count
+from users.authentication import get_cached_user
+from users.models import UsedRefreshToken
+from users.pagination import get_page_size, keyset_page
+from users.read_serializers import USER_LIST_READ
+from users.reset_tokens import (  # noqa: F401
+    PasswordResetError, reset_password_for,
+)
+from users.tokens import REFRESH, InvalidToken, issue_tokens, read_token
+
+from .outbox import enqueue_password_reset
+from .utils import send_password_reset_email
+
+RESET_REQUESTED_MESSAGE = (
+    "Si l’email existe, un mail de réinitialisation a été envoyé."
+)
+
+
+def listed_users():
+    return get_user_model().objects.filter(is_superuser=False)
+
+
+def user_for_update(user_id):
+    """Utilisateur actif relu en base avant écriture, ou None.
+
+    ``save()`` réécrit toutes les colonnes : l'instantané du cache
+    d'authentification (is_active, token_version périmés) ne doit pas
+    être sauvegardé.
+    """
+    users = get_user_model().objects.filter(is_active=True)
+    return users.filter(pk=user_id).first()
+
+
+def users_page(request):
+    """Page keyset de ``get_users`` ; ValueError si la requête est invalide"""
+    users = listed_users()
+    page_size = get_page_size(
+        request, settings.USERS_PAGE_SIZE, settings.USERS_MAX_PAGE_SIZE
+    )
+    results, next_url = keyset_page(request, users, USER_LIST_READ, page_size)
+    return {
+        "count": approximate_count(
+            users,
+            "users:get_users:count",
+            mode=settings.USERS_COUNT_MODE,
+            timeout=settings.USERS_COUNT_CACHE_TIMEOUT,
+        ),
+        "next": next_url,
+        "results": results,
+    }
+
+
+def request_password_reset_for(email):
+    """Programme (outbox) ou envoie l'e-mail de reset ; False si inconnu"""
+    user = get_user_model().objects.find_by_email(email)
+    if user is None:
+        return False
+    if settings.PASSWORD_RESET_EMAIL_ASYNC:
+        # Le worker `send_reset_emails` se charge de l'envoi SMTP
+        enqueue_password_reset(user)
+    else:
+        send_password_reset_email(user)
+    return True
+
+
+def check_reset_payload(data):
+    """Retourne ``(uid, token, new_password)`` ou lève PasswordResetError"""
+    uid = data.get("uid")
+    token = data.get("token")
+    new_password = data.get("new_password")
+    re_new_password = data.get("re_new_password")
+
+    if not all([uid, token, new_password, re_new_password]):
+        raise PasswordResetError(
+            "Tous les champs sont requis "
+            "(uid, token, new_password, re_new_password)."
+        )
+    if new_password != re_new_password:
+        raise PasswordResetError("Les mots de passe ne correspondent pas.")
+    return uid, token, new_password
+
+
+def refresh_tokens_for(refresh):
+    """Échange un jeton de rafraîchissement contre une nouvelle paire.
+
+    Le jeton présenté est consommé ; un rejeu révoque tous les jetons de
+    l'utilisateur. Lève InvalidToken.
+    """
+    user_id, expires, version, jti = read_token(refresh, REFRESH)
+    user = get_cached_user(user_id)
+    if user is None or not user.is_active or user.token_version != version:
+        raise InvalidToken("Jeton invalide.")
+    try:
+        with transaction.atomic():
+            UsedRefreshToken.objects.create(
+                jti=jti,
+                expires_at=datetime.fromtimestamp(expires, tz=timezone.utc),
+            )
+    except IntegrityError:
+        # Jeton déjà utilisé : probablement volé
+        user.revoke_tokens()
+        user.save(update_fields=['token_version'])
+        raise InvalidToken("Jeton déjà utilisé.")
+    return issue_tokens(user)
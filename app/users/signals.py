@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.authentication import (
+    invalidate_token,
+    invalidate_user,
+    reset_snapshot_cache,
+)
+from users import stats
+from users.cache import PROFILE_FIELDS, invalidate_profile
+from users.throttling import reset_throttle_store
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_changed(sender, instance, **kwargs):
+    """Nouveau token (CreateTokenView) ou token supprimé"""
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    """Reset du mot de passe, désactivation, modification du profil..."""
+    invalidate_user(instance.pk)
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or PROFILE_FIELDS.intersection(update_fields):
+        invalidate_profile(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_stats_saved(sender, instance, created, raw=False, update_fields=None,
+                     **kwargs):
+    """Compteurs de UserStat touchés par la création ou la modification"""
+    if raw or not settings.USER_STATS['INCREMENTAL']:
+        return
+    if update_fields is not None and not created:
+        if not set(sender.STATS_FIELDS).intersection(update_fields):
+            return
+    stats.user_saved(instance, created)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_stats_deleted(sender, instance, **kwargs):
+    if settings.USER_STATS['INCREMENTAL']:
+        stats.user_deleted(instance)
+
+
+@receiver(setting_changed)
+def token_auth_cache_changed(setting, **kwargs):
+    if setting in ('TOKEN_AUTH_CACHE', 'CACHES'):
+        reset_snapshot_cache()
+    if setting in ('THROTTLE', 'CACHES'):
+        reset_throttle_store()
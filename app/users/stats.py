@@ -0,0 +1,200 @@
+"""Statistiques des utilisateurs (``/api/user/stats/``).
+
+Les effectifs par genre, statut, tranche d'âge et mois d'inscription sont
+stockés dans ``UserStat`` (quelques dizaines de lignes) : une lecture est
+une requête sur cette petite table, quel que soit le nombre
+d'utilisateurs. Les compteurs sont ajustés à chaque création, modification
+ou suppression (``users.signals``) et recalculés par ``refresh_user_stats``,
+à lancer régulièrement : les tranches d'âge changent avec les
+anniversaires, et ``queryset.update()`` ne déclenche pas de signal.
+"""
+from collections import Counter
+from datetime import date, datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core.ages import age_on
+from users.models import UserStat
+
+TOTAL = 'total'
+GENRE = 'genre'
+ACTIVE = 'is_active'
+AGE = 'age'
+JOINED = 'joined'
+DIMENSIONS = (GENRE, ACTIVE, AGE, JOINED)
+UNKNOWN = ''
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def age_bucket(birth, today, size=None):
+    size = size or settings.USER_STATS['AGE_BUCKET']
+    age = age_on(_as_date(birth), today)
+    return UNKNOWN if age is None else str(age // size * size)
+
+
+def joined_month(joined):
+    if joined is None:
+        return UNKNOWN
+    if timezone.is_aware(joined):
+        joined = timezone.localtime(joined)
+    return joined.strftime('%Y-%m')
+
+
+def stats_keys(values, today=None):
+    """Compteurs ``(dimension, clé)`` d'un utilisateur (STATS_FIELDS)"""
+    genre, is_active, birth, joined = values
+    return [
+        (TOTAL, UNKNOWN),
+        (GENRE, genre or UNKNOWN),
+        (ACTIVE, '1' if is_active else '0'),
+        (AGE, age_bucket(birth, today or date.today())),
+        (JOINED, joined_month(joined)),
+    ]
+
+
+def current_values(user):
+    return tuple(getattr(user, field) for field in user.STATS_FIELDS)
+
+
+def count_users(users, today=None):
+    """Compteurs à ajouter pour des utilisateurs créés hors signaux (import)"""
+    today = today or date.today()
+    deltas = Counter()
+    for user in users:
+        deltas.update(stats_keys(current_values(user), today))
+    return deltas
+
+
+def adjust(deltas):
+    """Ajoute ``deltas`` (``{(dimension, clé): n}``) en un seul UPDATE.
+
+    Les compteurs absents sont créés à 0 puis mis à jour.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    def apply(keys):
+        conditions = [Q(dimension=dimension, key=key)
+                      for dimension, key in keys]
+        match = conditions[0]
+        for condition in conditions[1:]:
+            match |= condition
+        increment = Case(
+            *(When(condition, then=Value(deltas[key]))
+              for condition, key in zip(conditions, keys)),
+            default=Value(0),
+        )
+        return UserStat.objects.filter(match).update(
+            count=F('count') + increment
+        )
+
+    keys = list(deltas)
+    if apply(keys) < len(keys):
+        rows = UserStat.objects.filter(dimension__in={d for d, _ in keys})
+        existing = set(rows.values_list('dimension', 'key'))
+        missing = [key for key in keys if key not in existing]
+        UserStat.objects.bulk_create(
+            [UserStat(dimension=dimension, key=key)
+             for dimension, key in missing],
+            ignore_conflicts=True,
+        )
+        apply(missing)
+
+
+def user_saved(user, created):
+    if created:
+        adjust(Counter(stats_keys(current_values(user))))
+    else:
+        previous = getattr(user, '_stats_values', None)
+        if previous is None:
+            # État précédent inconnu : corrigé au prochain recalcul
+            return
+        today = date.today()
+        deltas = Counter(stats_keys(current_values(user), today))
+        deltas.subtract(stats_keys(previous, today))
+        adjust(deltas)
+    user.remember_stats_fields()
+
+
+def user_deleted(user):
+    values = getattr(user, '_stats_values', None) or current_values(user)
+    adjust({key: -1 for key in stats_keys(values)})
+
+
+def compute_stats(today=None):
+    """Effectifs recalculés depuis la table des utilisateurs (agrégats)"""
+    users = get_user_model().objects.order_by()
+    counts = Counter({(TOTAL, UNKNOWN): users.count()})
+    for genre, count in users.values_list('genre').annotate(n=Count('pk')):
+        counts[(GENRE, genre or UNKNOWN)] += count
+    actives = users.values_list('is_active').annotate(n=Count('pk'))
+    for is_active, count in actives:
+        counts[(ACTIVE, '1' if is_active else '0')] += count
+    size = settings.USER_STATS['AGE_BUCKET']
+    for bucket, count in users.age_histogram(size, today).items():
+        counts[(AGE, UNKNOWN if bucket is None else str(bucket))] += count
+    months = (
+        users.annotate(month=TruncMonth('date_joined'))
+        .values_list('month').annotate(n=Count('pk'))
+    )
+    for month, count in months:
+        counts[(JOINED, joined_month(month))] += count
+    return counts
+
+
+def refresh_stats(today=None):
+    """Remplace le contenu de ``UserStat`` par un recalcul complet"""
+    counts = compute_stats(today)
+    now = timezone.now()
+    with transaction.atomic():
+        UserStat.objects.all().delete()
+        UserStat.objects.bulk_create([
+            UserStat(dimension=dimension, key=key, count=count,
+                     refreshed_at=now)
+            for (dimension, key), count in counts.items()
+        ])
+    return counts
+
+
+def _sort_key(row):
+    dimension, key = row[:2]
+    # Tranches d'âge dans l'ordre numérique, valeur inconnue en dernier
+    start = int(key) if dimension == AGE and key else 0
+    return (key == UNKNOWN, start, key)
+
+
+def read_stats():
+    """Effectifs lus dans ``UserStat`` (une requête)"""
+    rows = list(UserStat.objects.values_list(
+        'dimension', 'key', 'count', 'refreshed_at'
+    ))
+    size = settings.USER_STATS['AGE_BUCKET']
+    result = {TOTAL: 0, **{dimension: {} for dimension in DIMENSIONS}}
+    result['refreshed_at'] = None
+    for dimension, key, count, refreshed_at in sorted(rows, key=_sort_key):
+        oldest = result['refreshed_at']
+        if oldest is None or refreshed_at < oldest:
+            result['refreshed_at'] = refreshed_at
+        if dimension == TOTAL:
+            result[TOTAL] = count
+        elif dimension in result and count:
+            if dimension == AGE and key != UNKNOWN:
+                start = int(key)
+                key = f'{start}-{start + size - 1}'
+            elif dimension == ACTIVE:
+                key = 'true' if key == '1' else 'false'
+            result[dimension][key or 'inconnu'] = count
+    return result
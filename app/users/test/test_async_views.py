@@ -0,0 +1,144 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.db.models import F
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.authtoken.models import Token
+
+from users.models import PasswordResetOutbox
+
+GET_USERS_URL = reverse('user:async_get_users')
+MOI_URL = reverse('user:async_moi')
+RESET_URL = reverse('user:async_password_reset')
+RESET_CONFIRM_URL = reverse('user:async_password_reset_confirm')
+
+
+def create_user(email, **params):
+    defaults = {
+        'password': 'OldPass123!',
+        'name': 'Async User',
+        'genre': 'H',
+        'date_naissance': '1995-05-05',
+    }
+    defaults.update(params)
+    return get_user_model().objects.create_user(email=email, **defaults)
+
+
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        self.user = create_user('async@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client = AsyncClient()
+
+    def auth(self, token=None):
+        return {'authorization': f'Token {token or self.token.key}'}
+
+    def test_views_are_coroutines(self):
+        for url in (GET_USERS_URL, MOI_URL, RESET_URL, RESET_CONFIRM_URL):
+            self.assertTrue(asyncio.iscoroutinefunction(resolve(url).func))
+
+    async def test_profile_requires_token(self):
+        res = await self.client.get(MOI_URL)
+        self.assertEqual(res.status_code, 401)
+
+    async def test_profile_get(self):
+        res = await self.client.get(MOI_URL, **self.auth())
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(),
+                         {'email': self.user.email, 'name': self.user.name})
+
+    async def test_profile_patch(self):
+        res = await self.client.patch(
+            MOI_URL,
+            {'name': 'Nouveau', 'genre': 'H', 'date_naissance': '1995-05-05'},
+            content_type='application/json', **self.auth()
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['name'], 'Nouveau')
+
+    async def test_patch_does_not_save_cached_snapshot(self):
+        """PATCH après une désactivation ou révocation hors du cache"""
+        users = get_user_model().objects.filter(pk=self.user.pk)
+        payload = {'name': 'Nouveau', 'genre': 'H',
+                   'date_naissance': '1995-05-05'}
+        # Instantané mis en cache par un premier appel authentifié
+        await self.client.get(MOI_URL, **self.auth())
+        await sync_to_async(users.update)(token_version=F('token_version') + 1)
+        res = await self.client.patch(MOI_URL, payload,
+                                      content_type='application/json',
+                                      **self.auth())
+        self.assertEqual(res.status_code, 200)
+        user = await sync_to_async(users.get)()
+        self.assertEqual((user.name, user.token_version), ('Nouveau', 1))
+
+        await sync_to_async(users.update)(is_active=False)
+        res = await self.client.patch(MOI_URL, payload,
+                                      content_type='application/json',
+                                      **self.auth())
+        self.assertEqual(res.status_code, 401)
+        user = await sync_to_async(users.get)()
+        self.assertEqual((user.is_active, user.token_version), (False, 1))
+
+    async def test_method_not_allowed(self):
+        res = await self.client.delete(MOI_URL, **self.auth())
+        self.assertEqual(res.status_code, 405)
+
+    async def test_get_users_requires_staff(self):
+        res = await self.client.get(GET_USERS_URL, **self.auth())
+        self.assertEqual(res.status_code, 403)
+
+    async def test_get_users_paginates(self):
+        staff = await sync_to_async(create_user)(
+            'staff@example.com', is_staff=True
+        )
+        token = await sync_to_async(Token.objects.create)(user=staff)
+        res = await self.client.get(
+            GET_USERS_URL + '?page_size=1', **self.auth(token.key)
+        )
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual(len(body['results']), 1)
+        self.assertIn('cursor=', body['next'])
+
+    @override_settings(PASSWORD_RESET_EMAIL_ASYNC=True)
+    async def test_request_reset_enqueues(self):
+        res = await self.client.post(
+            RESET_URL, {'email': self.user.email},
+            content_type='application/json',
+        )
+        self.assertEqual(res.status_code, 200)
+        outbox = PasswordResetOutbox.objects.filter(user=self.user)
+        count = await sync_to_async(outbox.count)()
+        self.assertEqual(count, 1)
+
+    async def test_request_reset_invalid_json(self):
+        res = await self.client.post(RESET_URL, 'pas du json',
+                                     content_type='application/json')
+        self.assertEqual(res.status_code, 400)
+
+    async def test_reset_password(self):
+        payload = {
+            'uid': urlsafe_base64_encode(force_bytes(self.user.pk)),
+            'token': default_token_generator.make_token(self.user),
+            'new_password': 'NewPass123!',
+            're_new_password': 'NewPass123!',
+        }
+        res = await self.client.post(RESET_CONFIRM_URL, payload,
+                                     content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        await sync_to_async(self.user.refresh_from_db)()
+        self.assertTrue(self.user.check_password('NewPass123!'))
+
+    async def test_reset_password_mismatch(self):
+        res = await self.client.post(RESET_CONFIRM_URL, {
+            'uid': 'x', 'token': 'y',
+            'new_password': 'a', 're_new_password': 'b',
+        }, content_type='application/json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()['message'],
+                         'Les mots de passe ne correspondent pas.')
@@ -0,0 +1,126 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.authentication import (
+    LRUCache,
+    SnapshotCache,
+    get_snapshot_cache,
+    invalidate_users,
+    make_user_snapshot,
+    reset_snapshot_cache,
+)
+
+MOI_URL = reverse('user:moi')
+TOKEN_URL = reverse('user:token')
+
+
+class LRUCacheTests(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_expired_entries(self):
+        cache = LRUCache(max_size=2, ttl=-1)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        reset_snapshot_cache()
+        self.user = get_user_model().objects.create_user(
+            email='token@example.com',
+            password='testpass123',
+            name='Token User',
+            genre='H',
+            date_naissance='1995-05-05',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def users(self):
+        return get_user_model().objects.filter(pk=self.user.pk)
+
+    def test_cache_hit_needs_no_query(self):
+        res = self.client.get(MOI_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            res = self.client.get(MOI_URL)
+        self.assertEqual(res.json()['email'], self.user.email)
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token nope')
+        res = self.client.get(MOI_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_invalidates_cache(self):
+        self.client.get(MOI_URL)
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(MOI_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_refreshes_snapshot(self):
+        self.client.get(MOI_URL)
+        self.user.name = 'Nouveau nom'
+        self.user.save()
+        self.assertEqual(self.client.get(MOI_URL).data['name'], 'Nouveau nom')
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(MOI_URL)
+        self.token.delete()
+        res = self.client.get(MOI_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_patch_saves_database_state(self):
+        # Désactivation hors signaux (run_admin_jobs), instantané en cache
+        self.client.get(MOI_URL)
+        self.users().update(is_active=False)
+        res = self.client.patch(MOI_URL, {'name': 'Autre'})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.user.name, 'Token User')
+
+    def test_patch_keeps_password(self):
+        self.client.get(MOI_URL)
+        self.users().update(name='Ailleurs')
+        res = self.client.patch(MOI_URL, {'genre': 'F'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('testpass123'))
+        self.assertEqual((self.user.name, self.user.genre), ('Ailleurs', 'F'))
+
+    def test_snapshot_without_password(self):
+        self.assertNotIn('password', dict(make_user_snapshot(self.user)))
+
+
+SHARED = {'MAX_SIZE': 100, 'TTL': 300, 'SHARED_CACHE': 'default'}
+
+
+@override_settings(TOKEN_AUTH_CACHE=SHARED)
+class SharedSnapshotCacheTests(CachedTokenAuthenticationTests):
+    def test_no_local_tier(self):
+        self.assertIsNone(get_snapshot_cache().local)
+
+    def test_invalidation_from_other_process(self):
+        self.client.get(MOI_URL)
+        # Un autre processus (cache local distinct, même cache partagé)
+        other = SnapshotCache(max_size=100, ttl=300, shared_alias='default')
+        self.assertIsNotNone(other.get(f'auth:user:{self.user.pk}'))
+        self.users().update(is_active=False)
+        invalidate_users([self.user.pk])
+        self.assertIsNone(other.get(f'auth:user:{self.user.pk}'))
+        res = self.client.get(MOI_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
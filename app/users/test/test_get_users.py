@@ -0,0 +1,91 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.pagination import decode_cursor, encode_cursor
+
+GET_USERS_URL = '/api/user/get_users/'
+
+
+def create_users(count, start=0):
+    User = get_user_model()
+    return User.objects.bulk_create([
+        User(
+            email=f'user{i}@example.com',
+            name=f'User {i}',
+            genre='F',
+            date_naissance='2000-01-01',
+        )
+        for i in range(start, start + count)
+    ])
+
+
+@override_settings(
+    USERS_PAGE_SIZE=2, USERS_MAX_PAGE_SIZE=3, USERS_STREAM_CHUNK_SIZE=2,
+)
+class GetUsersApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass123',
+            date_naissance='1990-01-01',
+        )
+        create_users(5)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(user=None)
+        res = self.client.get(GET_USERS_URL)
+        self.assertIn(
+            res.status_code,
+            (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN),
+        )
+
+    def test_keyset_pages_cover_all_users(self):
+        emails = []
+        url = GET_USERS_URL
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data['results']), 2)
+            emails += [row['email'] for row in res.data['results']]
+            url = res.data['next']
+        self.assertEqual(emails, [f'user{i}@example.com' for i in range(5)])
+        self.assertNotIn('admin@example.com', emails)
+
+    def test_page_size_is_bounded(self):
+        res = self.client.get(GET_USERS_URL, {'page_size': 50})
+        self.assertEqual(len(res.data['results']), 3)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(GET_USERS_URL, {'cursor': '!!'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_count_is_cached(self):
+        self.assertEqual(self.client.get(GET_USERS_URL).data['count'], 5)
+        create_users(1, start=5)
+        self.assertEqual(self.client.get(GET_USERS_URL).data['count'], 5)
+
+    def test_stream_ndjson(self):
+        res = self.client.get(GET_USERS_URL, {'stream': 'ndjson'})
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(res.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])['email'], 'user0@example.com')
+
+    def test_stream_json_array(self):
+        res = self.client.get(GET_USERS_URL, {'stream': 'json'})
+        rows = json.loads(b''.join(res.streaming_content))
+        self.assertEqual(
+            [row['name'] for row in rows], [f'User {i}' for i in range(5)]
+        )
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(42)), 42)
+        self.assertEqual(decode_cursor(None), 0)
@@ -0,0 +1,138 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.db import connection
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import PasswordResetOutbox
+from users.outbox import claim_batch, drain_outbox, enqueue_password_reset
+from users.utils import format_duration
+
+PASSWORD_RESET_URL = reverse('user:password_reset')
+
+
+def create_user(email):
+    return get_user_model().objects.create_user(
+        email=email,
+        password='OldPass123!',
+        name='Outbox User',
+        genre='F',
+        date_naissance='2000-01-01',
+    )
+
+
+def smtp_down():
+    return patch(
+        'django.core.mail.EmailMessage.send', side_effect=OSError('smtp down'),
+    )
+
+
+@override_settings(PASSWORD_RESET_EMAIL_ASYNC=True)
+class PasswordResetOutboxTests(TestCase):
+    def setUp(self):
+        self.user = create_user('outbox@example.com')
+
+    def test_request_only_enqueues(self):
+        res = APIClient().post(
+            PASSWORD_RESET_URL, {'email': self.user.email}, format='json',
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        entries = PasswordResetOutbox.objects.filter(user=self.user)
+        self.assertEqual(entries.count(), 1)
+
+    def test_repeat_requests_are_deduplicated(self):
+        self.assertTrue(enqueue_password_reset(self.user))
+        self.assertFalse(enqueue_password_reset(self.user))
+        self.assertEqual(PasswordResetOutbox.objects.count(), 1)
+
+    def test_drain_sends_batch_with_one_connection(self):
+        other = create_user('outbox2@example.com')
+        enqueue_password_reset(self.user)
+        enqueue_password_reset(other)
+
+        with patch('users.outbox.get_connection',
+                   wraps=mail.get_connection) as get_connection:
+            stats = drain_outbox(batch_size=10)
+
+        get_connection.assert_called_once()
+        self.assertEqual(stats['sent'], 2)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox),
+                         [other.email, self.user.email])
+        pending = PasswordResetOutbox.objects.filter(
+            status=PasswordResetOutbox.STATUS_PENDING)
+        self.assertFalse(pending.exists())
+
+        # Une nouvelle demande est possible une fois l'e-mail envoyé
+        self.assertTrue(enqueue_password_reset(self.user))
+
+    def test_failed_send_is_retried_with_backoff(self):
+        enqueue_password_reset(self.user)
+        with smtp_down():
+            stats = drain_outbox(max_attempts=2, backoff=10)
+
+        self.assertEqual(stats['retried'], 1)
+        entry = PasswordResetOutbox.objects.get()
+        self.assertEqual(entry.attempts, 1)
+        self.assertEqual(entry.status, PasswordResetOutbox.STATUS_PENDING)
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+
+        # Pas encore l'heure : rien n'est envoyé
+        self.assertEqual(drain_outbox()['retried'], 0)
+
+        entry.next_attempt_at = timezone.now()
+        entry.save()
+        with smtp_down():
+            stats = drain_outbox(max_attempts=2, backoff=10)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(PasswordResetOutbox.objects.get().status,
+                         PasswordResetOutbox.STATUS_FAILED)
+
+    def test_send_outside_transaction(self):
+        enqueue_password_reset(self.user)
+        depth = len(connection.savepoint_ids)
+        send = mail.EmailMessage.send
+        depths = []
+
+        def spy(message, *args, **kwargs):
+            depths.append(len(connection.savepoint_ids))
+            return send(message, *args, **kwargs)
+
+        with patch('django.core.mail.EmailMessage.send', spy):
+            self.assertEqual(drain_outbox()['sent'], 1)
+        self.assertEqual(depths, [depth])
+
+    def test_claimed_batch_is_hidden_until_lease_expires(self):
+        enqueue_password_reset(self.user)
+        self.assertEqual(len(claim_batch(10, lease=60)), 1)
+        self.assertEqual(claim_batch(10, lease=60), [])
+        entry = PasswordResetOutbox.objects.get()
+        self.assertEqual(entry.status, PasswordResetOutbox.STATUS_PENDING)
+        # Worker arrêté : le lot redevient disponible à l'expiration du bail
+        PasswordResetOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(len(claim_batch(10, lease=60)), 1)
+
+    @override_settings(PASSWORD_RESET_TOKENS={
+        'TTL': 1800, 'CACHE': 'default', 'ACCEPT_LEGACY': True,
+    })
+    def test_email_states_token_ttl(self):
+        enqueue_password_reset(self.user)
+        drain_outbox()
+        self.assertIn('expire dans 30 minutes', mail.outbox[0].body)
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(3600), '1 heure')
+        self.assertEqual(format_duration(7200), '2 heures')
+        self.assertEqual(format_duration(90), '1 minute')
+
+    def test_worker_command(self):
+        enqueue_password_reset(self.user)
+        call_command('send_reset_emails', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
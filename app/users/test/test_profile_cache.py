@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.cache import get_cached_profile
+
+MOI_URL = reverse('user:moi')
+
+
+class ProfileCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='cache@example.com',
+            password='OldPass123!',
+            name='Cache User',
+            genre='F',
+            date_naissance='1990-01-01',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_first_get_fills_cache(self):
+        res = self.client.get(MOI_URL)
+        self.assertEqual(res.status_code, 200)
+        body, content_type, etag = get_cached_profile(self.user.pk)
+        self.assertEqual(res.content, body)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_cache_hit_skips_serializer(self):
+        first = self.client.get(MOI_URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(MOI_URL)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second.json(),
+                         {'email': self.user.email, 'name': self.user.name})
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(MOI_URL)['ETag']
+        res = self.client.get(MOI_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b'')
+        self.assertEqual(res['ETag'], etag)
+
+    def test_if_none_match_on_cache_miss(self):
+        etag = self.client.get(MOI_URL)['ETag']
+        cache.clear()
+        res = self.client.get(MOI_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+    def test_stale_etag_returns_body(self):
+        res = self.client.get(MOI_URL, HTTP_IF_NONE_MATCH='"perime"')
+        self.assertEqual(res.status_code, 200)
+
+    def test_profile_update_invalidates(self):
+        etag = self.client.get(MOI_URL)['ETag']
+        self.client.patch(MOI_URL, {
+            'name': 'Nouveau nom', 'genre': 'F',
+            'date_naissance': '1990-01-01',
+        }, format='json')
+        self.assertIsNone(get_cached_profile(self.user.pk))
+        res = self.client.get(MOI_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['name'], 'Nouveau nom')
+
+    def test_admin_or_reset_save_invalidates(self):
+        self.client.get(MOI_URL)
+        self.user.set_password('NewPass123!')
+        self.user.save()
+        self.assertIsNone(get_cached_profile(self.user.pk))
+
+    def test_unrelated_update_fields_keep_cache(self):
+        self.client.get(MOI_URL)
+        self.user.save(update_fields=['last_login'])
+        self.assertIsNotNone(get_cached_profile(self.user.pk))
+
+    def test_browsable_api_not_cached(self):
+        res = self.client.get(MOI_URL, HTTP_ACCEPT='text/html')
+        self.assertEqual(res.status_code, 200)
+        self.assertIsNone(get_cached_profile(self.user.pk))
@@ -0,0 +1,94 @@
+import struct
+import zlib
+
+from django.conf import settings
+from django.core import mail
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from users.qr import qr_matrix, render_qr
+from users.utils import send_password_reset_email
+
+RESET_URL = (
+    'http://localhost:3000/password-reset/confirm/'
+    'MQ/cwxyz1-0123456789abcdef0123'
+)
+
+
+def read_png(content):
+    """Retourne (largeur, hauteur, données décompressées) d'un PNG"""
+    assert content[:8] == b'\x89PNG\r\n\x1a\n'
+    pos, chunks = 8, {}
+    while pos < len(content):
+        length, tag = struct.unpack('>I4s', content[pos:pos + 8])
+        chunks.setdefault(tag, b'')
+        chunks[tag] += content[pos + 8:pos + 8 + length]
+        pos += 12 + length
+    width, height = struct.unpack('>II', chunks[b'IHDR'][:8])
+    return width, height, zlib.decompress(chunks[b'IDAT'])
+
+
+class QRRenderingTests(SimpleTestCase):
+    def test_fixed_version_matrix(self):
+        matrix = qr_matrix(RESET_URL, version=6, border=0)
+        self.assertEqual(len(matrix), 41)
+
+    def test_overflow_falls_back_to_fit(self):
+        matrix = qr_matrix('x' * 300, version=1, border=0)
+        self.assertGreater(len(matrix), 21)
+
+    def test_png_without_pil(self):
+        image = render_qr(
+            RESET_URL, fmt='png', version=6, box_size=2, border=4,
+        )
+        self.assertEqual(image.content_type, 'image/png')
+        width, height, raw = read_png(image.content)
+        self.assertEqual(width, (41 + 8) * 2)
+        self.assertEqual(height, width)
+        self.assertEqual(len(raw), height * (1 + (width + 7) // 8))
+
+    def test_svg(self):
+        image = render_qr(RESET_URL, fmt='svg', version=6)
+        self.assertEqual(image.filename, 'reset_qr.svg')
+        self.assertTrue(image.content.startswith(b'<svg'))
+
+    def test_reset_urls_not_kept_in_memory(self):
+        # Les liens de reset sont des secrets à usage unique
+        self.assertFalse(hasattr(render_qr, 'cache_info'))
+
+
+class ResetEmailQRTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='qr@example.com',
+            password='OldPass123!',
+            name='QR User',
+            genre='H',
+            date_naissance='2000-01-01',
+        )
+
+    def test_attach_mode(self):
+        send_password_reset_email(self.user)
+        filename, content, mimetype = mail.outbox[0].attachments[0]
+        self.assertEqual((filename, mimetype), ('reset_qr.png', 'image/png'))
+
+    @override_settings(BACKEND_URL='')
+    def test_lazy_mode_serves_signed_url(self):
+        lazy = {**settings.PASSWORD_RESET_QR, 'MODE': 'lazy'}
+        with self.settings(PASSWORD_RESET_QR=lazy):
+            send_password_reset_email(self.user)
+        message = mail.outbox[0]
+        self.assertEqual(message.attachments, [])
+        qr_url = next(
+            line for line in message.body.splitlines()
+            if '/password-reset/qr/' in line
+        )
+
+        client = APIClient()
+        res = client.get(qr_url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'image/png')
+
+        res = client.get(qr_url.rstrip('/') + 'x/')
+        self.assertEqual(res.status_code, 404)
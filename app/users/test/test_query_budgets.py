@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.testing import QueryBudgetMixin
+
+# Nombre maximal de requêtes SQL par endpoint (réponse réussie),
+# authentification par token comprise
+QUERY_BUDGETS = {
+    'moi': 1,
+    'moi (cache)': 0,
+    'moi (patch)': 3,  # dont la relecture de l'utilisateur avant save()
+    'get_users': 3,
+    'create': 3,  # dont la mise à jour des compteurs de UserStat
+    'token': 1,
+    'password_reset': 5,
+    'password_reset_confirm': 2,
+}
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='budget@example.com',
+            password='testpass123',
+            name='Budget',
+            genre='H',
+            date_naissance='1990-01-01',
+            is_staff=True,
+        )
+        self.client = APIClient()
+        self.auth_client = APIClient()
+        token = Token.objects.create(user=self.user)
+        self.auth_client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_moi(self):
+        url = reverse('user:moi')
+        res = self.assertEndpointBudget(
+            QUERY_BUDGETS['moi'], 'get', url, self.auth_client
+        )
+        self.assertEqual(res.status_code, 200)
+        res = self.assertEndpointBudget(
+            QUERY_BUDGETS['moi (cache)'], 'get', url, self.auth_client
+        )
+        self.assertEqual(res.status_code, 200)
+
+    def test_moi_patch(self):
+        res = self.assertEndpointBudget(
+            QUERY_BUDGETS['moi (patch)'], 'patch', reverse('user:moi'),
+            self.auth_client,
+            data={'name': 'Nouveau', 'genre': 'H',
+                  'date_naissance': '1990-01-01'},
+        )
+        self.assertEqual(res.status_code, 200)
+
+    def test_get_users(self):
+        for i in range(20):
+            get_user_model().objects.create_user(
+                email=f'user{i}@example.com', password='testpass123',
+                date_naissance='1990-01-01',
+            )
+        res = self.assertEndpointBudget(
+            QUERY_BUDGETS['get_users'], 'get', '/api/user/get_users/',
+            self.auth_client,
+        )
+        self.assertEqual(res.status_code, 200)
+
+    def test_create(self):
+        # Compteurs de statistiques déjà présents (cas courant) : un seul
+        # UPDATE
+        get_user_model().objects.create_user(
+            email='other@example.com', password='testpass123', name='Other',
+            genre='F', date_naissance='1990-01-01',
+        )
+        res = self.assertEndpointBudget(
+            QUERY_BUDGETS['create'], 'post', reverse('user:create'),
+            data={
+                'email': 'new@example.com',
+                'password': 'testpass123',
+                'name': 'New',
+                'genre': 'F',
+                'date_naissance': '1990-01-01',
+            },
+        )
+        self.assertEqual(res.status_code, 201)
+
+    def test_token(self):
+        res = self.assertEndpointBudget(
+            QUERY_BUDGETS['token'], 'post', reverse('user:token'),
+            data={'email': self.user.email, 'password': 'testpass123'},
+        )
+        self.assertEqual(res.status_code, 200)
+
+    def test_password_reset(self):
+        res = self.assertEndpointBudget(
+            QUERY_BUDGETS['password_reset'], 'post',
+            reverse('user:password_reset'),
+            data={'email': self.user.email},
+        )
+        self.assertEqual(res.status_code, 200)
+
+    def test_password_reset_confirm(self):
+        res = self.assertEndpointBudget(
+            QUERY_BUDGETS['password_reset_confirm'], 'post',
+            reverse('user:password_reset_confirm'),
+            data={
+                'uid': urlsafe_base64_encode(force_bytes(self.user.pk)),
+                'token': default_token_generator.make_token(self.user),
+                'new_password': 'NewPass123!x',
+                're_new_password': 'NewPass123!x',
+            },
+        )
+        self.assertEqual(res.status_code, 200)
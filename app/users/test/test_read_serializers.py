@@ -0,0 +1,70 @@
+from datetime import date, datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer, dumps
+from users.read_serializers import PROFILE_READ, USER_LIST_READ, ReadSerializer
+from users.serializers import ProfileSerializer
+
+User = get_user_model()
+
+
+class DatesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'date_naissance', 'last_login']
+
+
+class ReadSerializerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='read@example.com',
+            password='testpass123',
+            name='Read User',
+            genre='F',
+            date_naissance='1990-03-04',
+        )
+        self.user.last_login = datetime(2024, 5, 6, 7, 8, 9, 123456,
+                                        tzinfo=timezone.utc)
+        self.user.save()
+        self.user.refresh_from_db()
+
+    def test_profile_matches_model_serializer(self):
+        self.assertEqual(PROFILE_READ.to_dict(self.user),
+                         ProfileSerializer(self.user).data)
+
+    def test_dates_match_model_serializer(self):
+        read = ReadSerializer(User, ('id', 'date_naissance', 'last_login'))
+        expected = DatesSerializer(self.user).data
+        self.assertEqual(read.to_dict(self.user), expected)
+        queryset = User.objects.filter(pk=self.user.pk)
+        self.assertEqual(read.dicts(queryset), [expected])
+
+    def test_dicts_and_tuples(self):
+        queryset = User.objects.filter(pk=self.user.pk)
+        self.assertEqual(
+            USER_LIST_READ.dicts(queryset),
+            [{'id': self.user.pk, 'email': self.user.email,
+              'name': self.user.name}],
+        )
+        self.assertEqual(USER_LIST_READ.tuples(queryset),
+                         [(self.user.pk, self.user.email, self.user.name)])
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {'email': 'é@example.com', 'date': date(2020, 1, 2),
+                'list': [1, None, True]}
+        self.assertEqual(FastJSONRenderer().render(data),
+                         JSONRenderer().render(data))
+        self.assertEqual(dumps(data), JSONRenderer().render(data))
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_serializers', rows=50, repeat=1, db=True,
+                     stdout=out)
+        self.assertIn('liste (base)', out.getvalue())
+        self.assertEqual(User.objects.count(), 1)
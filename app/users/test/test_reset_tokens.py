@@ -0,0 +1,127 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from users.reset_tokens import (
+    PasswordResetError,
+    check_reset_token,
+    make_reset_token,
+    reset_password_for,
+)
+from users.serializers import PasswordResetConfirmSerializer
+from users.utils import make_reset_payload
+
+CONFIRM_URL = reverse('user:password_reset_confirm')
+
+
+class ResetTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='engine@example.com',
+            password='OldPass123!',
+            name='Engine',
+            genre='F',
+            date_naissance='1990-01-01',
+        )
+        self.uid = urlsafe_base64_encode(force_bytes(self.user.pk))
+        self.client = APIClient()
+
+    def confirm(self, token, uid=None):
+        return self.client.post(CONFIRM_URL, {
+            'uid': uid or self.uid,
+            'token': token,
+            'new_password': 'NewPass123!',
+            're_new_password': 'NewPass123!',
+        }, format='json')
+
+    def test_reset_with_new_token(self):
+        uid, token, url = make_reset_payload(self.user)
+        self.assertTrue(url.endswith(f'/{uid}/{token}'))
+        self.assertEqual(self.confirm(token, uid).status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('NewPass123!'))
+
+    def test_checks_before_any_query(self):
+        token = make_reset_token(self.user, now=1000)
+        with self.assertNumQueries(0):
+            user_id, version, _ = check_reset_token(self.uid, token, now=1000)
+            self.assertEqual((user_id, version), (self.user.pk, 0))
+            tampered = token[:-1] + ('A' if token[-1] != 'A' else 'B')
+            other_uid = urlsafe_base64_encode(force_bytes(self.user.pk + 1))
+            for uid, bad_token, now in (
+                (self.uid, 'garbage', 1000),
+                (self.uid, token, 1000 + 3601),
+                (self.uid, tampered, 1000),
+                (other_uid, token, 1000),
+                ('!!', token, 1000),
+            ):
+                with self.assertRaises(PasswordResetError):
+                    check_reset_token(uid, bad_token, now=now)
+
+    def test_garbage_token_rejected_without_query(self):
+        with self.assertNumQueries(0):
+            res = self.confirm('not-a-valid-token')
+        self.assertEqual(res.status_code, 400)
+
+    def test_replay_rejected_without_query(self):
+        token = make_reset_token(self.user)
+        self.assertEqual(self.confirm(token).status_code, 200)
+        with self.assertNumQueries(0):
+            res = self.confirm(token)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()['message'], 'Token déjà utilisé.')
+
+    def test_reset_revokes_other_tokens_even_without_cache(self):
+        first = make_reset_token(self.user, now=1000)
+        second = make_reset_token(self.user, now=1001)
+        reset_password_for(self.uid, first, 'NewPass123!', now=1002)
+        cache.clear()
+        with self.assertRaises(PasswordResetError):
+            reset_password_for(self.uid, second, 'OtherPass123!', now=1002)
+        with self.assertRaises(PasswordResetError):
+            reset_password_for(self.uid, first, 'OtherPass123!', now=1002)
+
+    def test_password_changed_outside_reset_invalidates_token(self):
+        token = make_reset_token(self.user)
+        self.user.set_password('AdminPass123!')
+        self.user.save()
+        with self.assertRaises(PasswordResetError):
+            reset_password_for(self.uid, token, 'NewPass123!')
+        self.assertEqual(self.confirm(token).status_code, 400)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('AdminPass123!'))
+
+    def test_legacy_token(self):
+        token = default_token_generator.make_token(self.user)
+        strict = {'TTL': 3600, 'CACHE': 'default', 'ACCEPT_LEGACY': False}
+        with override_settings(PASSWORD_RESET_TOKENS=strict):
+            self.assertEqual(self.confirm(token).status_code, 400)
+        self.assertEqual(self.confirm(token).status_code, 200)
+
+    def test_serializer_uses_engine(self):
+        serializer = PasswordResetConfirmSerializer(data={
+            'uid': 'AA',
+            'token': make_reset_token(self.user),
+            'new_password': 'NewPass123!',
+            're_new_password': 'NewPass123!',
+        })
+        self.assertTrue(serializer.is_valid())
+        with self.assertRaises(ValidationError) as cm:
+            serializer.save()
+        self.assertIn('uid', cm.exception.detail)
+
+        serializer = PasswordResetConfirmSerializer(data={
+            'uid': self.uid,
+            'token': make_reset_token(self.user),
+            'new_password': 'NewPass123!',
+            're_new_password': 'NewPass123!',
+        })
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.save(), self.user)
@@ -0,0 +1,124 @@
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.admin_jobs import DEACTIVATE, create_job, run_job
+from core.query_audit import seed_users
+from users.models import UserStat
+from users.stats import compute_stats, read_stats, refresh_stats
+
+STATS_URL = reverse('user:stats')
+
+
+def stored_counts():
+    return {(s.dimension, s.key): s.count
+            for s in UserStat.objects.all() if s.count}
+
+
+class UserStatsTests(TestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        self.user = self.User.objects.create_user(
+            email='stats@example.com', password='testpass123', name='Stats',
+            genre='F', date_naissance='1990-01-01',
+        )
+
+    def assertCountsCurrent(self):
+        expected = {k: v for k, v in compute_stats().items() if v}
+        self.assertEqual(stored_counts(), expected)
+
+    def test_signals_keep_counts_current(self):
+        self.assertCountsCurrent()
+        user = self.User.objects.get(pk=self.user.pk)
+        user.genre = 'H'
+        user.is_active = False
+        user.save()
+        self.assertCountsCurrent()
+        self.User.objects.get(pk=self.user.pk).delete()
+        self.assertCountsCurrent()
+        self.assertEqual(read_stats()['total'], 0)
+
+    def test_unrelated_save_runs_no_stats_query(self):
+        user = self.User.objects.get(pk=self.user.pk)
+        user.name = 'Autre'
+        with self.assertNumQueries(1):
+            user.save()
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
+
+    def test_bulk_paths(self):
+        seed_users(120)
+        # bulk_create ne déclenche pas de signal : recalcul complet
+        refresh_stats()
+        self.assertCountsCurrent()
+        run_job(create_job(DEACTIVATE, self.User.objects.filter(genre='H')))
+        self.assertCountsCurrent()
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv',
+                                         delete=False) as f:
+            f.write('email,name,genre,date_naissance\n')
+            f.write('import1@example.com,Import,H,1985-05-05\n')
+            f.write('import2@example.com,Import,F,2001-05-05\n')
+        self.addCleanup(os.remove, f.name)
+        call_command('import_users', f.name, stdout=StringIO())
+        self.assertCountsCurrent()
+
+        out = StringIO()
+        call_command('refresh_user_stats', stdout=out)
+        self.assertIn('123 utilisateurs', out.getvalue())
+
+    @override_settings(USER_STATS={'AGE_BUCKET': 10, 'INCREMENTAL': False})
+    def test_refresh_only_mode(self):
+        self.User.objects.create_user(
+            email='late@example.com', password='testpass123', name='Late',
+            genre='H', date_naissance='2000-01-01',
+        )
+        self.assertEqual(read_stats()['total'], 1)
+        refresh_stats()
+        self.assertEqual(read_stats()['total'], 2)
+
+    def test_read_stats(self):
+        self.User.objects.create_user(
+            email='young@example.com', password='testpass123', name='Young',
+            genre='H', date_naissance=date(date.today().year - 15, 1, 1),
+        )
+        with self.assertNumQueries(1):
+            stats = read_stats()
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual(stats['genre'], {'F': 1, 'H': 1})
+        self.assertEqual(stats['is_active'], {'true': 2})
+        self.assertEqual(list(stats['age']), ['10-19', '30-39'])
+        this_month = timezone.now().strftime('%Y-%m')
+        self.assertEqual(stats['joined'], {this_month: 2})
+
+    def test_unknown_join_date(self):
+        # Comptes antérieurs à date_joined (NULL après la migration)
+        self.User.objects.filter(pk=self.user.pk).update(date_joined=None)
+        refresh_stats()
+        self.assertEqual(read_stats()['joined'], {'inconnu': 1})
+
+
+class UserStatsApiTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_user(
+            email='admin@example.com', password='testpass123', name='Admin',
+            genre='H', date_naissance='1980-01-01', is_staff=True,
+        )
+        self.client = APIClient()
+
+    def test_admin_only(self):
+        self.assertIn(self.client.get(STATS_URL).status_code, (401, 403))
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(1):
+            res = self.client.get(STATS_URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['total'], 1)
+        self.assertEqual(res.json()['genre'], {'H': 1})
@@ -0,0 +1,189 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.models import PasswordResetOutbox
+from users.throttling import (
+    CacheSlidingWindowStore, LocalTokenBucketStore, parse_rate,
+)
+
+TOKEN_URL = reverse('user:token')
+RESET_URL = reverse('user:password_reset')
+ASYNC_RESET_URL = reverse('user:async_password_reset')
+CREATE_URL = reverse('user:create')
+
+
+def throttle_settings(backend='local', **rates):
+    base = {
+        'auth': {'ip': '100/min', 'email': '100/min', 'global': '1000/s'},
+        'password_reset': {
+            'ip': '100/min', 'email': '100/min', 'global': '1000/s',
+        },
+        'signup': {'ip': '100/min', 'global': '1000/s'},
+    }
+    for scope, values in rates.items():
+        base[scope].update(values)
+    return {
+        'ENABLED': True,
+        'BACKEND': backend,
+        'CACHE': 'default',
+        'MAX_KEYS': 1000,
+        'RATES': base,
+    }
+
+
+def throttled(backend='local', **rates):
+    return override_settings(THROTTLE=throttle_settings(backend, **rates))
+
+
+class StoreTests(TestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/min'), (10, 60))
+        self.assertEqual(parse_rate('3/hour'), (3, 3600))
+
+    def test_token_bucket(self):
+        store = LocalTokenBucketStore(max_keys=10)
+        self.assertEqual(store.hit('k', 2, 60, now=0), (True, 0))
+        self.assertEqual(store.hit('k', 2, 60, now=0), (True, 0))
+        allowed, wait = store.hit('k', 2, 60, now=0)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 30)
+        # Un jeton revient toutes les 30 secondes
+        self.assertTrue(store.hit('k', 2, 60, now=31)[0])
+
+    def test_token_bucket_evicts_oldest_keys(self):
+        store = LocalTokenBucketStore(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            store.hit(key, 1, 60, now=0)
+        self.assertEqual(list(store._buckets), ['b', 'c'])
+
+    def test_sliding_window(self):
+        cache.clear()
+        store = CacheSlidingWindowStore('default')
+        self.assertTrue(store.hit('k', 2, 60, now=600)[0])
+        self.assertTrue(store.hit('k', 2, 60, now=610)[0])
+        allowed, wait = store.hit('k', 2, 60, now=620)
+        self.assertFalse(allowed)
+        self.assertEqual(wait, 40)
+        # Fenêtre suivante : 2 * (1 - 30/60) = 1 < 2
+        self.assertTrue(store.hit('k', 2, 60, now=690)[0])
+        self.assertFalse(store.hit('k', 2, 60, now=690)[0])
+
+
+class ThrottledEndpointsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='throttle@example.com',
+            password='testpass123',
+            name='Throttle',
+            genre='H',
+            date_naissance='1990-01-01',
+        )
+        self.client = APIClient()
+
+    def login(self, email='throttle@example.com', ip='10.0.0.1'):
+        return self.client.post(
+            TOKEN_URL, {'email': email, 'password': 'wrong'}, REMOTE_ADDR=ip
+        )
+
+    def test_rejection_before_hashing_or_queries(self):
+        with throttled(auth={'ip': '1/min'}):
+            self.assertEqual(self.login().status_code, 400)
+            with patch('users.serializers.authenticate') as authenticate, \
+                    self.assertNumQueries(0):
+                res = self.login()
+        self.assertEqual(res.status_code, 429)
+        self.assertIn('Retry-After', res)
+        authenticate.assert_not_called()
+
+    def test_basic_auth_header_is_not_checked(self):
+        with throttled(auth={'ip': '1/min'}):
+            self.login()
+            backend = 'django.contrib.auth.backends.ModelBackend'
+            with patch(backend + '.authenticate') as authenticate:
+                res = self.client.post(
+                    TOKEN_URL, {}, REMOTE_ADDR='10.0.0.1',
+                    HTTP_AUTHORIZATION='Basic dTpw',
+                )
+        self.assertEqual(res.status_code, 429)
+        authenticate.assert_not_called()
+
+    def test_per_email_limit_across_ips(self):
+        with throttled(auth={'email': '2/min'}):
+            self.login(ip='10.0.0.1')
+            self.login(email='THROTTLE@example.com', ip='10.0.0.2')
+            self.assertEqual(self.login(ip='10.0.0.3').status_code, 429)
+            res = self.login(email='other@example.com', ip='10.0.0.3')
+            self.assertEqual(res.status_code, 400)
+
+    def test_global_limit(self):
+        with throttled(signup={'global': '1/s'}):
+            self.client.post(CREATE_URL, {}, REMOTE_ADDR='10.0.0.1')
+            res = self.client.post(CREATE_URL, {}, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(res.status_code, 429)
+
+    @override_settings(PASSWORD_RESET_EMAIL_ASYNC=True)
+    def test_reset_flood_sends_nothing(self):
+        with throttled(password_reset={'email': '1/hour'}):
+            for i in range(5):
+                self.client.post(RESET_URL, {'email': self.user.email},
+                                 REMOTE_ADDR=f'10.0.1.{i}')
+            res = self.client.post(
+                ASYNC_RESET_URL, {'email': self.user.email}, format='json',
+                REMOTE_ADDR='10.0.2.1',
+            )
+        self.assertEqual(res.status_code, 429)
+        outbox = PasswordResetOutbox.objects.filter(user=self.user)
+        self.assertEqual(outbox.count(), 1)
+
+    def test_non_object_body(self):
+        with throttled():
+            res = self.client.post(TOKEN_URL, ['x'], format='json')
+        self.assertEqual(res.status_code, 400)
+
+    def test_forwarded_for_is_not_trusted_by_default(self):
+        with throttled(auth={'ip': '1/min'}):
+            codes = [
+                self.client.post(
+                    TOKEN_URL, {'email': f'u{i}@example.com', 'password': 'x'},
+                    REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'1.2.3.{i}',
+                ).status_code
+                for i in range(3)
+            ]
+        self.assertEqual(codes, [400, 429, 429])
+
+    def test_rejected_request_consumes_no_quota(self):
+        rates = throttle_settings(auth={'ip': '2/min', 'email': '1/min'})
+        for backend in ('local', 'cache'):
+            cache.clear()
+            rates['BACKEND'] = backend
+            with self.subTest(backend), override_settings(THROTTLE=rates):
+                self.assertEqual(self.login().status_code, 400)
+                self.assertEqual(self.login().status_code, 429)
+                # Le refus par l'email n'a pas consommé le 2e jeton de l'IP
+                res = self.login(email='other@example.com')
+                self.assertEqual(res.status_code, 400)
+
+    def test_cache_backend(self):
+        with throttled('cache', auth={'ip': '1/min'}):
+            self.login()
+            self.assertEqual(self.login().status_code, 429)
+
+    def test_disabled(self):
+        settings = throttle_settings(auth={'ip': '1/min'})
+        settings['ENABLED'] = False
+        with override_settings(THROTTLE=settings):
+            self.login()
+            self.assertEqual(self.login().status_code, 400)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_throttle', iterations=50, stdout=out)
+        self.assertIn('µs', out.getvalue())
@@ -0,0 +1,158 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.authentication import reset_snapshot_cache
+from users.models import UsedRefreshToken
+from users.tokens import ACCESS, REFRESH, InvalidToken, make_token, read_token
+
+TOKEN_URL = reverse('user:token')
+REFRESH_URL = reverse('user:token_refresh')
+ME_URL = reverse('user:moi')
+
+
+class SignedTokenTests(TestCase):
+    def setUp(self):
+        reset_snapshot_cache()
+        self.user = get_user_model().objects.create_user(
+            email='signed@example.com',
+            password='testpass123',
+            name='Signed',
+            genre='F',
+            date_naissance='1990-01-01',
+        )
+        self.client = APIClient()
+
+    def login(self):
+        res = self.client.post(
+            TOKEN_URL, {'email': self.user.email, 'password': 'testpass123'}
+        )
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def get_me(self, token):
+        return self.client.get(ME_URL, HTTP_AUTHORIZATION=f'Token {token}')
+
+    def refresh(self, token):
+        return self.client.post(REFRESH_URL, {'refresh': token})
+
+    def test_login_issues_tokens_without_token_table(self):
+        with self.assertNumQueries(1):
+            tokens = self.login()
+        self.assertEqual(set(tokens), {'token', 'refresh', 'expires_in'})
+        self.assertFalse(Token.objects.exists())
+
+    def test_access_token_needs_no_query(self):
+        token = self.login()['token']
+        with self.assertNumQueries(0):
+            res = self.get_me(token)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['email'], self.user.email)
+
+    def test_read_token(self):
+        token = make_token(self.user, ACCESS, now=1000)
+        self.assertEqual(read_token(token, ACCESS, now=1000)[:3],
+                         (self.user.pk, 1000 + 15 * 60, 0))
+        with self.assertRaisesMessage(InvalidToken, 'expiré'):
+            read_token(token, ACCESS, now=1000 + 15 * 60 + 1)
+        with self.assertRaises(InvalidToken):
+            read_token(token, REFRESH, now=1000)
+        with self.assertRaises(InvalidToken):
+            read_token(token.replace('a.', 'a.1'), ACCESS, now=1000)
+
+    def test_rejected_tokens(self):
+        expired = make_token(self.user, ACCESS, now=time.time() - 3600)
+        refresh = make_token(self.user, REFRESH)
+        for token in (expired, refresh, make_token(self.user, ACCESS)[:-2]):
+            self.assertEqual(self.get_me(token).status_code, 401)
+
+    def test_password_reset_revokes_tokens(self):
+        tokens = self.login()
+        res = self.client.post(reverse('user:password_reset_confirm'), {
+            'uid': urlsafe_base64_encode(force_bytes(self.user.pk)),
+            'token': default_token_generator.make_token(self.user),
+            'new_password': 'NewPass123!x',
+            're_new_password': 'NewPass123!x',
+        })
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.get_me(tokens['token']).status_code, 401)
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, 401)
+
+    def test_newer_version_reloads_stale_snapshot(self):
+        old = self.login()['token']
+        self.assertEqual(self.get_me(old).status_code, 200)
+        # Révocation par un autre processus : instantané local périmé
+        users = get_user_model().objects.filter(pk=self.user.pk)
+        users.update(token_version=F('token_version') + 1)
+        self.user.refresh_from_db()
+        new = make_token(self.user, ACCESS)
+        self.assertEqual(self.get_me(new).status_code, 200)
+        self.assertEqual(self.get_me(old).status_code, 401)
+
+    @override_settings(TOKEN_AUTH_CACHE={
+        'MAX_SIZE': 100, 'TTL': 300, 'SHARED_CACHE': 'default',
+    })
+    def test_revocation_with_shared_cache(self):
+        reset_snapshot_cache()
+        token = self.login()['token']
+        self.assertEqual(self.get_me(token).status_code, 200)
+        self.user.revoke_tokens()
+        self.user.save()
+        self.assertEqual(self.get_me(token).status_code, 401)
+        reset_snapshot_cache()
+
+    def test_refresh_rotation_and_reuse(self):
+        tokens = self.login()
+        res = self.refresh(tokens['refresh'])
+        self.assertEqual(res.status_code, 200)
+        renewed = res.json()
+        self.assertEqual(self.get_me(renewed['token']).status_code, 200)
+
+        # Rejeu de l'ancien jeton : refusé et tous les jetons sont révoqués
+        res = self.refresh(tokens['refresh'])
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(self.get_me(renewed['token']).status_code, 401)
+        self.assertEqual(self.refresh(renewed['refresh']).status_code, 401)
+
+    def test_legacy_token_still_accepted(self):
+        token = Token.objects.create(user=self.user)
+        self.assertEqual(self.get_me(token.key).status_code, 200)
+
+
+class ClearExpiredTokensTests(TestCase):
+    def test_purge(self):
+        now = timezone.now()
+        UsedRefreshToken.objects.create(
+            jti='expired', expires_at=now - timedelta(seconds=1)
+        )
+        UsedRefreshToken.objects.create(
+            jti='valid', expires_at=now + timedelta(days=1)
+        )
+        user = get_user_model().objects.create_user(
+            email='old@example.com', password='testpass123',
+            date_naissance='1990-01-01',
+        )
+        token = Token.objects.create(user=user)
+        Token.objects.filter(pk=token.pk).update(
+            created=now - timedelta(days=100)
+        )
+
+        call_command('clear_expired_tokens', batch_size=1, stdout=StringIO())
+        remaining = UsedRefreshToken.objects.values_list('jti', flat=True)
+        self.assertEqual(list(remaining), ['valid'])
+        self.assertTrue(Token.objects.exists())
+
+        call_command('clear_expired_tokens', legacy_days=90, stdout=StringIO())
+        self.assertFalse(Token.objects.exists())
@@ -0,0 +1,215 @@
+"""Limitation de débit des endpoints d'authentification et de reset.
+
+Chaque scope (``auth``, ``password_reset``, ``signup``) a des limites par
+IP, par email et globales (``settings.THROTTLE['RATES']``). Deux stores :
+
+- ``local`` : token bucket en mémoire du processus (un seul nœud) ;
+- ``cache`` : compteur à fenêtre glissante dans un cache Django partagé
+  (redis, memcached), commun à tous les nœuds.
+
+Une vérification est O(1) (un dict ou deux lectures de cache) et a lieu
+avant l'authentification, le hachage ou toute requête SQL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.contrib.auth.base_user import BaseUserManager
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+THROTTLE_PREFIX = 'throttle:'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """``'10/min'`` -> ``(10, 60)``"""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class LocalTokenBucketStore:
+    """Token buckets en mémoire ; les clés les moins récentes sont évincées"""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, period, now=None):
+        """Consomme un jeton ; retourne ``(autorisé, attente en secondes)``"""
+        return self.hit_all([(key, limit, period)], now)
+
+    def hit_all(self, checks, now=None):
+        """Un jeton de chaque ``(clé, limite, période)``, ou aucun si l'une
+        des limites est atteinte ; retourne ``(autorisé, attente)``"""
+        now = time.monotonic() if now is None else now
+        levels, wait = [], None
+        with self._lock:
+            for key, limit, period in checks:
+                rate = limit / period
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    tokens = limit
+                else:
+                    tokens, last = bucket
+                    tokens = min(limit, tokens + (now - last) * rate)
+                if tokens < 1:
+                    wait = max(wait or 0, (1 - tokens) / rate)
+                levels.append((key, tokens))
+            if wait is not None:
+                return False, wait
+            for key, tokens in levels:
+                self._buckets[key] = (tokens - 1, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return True, 0
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheSlidingWindowStore:
+    """Compteur à fenêtre glissante dans un cache Django partagé.
+
+    Estimation : ``précédente * part restante + courante`` ; seules les
+    requêtes acceptées incrémentent le compteur (``incr`` atomique).
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def hit(self, key, limit, period, now=None):
+        return self.hit_all([(key, limit, period)], now)
+
+    @staticmethod
+    def _wait(current, previous, limit, period, elapsed):
+        """Attente avant la prochaine requête acceptée, None si acceptée"""
+        if previous * (1 - elapsed / period) + current < limit:
+            return None
+        if current >= limit or not previous:
+            return period - elapsed
+        # Instant où la part de la fenêtre précédente sera assez faible
+        target_weight = (limit - 1 - current) / previous
+        return max(0, (1 - target_weight) * period - elapsed)
+
+    def hit_all(self, checks, now=None):
+        """Compteurs lus en un seul ``get_many`` ; incrémentés seulement si
+        aucune limite n'est atteinte"""
+        now = time.time() if now is None else now
+        windows = []
+        for key, limit, period in checks:
+            window = int(now // period)
+            windows.append((
+                f'{THROTTLE_PREFIX}{key}:{window}',
+                f'{THROTTLE_PREFIX}{key}:{window - 1}',
+                limit, period, now - window * period,
+            ))
+        counts = self.cache.get_many([k for w in windows for k in w[:2]])
+        waits = [
+            self._wait(counts.get(current, 0), counts.get(previous, 0),
+                       limit, period, elapsed)
+            for current, previous, limit, period, elapsed in windows
+        ]
+        waits = [wait for wait in waits if wait is not None]
+        if waits:
+            return False, max(waits)
+
+        for current_key, _, _, period, _ in windows:
+            self.cache.add(current_key, 0, timeout=2 * period)
+            try:
+                self.cache.incr(current_key)
+            except ValueError:  # clé évincée entre add et incr
+                self.cache.set(current_key, 1, timeout=2 * period)
+        return True, 0
+
+    def clear(self):
+        pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_throttle_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = settings.THROTTLE
+                if config['BACKEND'] == 'cache':
+                    _store = CacheSlidingWindowStore(config['CACHE'])
+                else:
+                    _store = LocalTokenBucketStore(config['MAX_KEYS'])
+    return _store
+
+
+def reset_throttle_store():
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.clear()
+        _store = None
+
+
+def check_rate(scope, ip=None, email=None):
+    """Attente (s) si une limite du scope est atteinte, sinon None"""
+    config = settings.THROTTLE
+    if not config['ENABLED']:
+        return None
+    idents = {'ip': ip, 'email': email, 'global': 'all'}
+    checks = [
+        (f'{scope}:{kind}:{idents[kind]}', *parse_rate(rate))
+        for kind, rate in config['RATES'][scope].items()
+        if idents.get(kind)
+    ]
+    # Toutes les limites vérifiées avant d'en consommer aucune : une
+    # requête refusée par l'email n'use pas le quota de l'IP
+    allowed, wait = get_throttle_store().hit_all(checks)
+    return None if allowed else wait
+
+
+def normalize_email_ident(email):
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return BaseUserManager.normalize_email(email.strip()).lower()
+
+
+class ScopedLayeredThrottle(BaseThrottle):
+    """Throttle DRF d'un scope de ``THROTTLE['RATES']`` (IP, email, global)"""
+    scope = None
+
+    def allow_request(self, request, view):
+        email = None
+        data = request.data
+        if ('email' in settings.THROTTLE['RATES'][self.scope]
+                and isinstance(data, Mapping)):
+            email = normalize_email_ident(data.get('email'))
+        # IP : REMOTE_ADDR, ou X-Forwarded-For derrière NUM_PROXIES proxys
+        self.wait_time = check_rate(
+            self.scope, ip=self.get_ident(request), email=email
+        )
+        return self.wait_time is None
+
+    def wait(self):
+        return self.wait_time
+
+
+class AuthThrottle(ScopedLayeredThrottle):
+    scope = 'auth'
+
+
+class PasswordResetThrottle(ScopedLayeredThrottle):
+    scope = 'password_reset'
+
+
+class SignupThrottle(ScopedLayeredThrottle):
+    scope = 'signup'
@@ -0,0 +1,72 @@
+"""Jetons signés émis par ``CreateTokenView``.
+
+- Accès : ``a.<id>.<expiration>.<version>:<signature>`` (HMAC-SHA256 avec
+  SECRET_KEY), vérifié sans requête SQL. ``User.token_version`` révoque
+  d'un coup tous les jetons d'un utilisateur.
+- Rafraîchissement : même format avec un identifiant aléatoire (jti).
+  Seuls les jti déjà utilisés sont stockés (``UsedRefreshToken``).
+
+Les anciens tokens DRF (table ``authtoken_token``) restent acceptés.
+"""
+import secrets
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.utils.http import base36_to_int, int_to_base36
+
+ACCESS = 'a'
+REFRESH = 'r'
+_SALTS = {
+    ACCESS: 'users.tokens.access',
+    REFRESH: 'users.tokens.refresh',
+}
+
+
+class InvalidToken(Exception):
+    """Jeton mal formé, mal signé ou expiré"""
+
+
+def _signer(kind):
+    return signing.Signer(salt=_SALTS[kind], algorithm='sha256')
+
+
+def is_signed_token(key):
+    """Jeton de ce module (et non token DRF hexadécimal) ?"""
+    return key[:2] in ('a.', 'r.')
+
+
+def make_token(user, kind, now=None):
+    conf = settings.AUTH_TOKENS
+    ttl = conf['ACCESS_TTL'] if kind == ACCESS else conf['REFRESH_TTL']
+    expires = int(now if now is not None else time.time()) + ttl
+    parts = [kind] + [
+        int_to_base36(value)
+        for value in (user.pk, expires, user.token_version)
+    ]
+    if kind == REFRESH:
+        parts.append(secrets.token_urlsafe(12))
+    return _signer(kind).sign('.'.join(parts))
+
+
+def read_token(token, kind, now=None):
+    """``(user_id, expiration, version, jti)`` ; lève InvalidToken sinon"""
+    try:
+        parts = _signer(kind).unsign(token).split('.')
+        if parts[0] != kind or len(parts) != (5 if kind == REFRESH else 4):
+            raise ValueError
+        user_id, expires, version = map(base36_to_int, parts[1:4])
+    except (signing.BadSignature, ValueError):
+        raise InvalidToken("Jeton invalide.")
+    if expires < (now if now is not None else time.time()):
+        raise InvalidToken("Jeton expiré.")
+    return user_id, expires, version, parts[4] if kind == REFRESH else None
+
+
+def issue_tokens(user, now=None):
+    """Réponse de connexion : jeton d'accès et jeton de rafraîchissement"""
+    return {
+        'token': make_token(user, ACCESS, now),
+        'refresh': make_token(user, REFRESH, now),
+        'expires_in': settings.AUTH_TOKENS['ACCESS_TTL'],
+    }
@@ -1,5 +1,5 @@
 from django.urls import path
-from users import views
+from users import async_views, views
 from .views import get_users,request_password_reset,reset_password
 app_name='user'
 
@@ -7,8 +7,20 @@ app_name='user'
 urlpatterns=[
     path('create/',views.CreateUserView.as_view(),name='create'),
     path('token/',views.CreateTokenView.as_view(),name='token'),
+    path('token/refresh/', views.refresh_token, name='token_refresh'),
     path("moi/",views.ManageApiView.as_view(),name='moi'),
     path("get_users/", get_users),
+    path("export/", views.export_users, name="export"),
+    path("stats/", views.user_stats, name="stats"),
    path("password-reset/", request_password_reset, name="password_reset"),
     path("password-reset/confirm/", reset_password, name="password_reset_confirm"),
-]
\ No newline at end of file
+    path("password-reset/qr/<str:signed>/", views.password_reset_qr,
+         name="password_reset_qr"),
+    # Versions async (servies par uvicorn, cf. gunicorn.conf.py)
+    path("async/get_users/", async_views.get_users, name="async_get_users"),
+    path("async/moi/", async_views.profile, name="async_moi"),
+    path("async/password-reset/", async_views.request_password_reset,
+         name="async_password_reset"),
+    path("async/password-reset/confirm/", async_views.reset_password,
+         name="async_password_reset_confirm"),
+]
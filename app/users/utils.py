@@ -1,31 +1,46 @@
-import io
 import logging
-import qrcode
 from django.conf import settings
 from django.core.mail import EmailMessage
-from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 
+from core.instrumentation import timed
+from users.qr import make_qr_url, render_reset_qr
+from users.reset_tokens import make_reset_token
+
 logger = logging.getLogger(__name__)
 
 def make_reset_payload(user):
     """Génère uid, token et lien complet de réinitialisation"""
     uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
-    token = default_token_generator.make_token(user)
+    token = make_reset_token(user)
     reset_url = f"{settings.FRONTEND_URL}/password-reset/confirm/{uidb64}/{token}"
     return uidb64, token, reset_url
 
+
+def format_duration(seconds):
+    """Durée lisible : ``1 heure``, ``2 heures``, ``30 minutes``"""
+    if seconds % 3600 == 0:
+        hours = seconds // 3600
+        return f"{hours} heure{'s' if hours > 1 else ''}"
+    minutes = max(1, seconds // 60)
+    return f"{minutes} minute{'s' if minutes > 1 else ''}"
+
+
 def generate_qr_bytes(data: str) -> bytes:
-    """Génère le QR code en bytes"""
-    img = qrcode.make(data)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    return buf.getvalue()
+    """Génère le QR code PNG en bytes"""
+    return render_reset_qr(data, fmt="png").content
 
-def send_password_reset_email(user):
-    """Envoie un e-mail pro de réinitialisation"""
+
+def build_password_reset_email(user, connection=None):
+    """Construit (sans l'envoyer) l'e-mail pro de réinitialisation"""
     uid, token, reset_url = make_reset_payload(user)
+    qr_mode = settings.PASSWORD_RESET_QR["MODE"]
+    ttl = format_duration(settings.PASSWORD_RESET_TOKENS["TTL"])
+
+    qr_line = ""
+    if qr_mode == "lazy":
+        qr_line = f"📱 QR code à scanner :\n{make_qr_url(reset_url)}\n\n"
 
     subject = "🔐 Réinitialisation de votre mot de passe"
     body = (
@@ -36,7 +51,8 @@ def send_password_reset_email(user):
         f"   uid: {uid}\n"
         f"   token: {token}\n\n"
         f"2️⃣ Ou utiliser ce lien direct :\n{reset_url}\n\n"
-        "⚠️ Ce lien/jeton expire dans 1 heure.\n"
+        f"{qr_line}"
+        f"⚠️ Ce lien/jeton expire dans {ttl}.\n"
         "Si vous n'avez pas fait cette demande, ignorez ce mail."
     )
 
@@ -45,14 +61,24 @@ def send_password_reset_email(user):
         body=body,
         from_email=settings.DEFAULT_FROM_EMAIL,
         to=[user.email],
+        connection=connection,
     )
 
     # QR code optionnel
-    try:
-        email.attach("reset_qr.png", generate_qr_bytes(reset_url), "image/png")
-    except Exception as e:
-        logger.warning(f"Impossible de joindre le QR code : {e}")
+    if qr_mode == "attach":
+        try:
+            qr = render_reset_qr(reset_url)
+            email.attach(qr.filename, qr.content, qr.content_type)
+        except Exception as e:
+            logger.warning(f"Impossible de joindre le QR code : {e}")
+
+    return email
 
+
+@timed('email')
+def send_password_reset_email(user):
+    """Envoie un e-mail pro de réinitialisation"""
+    email = build_password_reset_email(user)
     try:
         email.send(fail_silently=False)
         logger.info(f"Email de reset envoyé à {user.email}")
@@ -1,10 +1,34 @@
-from rest_framework import generics, authentication, permissions, status
+from rest_framework import exceptions, generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+    throttle_classes,
+)
 from rest_framework.response import Response
+from django.conf import settings
+from django.core import signing
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
 
+from core.user_export import (
+    CONTENT_TYPES as EXPORT_CONTENT_TYPES,
+    TEXT_WRITERS,
+    iter_user_chunks,
+    parse_fields,
+)
+from users.authentication import CachedTokenAuthentication, cache_user
+from users.cache import cached_response, store_after_render
+from users.pagination import STREAM_CONTENT_TYPES, streaming_response
+from users.read_serializers import PROFILE_READ, USER_LIST_READ, FastReadMixin
+from users.stats import read_stats
+from users.throttling import (
+    AuthThrottle, PasswordResetThrottle, SignupThrottle,
+)
+from users.tokens import InvalidToken, issue_tokens
 from users.serializers import (
     UserSerializer,
     AuthTokenSerializer,
@@ -12,35 +36,141 @@ from users.serializers import (
     PasswordResetRequestSerializer,
     PasswordResetConfirmSerializer,
 )
-from .utils import send_password_reset_email
+from .qr import load_qr_data, render_reset_qr
+from .services import (
+    RESET_REQUESTED_MESSAGE,
+    PasswordResetError,
+    check_reset_payload,
+    listed_users,
+    refresh_tokens_for,
+    request_password_reset_for,
+    reset_password_for,
+    user_for_update,
+    users_page,
+)
 
-from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_decode
-from .utils import send_password_reset_email
 User = get_user_model()
 
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def get_users(request):
-    users = User.objects.filter(is_superuser=False)
-    return Response({
-        "count": users.count(),
-        "results": list(users.values("id", "email", "name"))  # ← username ➜ name
-    })
+    """Liste paginée (keyset sur id) des utilisateurs non superusers.
+
+    ``?stream=ndjson|json`` renvoie toute la liste en streaming.
+    """
+    stream = request.query_params.get("stream")
+    if stream:
+        if stream not in STREAM_CONTENT_TYPES:
+            return Response(
+                {"message": "Format de streaming inconnu (ndjson ou json)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return streaming_response(listed_users(), USER_LIST_READ, stream,
+                                  settings.USERS_STREAM_CHUNK_SIZE)
+
+    try:
+        return Response(users_page(request))
+    except ValueError as e:
+        return Response(
+            {"message": str(e)}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export_users(request):
+    """Export complet en streaming.
+
+    ``?output=csv|ndjson&fields=...&after=<id>``
+    """
+    output = request.query_params.get("output", "csv")
+    if output not in TEXT_WRITERS:
+        return Response(
+            {"message": "Format d'export inconnu (csv ou ndjson)."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        fields = parse_fields(request.query_params.get("fields"))
+        after_id = int(request.query_params.get("after", 0))
+    except ValueError as e:
+        return Response(
+            {"message": str(e)}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    chunks = iter_user_chunks(
+        fields, after_id=after_id,
+        chunk_size=settings.USERS_STREAM_CHUNK_SIZE,
+    )
+    response = StreamingHttpResponse(
+        TEXT_WRITERS[output](chunks, fields, header=after_id == 0),
+        content_type=EXPORT_CONTENT_TYPES[output],
+    )
+    response["Content-Disposition"] = f'attachment; filename="users.{output}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def user_stats(request):
+    """Effectifs par genre, statut, tranche d'âge et mois d'inscription.
+
+    Lus dans la table de synthèse ``UserStat`` (``users.stats``).
+    """
+    return Response(read_stats())
 
 
 class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
+    # Endpoints anonymes : aucune authentification (ni hachage ni requête)
+    # avant la limitation de débit
+    authentication_classes = []
+    throttle_classes = [SignupThrottle]
 
 
 class CreateTokenView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
+    # ObtainAuthToken force JSONRenderer : on reprend les renderers du
+    # projet (formulaire navigable seulement en DEBUG)
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    authentication_classes = []
+    throttle_classes = [AuthThrottle]
+
+    def post(self, request, *args, **kwargs):
+        # Jetons signés (users.tokens) : ni SELECT ni INSERT de Token DRF,
+        # la connexion ne coûte que la recherche de l'utilisateur
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        # Premier appel authentifié sans requête (cache de
+        # users.authentication)
+        cache_user(user)
+        return Response(issue_tokens(user))
+
+
+@api_view(["POST"])
+@authentication_classes([])
+@throttle_classes([AuthThrottle])
+def refresh_token(request):
+    """Nouvelle paire de jetons contre un jeton de rafraîchissement unique"""
+    refresh = request.data.get("refresh")
+    if not refresh:
+        return Response(
+            {"message": "Veuillez fournir un jeton de rafraîchissement."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        return Response(refresh_tokens_for(refresh))
+    except InvalidToken as e:
+        return Response({"message": str(e)},
+                        status=status.HTTP_401_UNAUTHORIZED)
 
 
-class ManageApiView(generics.RetrieveUpdateAPIView):
-    authentication_classes = [authentication.TokenAuthentication]
+class ManageApiView(FastReadMixin, generics.RetrieveUpdateAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    # GET sans ModelSerializer : même sortie que ProfileSerializer
+    read_serializer = PROFILE_READ
 
     def get_serializer_class(self):
         # GET -> profil “léger” (email + name) pour coller à tes tests
@@ -54,57 +184,70 @@ class ManageApiView(generics.RetrieveUpdateAPIView):
         return super().get_serializer(*args, **kwargs)
 
     def get_object(self):
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        user = user_for_update(self.request.user.pk)
+        if user is None:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+        return user
+
+    def retrieve(self, request, *args, **kwargs):
+        # JSON mis en cache par utilisateur (users.cache), ETag + 304
+        if request.accepted_renderer.format != "json":
+            return super().retrieve(request, *args, **kwargs)
+        user_id = request.user.pk
+        cached = cached_response(request, user_id)
+        if cached is not None:
+            return cached
+        response = super().retrieve(request, *args, **kwargs)
+        return store_after_render(request, response, user_id)
 
 
 # === Password Reset (pro) ===
 
 @api_view(["POST"])
+@authentication_classes([])
+@throttle_classes([PasswordResetThrottle])
 def request_password_reset(request):
     """Étape 1 : demander la réinitialisation"""
     email = request.data.get("email")
     if not email:
         return Response({"message": "Veuillez fournir un email."}, status=status.HTTP_400_BAD_REQUEST)
 
-    User = get_user_model()
     try:
-        user = User.objects.get(email=email)
-    except User.DoesNotExist:
         # Pour la sécurité, ne pas révéler si l'utilisateur existe
-        return Response({"message": "Si l’email existe, un mail de réinitialisation a été envoyé."})
-
-    try:
-        send_password_reset_email(user)
+        request_password_reset_for(email)
     except Exception as e:
         return Response({"message": f"Erreur lors de l'envoi de l'e-mail: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    return Response({"message": "Si l’email existe, un mail de réinitialisation a été envoyé."}, status=status.HTTP_200_OK)
+    return Response({"message": RESET_REQUESTED_MESSAGE},
+                    status=status.HTTP_200_OK)
 
 @api_view(["POST"])
 def reset_password(request):
     """Étape 2 : réinitialiser le mot de passe via uid et token"""
-    uid = request.data.get("uid")
-    token = request.data.get("token")
-    new_password = request.data.get("new_password")
-    re_new_password = request.data.get("re_new_password")
-
-    if not all([uid, token, new_password, re_new_password]):
-        return Response({"message": "Tous les champs sont requis (uid, token, new_password, re_new_password)."}, status=status.HTTP_400_BAD_REQUEST)
-
-    if new_password != re_new_password:
-        return Response({"message": "Les mots de passe ne correspondent pas."}, status=status.HTTP_400_BAD_REQUEST)
-
-    User = get_user_model()
     try:
-        uid_decoded = urlsafe_base64_decode(uid).decode()
-        user = User.objects.get(pk=uid_decoded)
-    except (User.DoesNotExist, ValueError, TypeError):
-        return Response({"message": "Utilisateur introuvable."}, status=status.HTTP_400_BAD_REQUEST)
+        reset_password_for(*check_reset_payload(request.data))
+    except PasswordResetError as e:
+        return Response({"message": str(e)},
+                        status=status.HTTP_400_BAD_REQUEST)
 
-    if not default_token_generator.check_token(user, token):
-        return Response({"message": "Token invalide ou expiré."}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(
+        {"message": "Mot de passe réinitialisé avec succès."},
+        status=status.HTTP_200_OK,
+    )
 
-    user.set_password(new_password)
-    user.save()
 
-    return Response({"message": "Mot de passe réinitialisé avec succès."}, status=status.HTTP_200_OK)
\ No newline at end of file
+@api_view(["GET"])
+def password_reset_qr(request, signed):
+    """QR code du lien de reset, rendu à l'ouverture (mode lazy)"""
+    try:
+        reset_url = load_qr_data(signed)
+    except signing.BadSignature:
+        raise Http404
+    qr = render_reset_qr(reset_url)
+    response = HttpResponse(qr.content, content_type=qr.content_type)
+    max_age = settings.PASSWORD_RESET_QR['MAX_AGE']
+    response["Cache-Control"] = f"private, max-age={max_age}"
+    return response